@@ -8,6 +8,7 @@ import os
 import shutil
 import subprocess
 import platform
+import threading
 import webbrowser
 from datetime import datetime
 from pathlib import Path
@@ -828,6 +829,10 @@ if ($proc) {{
     return f"Focus not supported on this OS"
 
 
+# Window titles type_text must never paste into (SOUL's own chat input)
+_SOUL_TITLES = {"soul", "thinkiee", "soul — device companion", "electron"}
+
+
 async def _type_text(p: dict) -> str:
     """Type text into a window. If window_title provided, re-focuses it first."""
     text         = p.get("text", "")
@@ -844,7 +849,6 @@ async def _type_text(p: dict) -> str:
         # Never type into SOUL's own chat input. If window_title is empty/None,
         # we must NOT fall back to "whatever has focus" because that is usually
         # SOUL's chat bar. Require an explicit target for blind paste.
-        _SOUL_TITLES = {"soul", "thinkiee", "soul — device companion", "electron"}
         if not window_title:
             return ("type_text requires a window_title — no target specified. "
                     "Please open the app first and retry with window_title set.")
@@ -901,6 +905,19 @@ Add-Type -AssemblyName System.Windows.Forms
     return "Type not supported on this OS"
 
 
+# Shortcut name → System.Windows.Forms.SendKeys syntax
+KEY_MAP = {
+    "ctrl+v": "^v", "ctrl+c": "^c", "ctrl+x": "^x", "ctrl+z": "^z",
+    "ctrl+s": "^s", "ctrl+a": "^a", "ctrl+n": "^n", "ctrl+w": "^w",
+    "ctrl+t": "^t", "ctrl+f": "^f", "ctrl+p": "^p", "ctrl+r": "^r",
+    "ctrl+shift+s": "^+s", "alt+f4": "%{F4}", "alt+tab": "%{TAB}",
+    "enter": "{ENTER}", "escape": "{ESC}", "tab": "{TAB}",
+    "f5": "{F5}", "delete": "{DEL}", "backspace": "{BS}",
+    "up": "{UP}", "down": "{DOWN}", "left": "{LEFT}", "right": "{RIGHT}",
+    "home": "{HOME}", "end": "{END}", "pageup": "{PGUP}", "pagedown": "{PGDN}",
+}
+
+
 async def _press_keys(p: dict) -> str:
     """Send keyboard shortcut to active window. e.g. ctrl+v, ctrl+s, alt+f4"""
     keys = p.get("keys", "").lower().strip()
@@ -908,16 +925,6 @@ async def _press_keys(p: dict) -> str:
         raise ValueError("No keys specified")
     await asyncio.sleep(0.3)
 
-    KEY_MAP = {
-        "ctrl+v": "^v", "ctrl+c": "^c", "ctrl+x": "^x", "ctrl+z": "^z",
-        "ctrl+s": "^s", "ctrl+a": "^a", "ctrl+n": "^n", "ctrl+w": "^w",
-        "ctrl+t": "^t", "ctrl+f": "^f", "ctrl+p": "^p", "ctrl+r": "^r",
-        "ctrl+shift+s": "^+s", "alt+f4": "%{F4}", "alt+tab": "%{TAB}",
-        "enter": "{ENTER}", "escape": "{ESC}", "tab": "{TAB}",
-        "f5": "{F5}", "delete": "{DEL}", "backspace": "{BS}",
-        "up": "{UP}", "down": "{DOWN}", "left": "{LEFT}", "right": "{RIGHT}",
-        "home": "{HOME}", "end": "{END}", "pageup": "{PGUP}", "pagedown": "{PGDN}",
-    }
     sk = KEY_MAP.get(keys, keys)
     if WINDOWS:
         ps = f"""
@@ -981,6 +988,174 @@ async def _open_file_in_app(p: dict) -> str:
     return f"Opened {fp.name}"
 
 
+# ── Fused macros ──────────────────────────────────────────────────────────
+# Runs like open_app → focus_window → type_text → press_keys are compiled into
+# ONE PowerShell script: one process spawn, one Add-Type, and in-script readiness
+# waits instead of four round trips with Python-side sleeps between them.
+# The script reports per-step progress on stdout so the UI still gets an
+# action_step / action_result per step:
+#   @@SOUL BEGIN <i>
+#   @@SOUL DONE <i> ok|late|fail <elapsed_ms> <message>
+# "late" is an open_app whose window wasn't seen before the ceiling — the step
+# still counts as done, but its elapsed is not a launch time.
+# On the first failing step the script exits; the caller resumes that step and
+# the rest through the normal one-at-a-time path (full open_app fallbacks etc).
+
+# Only AUTO_CONFIRM types — a macro runs without request()'s confirmation
+# step, so anything that would need a PendingAction stays on the normal path
+FUSABLE = {"open_app", "focus_window", "type_text", "press_keys"}
+MACRO_MIN_STEPS = 2
+
+_MACRO_HEADER = r"""
+$ErrorActionPreference = 'Stop'
+Add-Type @"
+using System; using System.Runtime.InteropServices;
+public class SoulMacro {
+    [DllImport("user32.dll")] public static extern bool SetForegroundWindow(IntPtr h);
+    [DllImport("user32.dll")] public static extern bool ShowWindow(IntPtr h, int n);
+    [DllImport("user32.dll")] public static extern IntPtr GetForegroundWindow();
+}
+"@
+Add-Type -AssemblyName System.Windows.Forms
+function Emit($s) { [Console]::Out.WriteLine($s); [Console]::Out.Flush() }
+# $words: title terms match on word boundaries, as readiness._title_re does
+# ("code" must not match "Unicode"); off, a plain substring like _focus_window
+function Find-App($terms, $stems, $words) {
+    foreach ($p in Get-Process) {
+        if ($p.MainWindowHandle -eq 0) { continue }
+        if ($stems -contains $p.ProcessName.ToLower()) { return $p }
+        $t = $p.MainWindowTitle.ToLower()
+        foreach ($w in $terms) {
+            if ($words) { if ($t -match ('(?<![a-z0-9])' + [regex]::Escape($w) + '(?![a-z0-9])')) { return $p } }
+            elseif ($t.Contains($w)) { return $p }
+        }
+    }
+    return $null
+}
+function Wait-App($terms, $stems, $ms, $words = $false) {
+    $end = (Get-Date).AddMilliseconds($ms)
+    do {
+        $p = Find-App $terms $stems $words
+        if ($p) { return $p }
+        Start-Sleep -Milliseconds 150
+    } while ((Get-Date) -lt $end)
+    return $null
+}
+function Focus-App($p) {
+    [SoulMacro]::ShowWindow($p.MainWindowHandle, 9) | Out-Null
+    [SoulMacro]::SetForegroundWindow($p.MainWindowHandle) | Out-Null
+    Start-Sleep -Milliseconds 200
+    return ([SoulMacro]::GetForegroundWindow() -eq $p.MainWindowHandle)
+}
+$sw = [Diagnostics.Stopwatch]::StartNew()
+"""
+
+
+def _ps_str(s: str) -> str:
+    """PowerShell single-quoted literal."""
+    return "'" + str(s).replace("'", "''") + "'"
+
+
+def _ps_list(items) -> str:
+    return "@(" + ", ".join(_ps_str(i) for i in items) + ")"
+
+
+def _is_fusable(action: dict) -> bool:
+    atype  = action.get("type", "").lower().strip()
+    params = action.get("params", {}) or {}
+    if atype not in FUSABLE or atype not in AUTO_CONFIRM:
+        return False
+    # {prev}/{clipboard} need the previous step's Python-side result
+    if any(isinstance(v, str) and "{" in v for v in params.values()):
+        return False
+    if atype == "open_app":
+        return bool(params.get("app_name", "").strip())
+    if atype == "focus_window":
+        return bool(params.get("title", "").strip())
+    if atype == "type_text":
+        title = params.get("window_title", "").strip().lower()
+        return bool(params.get("text")) and bool(title) and title not in _SOUL_TITLES
+    return bool(params.get("keys", "").strip())
+
+
+def plan_macros(actions: list) -> dict[int, int]:
+    """
+    Fusable runs in an action list as {first_step: last_step} (1-based, inclusive).
+    Windows only — elsewhere every step runs through the normal path.
+    """
+    if not WINDOWS:
+        return {}
+    runs: dict[int, int] = {}
+    start = None
+    for i, action in enumerate(list(actions) + [None], 1):
+        if action is not None and _is_fusable(action):
+            start = start or i
+            continue
+        if start and (i - start) >= MACRO_MIN_STEPS:
+            runs[start] = i - 1
+        start = None
+    return runs
+
+
+def compile_macro(steps: list) -> tuple[str, float]:
+    """PowerShell script for a fusable run, plus a hard timeout in seconds."""
+    from actions.readiness import _app_terms, launch_ceiling   # readiness imports this module
+
+    lines   = [_MACRO_HEADER]
+    timeout = 10.0
+    for i, action in enumerate(steps, 1):
+        atype = action.get("type", "").lower().strip()
+        p     = action.get("params", {}) or {}
+        lines.append(f"Emit '@@SOUL BEGIN {i}'; $t0 = $sw.ElapsedMilliseconds")
+        fail  = (f"Emit ('@@SOUL DONE {i} fail ' + ($sw.ElapsedMilliseconds - $t0) + ' ' + $msg); exit 1")
+        ok    = (f"Emit ('@@SOUL DONE {i} ok ' + ($sw.ElapsedMilliseconds - $t0) + ' ' + $msg)")
+
+        if atype == "open_app":
+            app            = p["app_name"].strip()
+            resolved       = APP_ALIASES.get(app.lower(), app)
+            terms, stems   = _app_terms(app)
+            ceiling        = launch_ceiling(app)
+            timeout       += ceiling
+            lines.append(f"""
+try {{ Start-Process {_ps_str(resolved)} }} catch {{ $msg = $_.Exception.Message; {fail} }}
+$p = Wait-App {_ps_list(terms)} {_ps_list(stems)} {int(ceiling * 1000)} $true
+$el = $sw.ElapsedMilliseconds - $t0
+if ($p) {{ Start-Sleep -Milliseconds 350; $st = 'ok'; $msg = {_ps_str(f"Opened {app}")} }}
+else {{ $st = 'late'; $msg = {_ps_str(f"Opened {app} (window not seen yet)")} }}
+Emit ('@@SOUL DONE {i} ' + $st + ' ' + $el + ' ' + $msg)""")
+
+        elif atype == "focus_window":
+            title    = p["title"].strip()
+            timeout += 3.0
+            lines.append(f"""
+$p = Wait-App {_ps_list([title.lower()])} @() 3000
+if ($p -and (Focus-App $p)) {{ $msg = {_ps_str(f"Focused: {title}")}; {ok} }}
+else {{ $msg = {_ps_str(f"Window '{title}' not found")}; {fail} }}""")
+
+        elif atype == "type_text":
+            title    = p["window_title"].strip()
+            text     = p["text"]
+            timeout += 3.0
+            lines.append(f"""
+$p = Wait-App {_ps_list([title.lower()])} @() 2500
+if ($p -and (Focus-App $p)) {{
+    Set-Clipboard -Value {_ps_str(text)}
+    [System.Windows.Forms.SendKeys]::SendWait('^v')
+    $msg = {_ps_str(f"Typed {len(text)} chars into {title}")}; {ok}
+}} else {{ $msg = {_ps_str(f"Window '{title}' not found — text not typed")}; {fail} }}""")
+
+        else:   # press_keys
+            keys     = p["keys"].lower().strip()
+            timeout += 1.0
+            lines.append(f"""
+Start-Sleep -Milliseconds 300
+try {{ [System.Windows.Forms.SendKeys]::SendWait({_ps_str(KEY_MAP.get(keys, keys))}) }}
+catch {{ $msg = $_.Exception.Message; {fail} }}
+$msg = {_ps_str(f"Sent: {keys}")}; {ok}""")
+
+    return "\n".join(lines), timeout
+
+
 # ── Registry ──────────────────────────────────────────────────────────────
 
 REGISTRY: Dict[str, Callable] = {
@@ -1044,6 +1219,89 @@ class ActionExecutor:
         self.get_tier   = get_tier  # callable returns "minimal"|"standard"|"full"
         self._pending: Dict[str, PendingAction] = {}
 
+    def plan_macros(self, actions: list) -> dict[int, int]:
+        return plan_macros(actions)
+
+    async def run_macro(self, steps: list, on_event: Callable) -> list[dict]:
+        """
+        Run a fusable run of steps in one PowerShell process.
+
+        on_event(step, phase, result) is awaited as progress arrives:
+          phase "begin" — step started (result None)
+          phase "done"  — step finished, result shaped like request()'s return,
+                          plus "elapsed" (seconds, as measured inside the script)
+                          and "ready" (False if an open_app's window never showed)
+        Returns the results of the steps that reported back, in order. A failed
+        last result, or fewer results than steps, means the run stopped early.
+        Only AUTO_CONFIRM types are fusable (_is_fusable checks), so none of
+        these steps would have needed a confirmation round trip.
+        An open_app step's elapsed is the launch time up to the window
+        appearing, without the focus grace sleep — it feeds the launch histogram
+        only when ready.
+        """
+        # compile_macro reads launch histograms from SQLite — keep it off the loop
+        script, timeout = await asyncio.to_thread(compile_macro, steps)
+        loop    = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def _pump():
+            # Blocking reader thread — works on any event loop policy
+            try:
+                proc = subprocess.Popen(
+                    ["powershell", "-NoProfile", "-WindowStyle", "Hidden",
+                     "-Command", script],
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    text=True, encoding="utf-8", errors="replace")
+                timer = threading.Timer(timeout, proc.kill)
+                timer.start()
+                try:
+                    for line in proc.stdout:
+                        loop.call_soon_threadsafe(queue.put_nowait, line.rstrip())
+                    proc.wait()
+                finally:
+                    timer.cancel()
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, f"@@SOUL ERROR {e}")
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        reader  = asyncio.create_task(asyncio.to_thread(_pump))
+        results: list[dict] = []
+        error   = ""
+        while True:
+            line = await queue.get()
+            if line is None:
+                break
+            if not line.startswith("@@SOUL "):
+                if line.strip():
+                    error = line.strip()   # PowerShell error text, kept for the report
+                continue
+            parts = line.split(" ", 5)
+            kind  = parts[1]
+            if kind == "BEGIN":
+                await on_event(int(parts[2]), "begin", None)
+            elif kind == "DONE" and len(parts) >= 5:
+                step    = int(parts[2])
+                ok      = parts[3] in ("ok", "late")
+                msg     = parts[5] if len(parts) > 5 else ""
+                result  = ({"success": True, "message": msg} if ok
+                           else {"success": False, "error": msg})
+                result.update({"action_id": "macro", "auto": ok,
+                               "elapsed": int(parts[4]) / 1000.0,
+                               "ready": parts[3] == "ok"})
+                results.append(result)
+                print(f"[SOUL] macro step {step}/{len(steps)}: "
+                      f"{steps[step-1].get('type')} -> {'ok' if ok else 'fail'}")
+                await on_event(step, "done", result)
+            elif kind == "ERROR":
+                error = line[len("@@SOUL ERROR "):]
+        await reader
+
+        if len(results) < len(steps) and (not results or results[-1].get("success")):
+            # Script died without reporting the step it was on
+            print(f"[SOUL] macro stopped after {len(results)}/{len(steps)} steps: "
+                  f"{error or 'no output'}")
+        return results
+
     def confirm(self, action_id: str):
         if action_id in self._pending:
             self._pending[action_id].accept()
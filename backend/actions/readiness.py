@@ -0,0 +1,227 @@
+"""
+SOUL — App Launch Readiness  v1.0
+actions/readiness.py
+
+Replaces the fixed inter-step sleeps in SOULState.process() after open_app.
+
+  app_windows(app)        → the app's visible windows right now (blocking)
+  wait_until_ready(app, before=…)
+                          → poll cheaply until the app has a visible window
+                            that wasn't in `before`, or a per-app ceiling passes
+  launch_ceiling(app)     → learned from a launch-time histogram in SQLite
+                            (memory/patterns.py: app_launch_times)
+
+The poll is one EnumWindows pass every POLL_SEC — no PowerShell, no process
+spawn — run off the event loop. Off Windows there are no window titles to
+read, so readiness falls back to "a process with that name exists".
+
+Launching an app that already has a window (a second Notepad, a new VS Code
+window): pass the app_windows() snapshot taken before the launch as
+`before`, so readiness waits for the new window rather than resolving on the
+old one. Single-instance apps that never open one wait out the ceiling — no
+longer than the old fixed gap.
+
+Windows are matched by exe stem, or by title on word boundaries ("code"
+doesn't match "Unicode", "edge" doesn't match "Knowledge").
+
+Cold start (fewer than MIN_SAMPLES launches recorded) uses the old fixed gaps
+(_HEAVY 4.5s, _UWP 3.2s, _LIGHT 1.6s, 2.8s default) as the ceiling, so a new
+install is never slower than before. Only launches whose window was actually
+seen feed the histogram. A launch that hits the ceiling is a censored sample —
+often an app whose window readiness can't recognise — and is not recorded, so
+it can't ratchet the ceiling up toward CEILING_MAX on every run. An app that is
+never detected keeps its prior ceiling.
+"""
+
+import asyncio
+import re
+import time
+
+import psutil
+
+from actions.executor import APP_ALIASES
+from memory.patterns import LAUNCH_BUCKET_SEC, get_launch_histogram, record_launch_time
+from perception.system import list_visible_windows
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+POLL_SEC           = 0.15   # between readiness probes
+READY_GRACE_SEC    = 0.35   # window exists → give it a moment to accept input
+MIN_SAMPLES        = 5      # launches needed before the histogram overrides priors
+CEILING_PERCENTILE = 0.95
+CEILING_MARGIN     = 1.5    # learned ceiling = p95 × margin
+CEILING_MIN        = 1.0
+CEILING_MAX        = 12.0
+
+# Prior ceilings — the fixed gaps process() used to sleep unconditionally
+_HEAVY = {"chrome", "firefox", "edge", "code", "discord", "steam", "spotify",
+          "obs", "photoshop", "premiere", "blender", "slack", "teams", "zoom"}
+_UWP   = {"calculator", "store", "photos", "mail", "calendar", "maps",
+          "notepad", "snipping tool", "xbox", "settings", "terminal"}
+_LIGHT = {"paint", "wordpad", "cmd", "powershell", "terminal"}
+
+# Window-title words for aliases whose exe name never shows up in a title
+_TITLE_HINTS = {
+    "code":         "visual studio code",
+    "wt":           "terminal",
+    "msedge":       "edge",
+    "winword":      "word",
+    "powerpnt":     "powerpoint",
+    "obs64":        "obs",
+    "taskmgr.exe":  "task manager",
+    "calc.exe":     "calculator",
+    "mspaint.exe":  "paint",
+    "explorer.exe": "file explorer",
+}
+
+_pid_names: dict[int, str] = {}   # pid → lowercased exe stem, reset when it grows
+
+
+def prior_ceiling(app: str) -> float:
+    key = app.lower().strip()
+    if key in _HEAVY: return 4.5
+    if key in _UWP:   return 3.2
+    if key in _LIGHT: return 1.6
+    return 2.8
+
+
+def launch_ceiling(app: str) -> float:
+    """Seconds to wait at most for this app: learned p95 × margin, or the prior."""
+    try:
+        hist = get_launch_histogram(app)
+    except Exception as e:
+        print(f"[SOUL] readiness histogram read error: {e}")
+        hist = {}
+    total = sum(hist.values())
+    if total < MIN_SAMPLES:
+        return prior_ceiling(app)
+
+    target = total * CEILING_PERCENTILE
+    acc    = 0
+    p95    = CEILING_MAX
+    for bucket in sorted(hist):
+        acc += hist[bucket]
+        if acc >= target:
+            p95 = (bucket + 1) * LAUNCH_BUCKET_SEC
+            break
+    return min(max(p95 * CEILING_MARGIN, CEILING_MIN), CEILING_MAX)
+
+
+def _app_terms(app: str) -> tuple[set, set]:
+    """(title words, exe stems) that identify this app's windows."""
+    key      = app.lower().strip()
+    resolved = APP_ALIASES.get(key, app).lower().strip()
+    stem     = resolved[:-4] if resolved.endswith(".exe") else resolved
+    titles   = {key}
+    if resolved in _TITLE_HINTS:
+        titles.add(_TITLE_HINTS[resolved])
+    stems = {stem, key.replace(" ", "")}
+    # URI launchers (ms-settings:, spotify:) have no exe stem worth matching
+    stems = {s for s in stems if s and ":" not in s}
+    return titles, stems
+
+
+def _pid_stem(pid: int) -> str:
+    name = _pid_names.get(pid)
+    if name is None:
+        if len(_pid_names) > 512:
+            _pid_names.clear()
+        try:
+            name = psutil.Process(pid).name().lower()
+        except Exception:
+            name = ""
+        name = name[:-4] if name.endswith(".exe") else name
+        _pid_names[pid] = name
+    return name
+
+
+def _title_re(titles: set) -> re.Pattern:
+    words = "|".join(re.escape(t) for t in sorted(titles, key=len, reverse=True))
+    return re.compile(rf"(?<![a-z0-9])(?:{words})(?![a-z0-9])")
+
+
+def app_windows(app: str) -> set:
+    """
+    The app's visible top-level windows as window handles — or, off Windows,
+    its process ids. Blocking; call via asyncio.to_thread from the loop.
+    """
+    if not app:
+        return set()
+    titles, stems = _app_terms(app)
+    windows = list_visible_windows()
+    if windows:
+        title_re = _title_re(titles)
+        return {hwnd for hwnd, pid, title in windows
+                if _pid_stem(pid) in stems or title_re.search(title.lower())}
+
+    # No window enumeration available — process presence is the best signal
+    found = set()
+    for proc in psutil.process_iter(["name"]):
+        try:
+            name = (proc.info["name"] or "").lower()
+        except Exception:
+            continue
+        if name.endswith(".exe"):
+            name = name[:-4]
+        if name in stems:
+            found.add(proc.pid)
+    return found
+
+
+def app_window_present(app: str) -> bool:
+    """True if the app has a visible top-level window (or, off Windows, a process)."""
+    return bool(app_windows(app))
+
+
+async def wait_until_ready(
+    app:     str,
+    started: float = None,
+    ceiling: float = None,
+    record:  bool  = True,
+    before:  set   = None,
+) -> tuple[bool, float]:
+    """
+    Poll until `app` has a window not in `before`, or the ceiling passes.
+
+    started — time.monotonic() when the launch was fired (defaults to now)
+    record  — feed the elapsed time into the histogram (successful launches
+              only — a timeout is never recorded). Pass False when the
+              app was already up before launching; a new window of a running
+              app isn't a cold launch time.
+    before  — app_windows(app) from just before the launch; None = any window
+
+    Returns (ready, seconds_since_started).
+    """
+    started  = started if started is not None else time.monotonic()
+    if ceiling is None:
+        ceiling = await asyncio.to_thread(launch_ceiling, app)
+    deadline = started + ceiling
+    before   = before or set()
+
+    while True:
+        try:
+            ready = bool(await asyncio.to_thread(app_windows, app) - before)
+        except Exception as e:
+            print(f"[SOUL] readiness probe error: {e}")
+            ready = False
+
+        now = time.monotonic()
+        if ready:
+            elapsed = now - started
+            if record:
+                _record(app, elapsed)
+            print(f"[SOUL] readiness: {app} ready in {elapsed:.2f}s (ceiling {ceiling:.1f}s)")
+            await asyncio.sleep(READY_GRACE_SEC)
+            return True, elapsed
+        if now >= deadline:
+            # Censored — not recorded (see module docstring)
+            print(f"[SOUL] readiness: {app} not ready after {ceiling:.1f}s — continuing")
+            return False, ceiling
+        await asyncio.sleep(POLL_SEC)
+
+
+def _record(app: str, seconds: float):
+    try:
+        record_launch_time(app, seconds)
+    except Exception as e:
+        print(f"[SOUL] readiness histogram write error: {e}")
@@ -0,0 +1,212 @@
+"""
+SOUL — Plan Scheduler  v1.0
+actions/scheduler.py
+
+Runs a multi-step action plan as a dependency graph instead of a strict line.
+
+  build_plan(actions, macros, serialize)  → list[PlanNode], each with the
+                                           steps it must wait for
+  run_plan(nodes, run_node)              → starts every node whose deps are
+                                           done, up to MAX_PARALLEL at once
+
+Dependency rules (step j < step i, i waits for j when any hold):
+  - i has a {prev}/{clipboard} placeholder     → waits for EVERY earlier step
+  - either step is a barrier (run_command, toggle_screen_capture, anything
+    this module doesn't know)                  → ordered against everything
+  - both touch the same app / file path / the clipboard (copy/read_clipboard,
+    type_text — it pastes via the clipboard — and ctrl+c/v/x key presses)
+  - foreground: focus_window / type_text / press_keys need the foreground
+    to hold still, so they're ordered against each other and against any
+    step that can steal focus (open_app, open_url, close_app, …). Two
+    focus-stealers on different apps don't wait for each other.
+  - both are in `serialize` — process() passes the verifiable types while
+    screen verification is on, since before/after screenshots can't tell
+    two concurrent screen changes apart
+
+A fused macro (actions/executor.plan_macros) is one node covering its run.
+
+Stop-on-failure, as in the sequential runner: a step with side effects only
+starts once every earlier step has finished and succeeded, so nothing a
+failed step would have prevented ever runs. Two exceptions may start ahead:
+  - read-only steps (READ_ONLY) — if an earlier step fails they've only
+    read something
+  - app launches (LAUNCHES) with no conflict between them ("open Spotify
+    and Discord") overlap each other: a launch may start while earlier
+    launches are still in flight, though not past an earlier step of any
+    other kind. If one fails, launches already started run on; nothing
+    else starts.
+Once run_node() returns False no new node starts; nodes already running
+finish and report as usual.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+MAX_PARALLEL = 3   # steps in flight at once
+
+# Types that need the foreground window to stay put while they run
+FOCUS_USERS    = {"focus_window", "type_text", "press_keys"}
+# Types that can move the foreground to a new window
+FOCUS_CHANGERS = {
+    "open_app", "open", "close_app", "kill_process", "open_url", "web_search",
+    "open_folder", "open_file_in_app", "play_media", "lock_screen",
+    "take_screenshot", "show_notification",
+}
+# Types with no side effects beyond the keys below — safe to overlap
+_KNOWN = FOCUS_USERS | FOCUS_CHANGERS | {
+    "get_running_processes", "get_system_info", "check_battery", "get_time",
+    "read_file", "write_file", "create_file", "delete_file", "rename_file",
+    "move_file", "copy_file", "list_folder", "copy_to_clipboard",
+    "read_clipboard", "set_volume", "media_control", "empty_trash",
+}
+BARRIERS = {"run_command", "toggle_screen_capture"}
+# Launches — may overlap earlier launches that are still running
+LAUNCHES = {"open_app", "open"}
+# No side effects — may start before earlier steps of any kind succeed
+READ_ONLY = {
+    "get_running_processes", "get_system_info", "check_battery", "get_time",
+    "read_file", "list_folder", "read_clipboard",
+}
+
+# ctrl+c / ctrl+shift+v / ^x … — shortcuts that read or write the clipboard
+_CLIPBOARD_KEYS = re.compile(r"(?:(?:ctrl|control)\+(?:(?:shift|alt)\+)*|\^)[cvx]")
+
+_PATH_PARAMS = ("path", "source", "destination", "file_path", "save_path")
+_APP_PARAMS  = ("app_name", "process_name")
+
+
+@dataclass
+class PlanNode:
+    first: int                                 # 1-based step index
+    last:  int                                 # == first unless it's a fused macro
+    deps:  set[int] = field(default_factory=set)   # `last` of each node to wait for
+    read_only: bool = False                    # every step in it is READ_ONLY
+    launch:    bool = False                    # every step in it is in LAUNCHES
+
+
+def _keys(action: dict) -> set[str]:
+    """Shared resources a step touches: app names, file paths, clipboard."""
+    atype = action.get("type", "")
+    p     = action.get("params", {}) or {}
+    keys: set[str] = set()
+    for name in _APP_PARAMS:
+        val = p.get(name)
+        if isinstance(val, str) and val.strip():
+            keys.add("app:" + val.strip().lower())
+    for name in _PATH_PARAMS:
+        val = p.get(name)
+        if isinstance(val, str) and val.strip():
+            keys.add("path:" + val.strip().replace("\\", "/").rstrip("/").lower())
+    if atype in ("copy_to_clipboard", "read_clipboard", "type_text"):
+        keys.add("clipboard")
+    if atype == "press_keys" and _CLIPBOARD_KEYS.fullmatch(
+            str(p.get("keys", "")).lower().replace(" ", "")):
+        keys.add("clipboard")
+    if atype in ("set_volume", "media_control", "play_media"):
+        keys.add("audio")
+    return keys
+
+
+def _has_placeholder(action: dict) -> bool:
+    return any(isinstance(v, str) and "{" in v
+               for v in (action.get("params", {}) or {}).values())
+
+
+def _conflicts(a: dict, b: dict) -> bool:
+    if a["barrier"] or b["barrier"]:
+        return True
+    if a["keys"] & b["keys"]:
+        return True
+    if (a["user"] and (b["user"] or b["changer"])) or (b["user"] and a["changer"]):
+        return True
+    return a["serial"] and b["serial"]
+
+
+def build_plan(
+    actions:   list,
+    macros:    dict[int, int] = None,
+    serialize: set = frozenset(),
+) -> list[PlanNode]:
+    """
+    Group steps into nodes (fused macros become one node) and wire up deps.
+    Each node waits on every earlier node it conflicts with — no transitive
+    reduction; the lists are a handful of steps long.
+    """
+    macros = macros or {}
+    nodes: list[PlanNode] = []
+    info:  list[dict]     = []
+
+    idx = 1
+    while idx <= len(actions):
+        last  = macros.get(idx, idx)
+        steps = actions[idx-1:last]
+        types = {a.get("type", "") for a in steps}
+        info.append({
+            "barrier": bool(types & BARRIERS or types - _KNOWN),
+            "keys":    set().union(*(_keys(a) for a in steps)),
+            "user":    bool(types & FOCUS_USERS),
+            "changer": bool(types & FOCUS_CHANGERS),
+            "serial":  bool(types & set(serialize)),
+            "ph":      any(_has_placeholder(a) for a in steps),
+        })
+        nodes.append(PlanNode(first=idx, last=last, read_only=types <= READ_ONLY,
+                              launch=types <= LAUNCHES))
+        idx = last + 1
+
+    for i, node in enumerate(nodes):
+        for j in range(i):
+            if info[i]["ph"] or _conflicts(info[i], info[j]):
+                node.deps.add(nodes[j].last)
+    return nodes
+
+
+async def run_plan(
+    nodes:    list[PlanNode],
+    run_node: Callable[[PlanNode], Awaitable[bool]],
+    limit:    int = MAX_PARALLEL,
+) -> bool:
+    """
+    Run nodes as their deps complete, lowest step index first. A node with
+    side effects also waits until every earlier node has succeeded — or, for
+    a launch, succeeded or is a launch still running.
+    run_node returns False to stop the chain. Returns False if stopped.
+    """
+    pending  = list(nodes)
+    done:    set[int] = set()      # finished and succeeded (failure stops the run)
+    running: dict[asyncio.Task, PlanNode] = {}
+    stopped  = False
+
+    while pending or running:
+        if not stopped:
+            for node in list(pending):
+                if len(running) >= limit:
+                    break
+                in_flight  = {n.last for n in running.values() if n.launch} if node.launch else set()
+                earlier_ok = all(n.last in done or n.last in in_flight
+                                 for n in nodes if n.last < node.first)
+                if node.deps <= done and (node.read_only or earlier_ok):
+                    pending.remove(node)
+                    running[asyncio.create_task(run_node(node))] = node
+        if not running:
+            break   # stopped, or deps that can never finish
+
+        finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in finished:
+            node = running.pop(task)
+            try:
+                ok = task.result()
+            except Exception as e:
+                print(f"[SOUL] plan step {node.first} error: {e}")
+                ok = False
+            if ok:
+                done.add(node.last)
+            elif not stopped:
+                stopped = True
+                if pending:
+                    print(f"[SOUL] plan stopped after step {node.last} — "
+                          f"{len(pending)} step(s) not started")
+    return not stopped
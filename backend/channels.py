@@ -0,0 +1,152 @@
+"""
+SOUL — Client Channels  v1.0
+channels.py
+
+One outbound queue and writer task per WebSocket, so a slow or half-dead
+renderer can't hold up token streaming to everyone else.
+
+  Channel(ws, on_close)
+    .send(msg)       → queue and return at once (never awaits the socket)
+    .close(reason)   → stop the writer, close the socket, call on_close(ws)
+    .stats()         → queue depth, lag, send timing for /status
+
+Per message type:
+  coalesce   system_stats / processes / thumbnail — at most one of each is
+             queued; a newer one replaces it (system_stats deltas are
+             merged so no changed field is lost). Stale panel state is
+             never worth sending.
+  keep       everything else — stream tokens, actions, chat — is sent in
+             order and never dropped.
+
+Backpressure: a client that can't keep up isn't fed forever. If QUEUE_MAX
+messages are waiting, the oldest has waited LAG_MAX_SEC, or one send takes
+SEND_TIMEOUT_SEC, the channel closes the socket; the renderer reconnects
+and starts clean from a fresh init.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Optional
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+QUEUE_MAX        = 1000   # messages waiting before the client counts as stuck
+LAG_MAX_SEC      = 15.0   # oldest message waiting this long → stuck
+SEND_TIMEOUT_SEC = 5.0    # one send_json taking this long → half-dead socket
+
+_COALESCE = {"system_stats", "processes", "thumbnail"}
+
+
+def _merge(old: dict, new: dict) -> dict:
+    if new.get("type") == "system_stats":
+        return {**new, "full": bool(old.get("full") or new.get("full")),
+                "stats": {**old.get("stats", {}), **new.get("stats", {})}}
+    return new
+
+
+class Channel:
+    def __init__(self, ws, on_close: Optional[Callable] = None):
+        self.ws        = ws
+        self._on_close = on_close
+        self._queue: deque = deque()          # (message or coalesce key, queued_at)
+        self._pending: dict = {}              # coalesce key → latest message
+        self._ready    = asyncio.Event()
+        self._closed   = False
+        self._st = {"sent": 0, "coalesced": 0, "max_depth": 0, "max_lag_ms": 0.0,
+                    "send_ms_total": 0.0, "max_send_ms": 0.0}
+        self.close_reason = ""
+        self._writer = asyncio.create_task(self._run())
+
+    # ── Queueing ──────────────────────────────────────────────────────────────
+
+    def send(self, msg: dict):
+        if self._closed:
+            return
+        kind = msg.get("type", "")
+        if kind in _COALESCE:
+            if kind in self._pending:
+                self._pending[kind] = _merge(self._pending[kind], msg)
+                self._st["coalesced"] += 1
+                return
+            self._pending[kind] = msg
+            self._queue.append((kind, time.monotonic()))
+        else:
+            self._queue.append((msg, time.monotonic()))
+
+        depth = len(self._queue)
+        self._st["max_depth"] = max(self._st["max_depth"], depth)
+        if depth > QUEUE_MAX or self.lag > LAG_MAX_SEC:
+            self.close(f"too slow: {depth} queued, {self.lag:.1f}s behind")
+            return
+        self._ready.set()
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest queued message has been waiting (0 if none)."""
+        return time.monotonic() - self._queue[0][1] if self._queue else 0.0
+
+    # ── Writer ────────────────────────────────────────────────────────────────
+
+    async def _run(self):
+        while not self._closed:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            item, queued_at = self._queue.popleft()
+            msg = self._pending.pop(item) if isinstance(item, str) else item
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self.ws.send_json(msg), SEND_TIMEOUT_SEC)
+            except asyncio.TimeoutError:
+                self.close(f"send timed out after {SEND_TIMEOUT_SEC:.0f}s")
+                return
+            except Exception as e:
+                self.close(f"send failed: {type(e).__name__}")
+                return
+            done = time.monotonic()
+            st = self._st
+            st["sent"]          += 1
+            st["send_ms_total"] += (done - started) * 1000
+            st["max_send_ms"]    = max(st["max_send_ms"], (done - started) * 1000)
+            st["max_lag_ms"]     = max(st["max_lag_ms"], (started - queued_at) * 1000)
+
+    def close(self, reason: str = "closed"):
+        if self._closed:
+            return
+        self._closed     = True
+        self.close_reason = reason
+        self._queue.clear()
+        self._pending.clear()
+        self._ready.set()
+        if reason != "closed":
+            print(f"[SOUL] ws client dropped — {reason}")
+            asyncio.create_task(self._close_socket())
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if self._on_close:
+            self._on_close(self.ws)
+
+    async def _close_socket(self):
+        try:
+            await asyncio.wait_for(self.ws.close(code=1013), SEND_TIMEOUT_SEC)
+        except Exception:
+            pass
+
+    # ── Metrics ───────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        st     = self._st
+        client = getattr(self.ws, "client", None)
+        return {
+            "client":      f"{client.host}:{client.port}" if client else "?",
+            "depth":       len(self._queue),
+            "max_depth":   st["max_depth"],
+            "lag_ms":      round(self.lag * 1000, 1),
+            "max_lag_ms":  round(st["max_lag_ms"], 1),
+            "sent":        st["sent"],
+            "coalesced":   st["coalesced"],
+            "avg_send_ms": round(st["send_ms_total"] / st["sent"], 2) if st["sent"] else 0,
+            "max_send_ms": round(st["max_send_ms"], 2),
+        }
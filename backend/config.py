@@ -55,6 +55,7 @@ DEFAULT_CONFIG = {
         "screen_capture_interval_sec": 5,
         "system_poll_interval_sec":    3,
         "vision_enabled":              True,
+        "structured_vision":           True,   # JSON screen state alongside the summary
         "always_on_listening":         True,
     },
     "actions": {
@@ -66,6 +67,7 @@ DEFAULT_CONFIG = {
         "db_path":                   "soul_memory.db",
         "pattern_trigger_threshold":  3,
         "max_context_events":         50,
+        "write_flush_ms":             250,   # write-behind durability window
     },
 }
 
@@ -29,6 +29,16 @@ MODEL_CHAIN = [
 
 _FAST_MODEL = "llama-3.1-8b-instant"
 
+_STRUCTURED_VISION_PROMPT = (
+    "Describe this screen as ONLY a JSON object, no other text:\n"
+    '{"app": "foreground application name", '
+    '"title": "its window title as shown", '
+    '"alerts": ["each visible error, warning, crash dialog, failed build or '
+    'notification, a few words each — [] if none"], '
+    '"text": ["up to 5 short key pieces of visible text"], '
+    '"summary": "2-3 specific, factual sentences"}'
+)
+
 VISION_MODELS = [
     "meta-llama/llama-4-scout-17b-16e-instruct",
 ]
@@ -74,6 +84,9 @@ class GroqClient:
         self._cidx = self._vidx = 0
         self.conversation_history: list[dict] = []
         self.active_model = MODEL_CHAIN[0]
+        # async (user_message) -> str; a system block of relevant older memory.
+        # Set by main.py (memory.patterns.recall_for_prompt).
+        self.memory_retriever = None
         if not self.api_key:
             print("[SOUL] WARNING: No API key — add GROQ_API_KEY to .env")
 
@@ -199,6 +212,9 @@ class GroqClient:
         if context_packet:
             msgs.append({"role": "system",
                          "content": f"<context>\n{context_packet}\n</context>"})
+        recalled = await self._recall(user_message)
+        if recalled:
+            msgs.append({"role": "system", "content": recalled})
         msgs.extend(self.conversation_history[-8:])
         msgs.append({"role": "user", "content": user_message})
 
@@ -376,6 +392,9 @@ class GroqClient:
         if context_packet:
             msgs.append({"role": "system",
                          "content": f"<context>\n{context_packet}\n</context>"})
+        recalled = await self._recall(user_message)
+        if recalled:
+            msgs.append({"role": "system", "content": recalled})
         msgs.extend(self.conversation_history[-8:])
         msgs.append({"role": "user", "content": user_message})
         r = await self._call(msgs, max_tokens=max_tokens)
@@ -387,6 +406,15 @@ class GroqClient:
             return parsed
         return {"text": r.get("error", "Something went wrong."), "action": None}
 
+    async def _recall(self, user_message: str) -> str:
+        if not self.memory_retriever:
+            return ""
+        try:
+            return await self.memory_retriever(user_message) or ""
+        except Exception as e:
+            print(f"[SOUL] memory recall error: {e}")
+            return ""
+
     # ── Low-level HTTP call ───────────────────────────────────────────────────
     async def _call(self, messages: list, max_tokens: int = None,
                     temperature: float = None) -> dict:
@@ -448,10 +476,26 @@ class GroqClient:
         return {"success": False, "error": "All models unavailable. Check connection."}
 
     # ── Vision ────────────────────────────────────────────────────────────────
-    async def vision_query(self, image_base64: str, prompt: str = "") -> str:
+    async def vision_query(self, image_base64: str, prompt: str = "",
+                           mode: str = "describe") -> str:
+        """
+        mode="describe" — general screen description (prompt optional).
+        mode="verify"   — prompt is a yes/no question; the model is constrained to
+                          a tiny JSON answer with a 10-token budget. Parse the
+                          return value with parse_verify_answer().
+        mode="structured" — JSON screen state (app, title, alerts, text, summary).
+                          Parse with perception.system.ScreenState.from_reply().
+        """
         pool = self._vision_keys + self._misc_keys + self._chat_keys
         if not pool: return "Vision disabled"
 
+        verify = mode == "verify"
+        if verify:
+            prompt = (f"{prompt} Answer ONLY with JSON: "
+                      '{"answer":"yes"} or {"answer":"no"}')
+        elif mode == "structured":
+            prompt = prompt or _STRUCTURED_VISION_PROMPT
+
         try:
             import base64 as _b64
             from PIL import Image
@@ -479,8 +523,10 @@ class GroqClient:
                                 "url": f"data:image/png;base64,{image_base64}"}},
                             {"type": "text", "text": prompt or default_prompt},
                         ]}],
-                        "max_tokens": 250,
+                        "max_tokens": 10 if verify else 350 if mode == "structured" else 250,
                     }
+                    if verify:
+                        payload["temperature"] = 0
                     async with httpx.AsyncClient(
                             timeout=httpx.Timeout(20.0, connect=5.0)) as c:
                         r = await c.post(
@@ -497,6 +543,20 @@ class GroqClient:
                     print(f"[SOUL] vision {model}: {ex}"); continue
         return "Screen vision unavailable"
 
+    @staticmethod
+    def parse_verify_answer(text: str):
+        """True/False from a verify-mode vision reply, None if it can't be read."""
+        t = (text or "").strip().lower()
+        if not t or t.startswith("screen vision unavail") or t == "vision disabled":
+            return None
+        try:
+            ans = str(json.loads(t[t.index("{"):t.rindex("}") + 1]).get("answer", ""))
+        except Exception:
+            ans = t
+        if re.search(r"\byes\b|\btrue\b", ans): return True
+        if re.search(r"\bno\b|\bfalse\b", ans): return False
+        return None
+
     # ── Wake greeting ─────────────────────────────────────────────────────────
     async def wake(self, context: dict) -> dict:
         text = await self.wake_greeting(context)
@@ -523,6 +583,26 @@ class GroqClient:
                 pass
         return "hey."
 
+    # ── Background summaries ──────────────────────────────────────────────────
+    async def summarize(self, prompt: str, max_tokens: int = 120) -> str:
+        """One-shot 8B completion for memory rollups. "" on any failure."""
+        pool = self._misc_keys or self._chat_keys or self._all_keys
+        for _key in pool:
+            try:
+                async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as c:
+                    r = await c.post(
+                        f"{GROQ_API_BASE}/chat/completions",
+                        headers={"Authorization": f"Bearer {_key}",
+                                 "Content-Type": "application/json"},
+                        json={"model": _FAST_MODEL,
+                              "messages": [{"role": "user", "content": prompt}],
+                              "max_tokens": max_tokens, "temperature": 0.3})
+                    if r.status_code == 200:
+                        return r.json()["choices"][0]["message"]["content"].strip()
+            except Exception:
+                pass
+        return ""
+
     # ── Streaming action-token filter ─────────────────────────────────────────
     def _is_action_token(self, tok: str, full_text: str) -> bool:
         _opens  = len(re.findall(r'<\s*ACTIONS?\s*>',  full_text, re.IGNORECASE))
@@ -17,7 +17,7 @@ import sys
 from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 sys.path.insert(0, os.path.dirname(__file__))
@@ -27,28 +27,51 @@ from config import load_config, save_config, is_first_run, DEFAULT_CONFIG
 from groq_client import GroqClient
 import time
 import time
-from perception.system import ScreenWatcher, SystemMonitor
+from perception.system import ScreenWatcher, SystemMonitor, top_processes
 from perception.observer import VisionObserver
+from perception.prefilter import prefilter_stats
 from actions.executor import ActionExecutor, PendingAction
-from memory.patterns import PatternEngine, format_memory_for_llm, save_exchange, scrub_stale_names
+from actions.readiness import app_window_present, app_windows, wait_until_ready
+from actions.scheduler import PlanNode, build_plan, run_plan
+from memory.patterns import (PatternEngine, close_db, configure_db, database,
+                             format_memory_for_llm_async, index_screen_summary, recall_for_prompt,
+                             record_launch_time, VECTORS_PATH,
+                             save_exchange, save_exchange_async, scrub_stale_names)
+from memory.rollup import SessionRollup, memory_digest, memory_digest_async
+from channels import Channel
+from topics import Topics
 from verifier import ActionVerifier, VERIFIABLE
 
+CHAT_VISION_HOLD_SEC = 120   # vision keeps running this long after a user message or connect
+
 
 class SOULState:
     def __init__(self):
         self.config = load_config()
         self.groq = GroqClient()
+        self.groq.memory_retriever = recall_for_prompt
         self.system_monitor = SystemMonitor()
+        configure_db(flush_ms=self.config["memory"].get("write_flush_ms"))
         self.pattern_engine = PatternEngine(
             threshold=self.config["memory"]["pattern_trigger_threshold"]
         )
+        self.rollup = SessionRollup(summarizer=self.groq.summarize)
         self.executor = ActionExecutor(on_pending=self._on_pending, get_tier=lambda: self.permission_tier)
         self.screen_watcher: Optional[ScreenWatcher] = None
         self.observer: Optional[VisionObserver] = None
         self.verifier: Optional[ActionVerifier] = None   # set in lifespan after screen_watcher
         self._last_user_msg_time: float = time.time()
+        self._last_indexed_screen: tuple = ()  # (watcher id, version) last indexed
         self.voice_listener = None
         self.ws_clients: list[WebSocket] = []
+        self.channels: dict[WebSocket, Channel] = {}   # per-client outbound queues
+        self.topics = Topics(
+            send           = self._send,
+            get_stats      = lambda: self.system_monitor.snapshot,
+            get_processes  = lambda: asyncio.to_thread(top_processes),
+            get_thumb_etag = lambda: self.screen_watcher.thumbnail_etag if self.screen_watcher else "",
+            on_change      = self.sync_capture_demand,
+        )
         self.entity_name = self.config["entity"]["name"]
         self.screen_enabled = self.config["perception"].get("vision_enabled", True)
         self.permission_tier  = self.config["entity"].get("permission_tier", "standard")
@@ -58,14 +81,59 @@ class SOULState:
         # Name scrub removed in v1.6 -- no hardcoded names in distribution builds.
         # scrub_stale_names() remains available for a future Settings rename flow.
 
-        # Inject persistent memory into LLM on boot
-        memory = format_memory_for_llm(limit=8)
+        # Inject persistent memory into LLM on boot — precomputed session/day
+        # summaries plus the last few messages not rolled up yet (memory/rollup.py)
+        memory = memory_digest()
         patterns = self.pattern_engine.summary_for_llm()
         combined = "\n\n".join(x for x in [memory, patterns] if x and "No patterns" not in x)
         if combined:
             self.groq.inject_memory(combined)
             print(f"[SOUL] Memory loaded")
 
+    def new_screen_watcher(self) -> ScreenWatcher:
+        sw = ScreenWatcher(self.groq, thumb_interval=2, vision_interval=6,
+                           structured=self.config["perception"].get("structured_vision", True))
+        self.sync_capture_demand(sw)
+        return sw
+
+    def sync_capture_demand(self, sw: Optional[ScreenWatcher] = None):
+        """
+        Point the watcher's standing leases at their real consumers: vision
+        while the observer is running with screen on and someone connected to
+        hear it, thumbnails while any client is subscribed to the thumbnail
+        topic. Chat holds its own timed vision lease (hold_vision_for_chat).
+        """
+        sw = sw or self.screen_watcher
+        if sw is None:
+            return
+        observing = bool(self.observer and self.screen_enabled and self.ws_clients)
+        for kind, holder, wanted in (("vision", "observer", observing),
+                                     ("thumb",  "clients",  self.topics.wants("thumbnail"))):
+            if wanted:
+                sw.want(kind, holder)
+            else:
+                sw.release(kind, holder)
+
+    def hold_vision_for_chat(self):
+        """Keep screen summaries fresh for CHAT_VISION_HOLD_SEC — renewed per message."""
+        if self.screen_enabled and self.screen_watcher:
+            self.screen_watcher.want("vision", "chat", ttl=CHAT_VISION_HOLD_SEC)
+
+    def add_client(self, ws: WebSocket):
+        self.channels[ws] = Channel(ws, on_close=self.drop_client)
+        self.ws_clients.append(ws)
+        self.hold_vision_for_chat()
+        self.sync_capture_demand()
+
+    def drop_client(self, ws: WebSocket):
+        ch = self.channels.pop(ws, None)
+        if ch:
+            ch.close()          # calls back here once; the channel is already gone
+        if ws in self.ws_clients:
+            self.ws_clients.remove(ws)
+        self.topics.drop(ws)
+        self.sync_capture_demand()
+
     def _on_pending(self, pending: PendingAction):
         asyncio.create_task(self._broadcast({
             "type": "action_pending",
@@ -74,16 +142,19 @@ class SOULState:
             "display_text": pending.display_text
         }))
 
+    async def _send(self, ws: WebSocket, message: dict):
+        # Queued on the client's channel (channels.py) — returns at once,
+        # whatever state that client's socket is in
+        ch = self.channels.get(ws)
+        if ch:
+            ch.send(message)
+
     async def _broadcast(self, message: dict):
-        dead = []
-        for ws in self.ws_clients:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(ws)
-        for d in dead:
-            if d in self.ws_clients:
-                self.ws_clients.remove(d)
+        # Topic messages (actions) go to that topic's subscribers only
+        topic   = self.topics.route(message.get("type", ""))
+        targets = self.topics.subscribers(topic) if topic else list(self.ws_clients)
+        for ws in targets:
+            await self._send(ws, message)
 
     async def broadcast(self, msg: dict):
         await self._broadcast(msg)
@@ -104,26 +175,27 @@ class SOULState:
         }
 
         # Brief thinking state — feels like she's actually reading the room
-        await ws.send_json({"type": "thinking", "active": True})
+        await self._send(ws, {"type": "thinking", "active": True})
         await asyncio.sleep(1.8)
 
         response = await self.groq.wake(context)
 
-        await ws.send_json({"type": "thinking", "active": False})
-        await ws.send_json({"type": "assistant_message", "text": response["text"], "is_wake": True})
+        await self._send(ws, {"type": "thinking", "active": False})
+        await self._send(ws, {"type": "assistant_message", "text": response["text"], "is_wake": True})
 
-        save_exchange("assistant", response["text"])
+        await save_exchange_async("assistant", response["text"])
 
     async def process(self, text: str):
         """User message -> LLM -> response/action."""
         # Track activity time for ambient idle + observer cooldown
         self._last_user_msg_time = time.time()
+        self.hold_vision_for_chat()
         if self.observer:
             self.observer.notify_user_active()
         await self.broadcast({"type": "user_message", "text": text})
         await self.broadcast({"type": "thinking", "active": True})
 
-        save_exchange("user", text)
+        await save_exchange_async("user", text)
 
         stats = self.system_monitor.snapshot
         active_task = stats.get("task_label") or stats.get("active_app", "Unknown")
@@ -134,24 +206,28 @@ class SOULState:
             # If watcher has never fired (_lvt==0), treat as 20s old (not 1.7 billion)
             # so build_context shows "ON — no fresh screenshot" not "vision pending forever"
             screen_summary_age = (_t.time() - _lvt) if _lvt > 0 else 20
+            # New screen summaries go into semantic memory (memory/vectors.py)
+            _ver = (id(self.screen_watcher), getattr(self.screen_watcher, "version", 0))
+            if screen_summary and _ver != self._last_indexed_screen:
+                self._last_indexed_screen = _ver
+                if not screen_summary.startswith("Screen vision unavail"):
+                    index_screen_summary(screen_summary)
         else:
             screen_summary = ""
             screen_summary_age = 999
 
-        trigger = self.pattern_engine.check_trigger("app_focus", stats.get("active_app", ""))
+        trigger = await self.pattern_engine.check_trigger_async("app_focus", stats.get("active_app", ""))
         if trigger:
             await self.notify(f"Pattern: {trigger['display_text']}", level="pattern")
 
-        self.pattern_engine.observe("voice_command", text, {"app": active_task})
+        await self.pattern_engine.observe_async("voice_command", text, {"app": active_task})
 
         # ── Screen watcher health check ─────────────────────────────────────
-        # Watcher can be _running=True but silently stuck (no new captures).
-        # If last capture was >90s ago with screen enabled, restart it.
+        # Watcher can be _running=True but silently stuck (capture loop hasn't
+        # come round in 90s while captures are wanted). If so, restart it.
+        # A suspended watcher (no demand) isn't stuck.
         if self.screen_enabled and self.screen_watcher:
-            import time as _tw
-            _lwt = getattr(self.screen_watcher, '_last_vision_time', 0)
-            _wstuck = (_tw.time() - _lwt) > 90 if _lwt > 0 else False
-            if _wstuck and getattr(self.screen_watcher, '_running', False):
+            if self.screen_watcher.stalled:
                 print("[SOUL] Screen watcher appears stuck, restarting...")
                 self.screen_watcher.stop()
                 await asyncio.sleep(0.3)
@@ -210,7 +286,7 @@ class SOULState:
         # Signal stream complete — frontend finalises the bubble
         await self.broadcast({"type": "stream_end", "text": response.get("text", "")})
 
-        save_exchange("assistant", response.get("text", ""))
+        await save_exchange_async("assistant", response.get("text", ""))
 
         actions = response.get("actions") or []
         if not actions and response.get("action"):
@@ -218,14 +294,12 @@ class SOULState:
 
         if actions:
             total = len(actions)
-            # App weight tables for smarter timing
-            _HEAVY = {"chrome","firefox","edge","code","discord","steam","spotify",
-                      "obs","photoshop","premiere","blender","slack","teams","zoom"}
-            _UWP   = {"calculator","store","photos","mail","calendar","maps",
-                       "notepad","snipping tool","xbox","settings","terminal"}
-            _LIGHT = {"paint","wordpad","cmd","powershell","terminal"}
-            # Result threading: previous step's output available as {prev} / {clipboard} in params
-            _ctx: dict           = {}
+            # Readiness waits for launched apps, keyed by step index.
+            # Started right after open_app fires so the poll overlaps verification.
+            _launches: dict[int, asyncio.Task] = {}
+            # Result threading: each step's output, keyed by step index.
+            # {prev} / {clipboard} in params resolve to the latest earlier output.
+            _outputs: dict[int, dict] = {}
             _last_focus_ok:   bool = True   # assume focus until proven otherwise
             _last_focus_title: str = ""
 
@@ -241,12 +315,87 @@ class SOULState:
                 except Exception as _e:
                     return {"success": False, "message": str(_e)}
 
-            for idx, action in enumerate(actions, 1):
+            # ── Fused macros: runs of window/input steps in ONE executor call ──
+            # Each fused step still gets its own action_step / action_result.
+            # Fused steps skip the verifier — the macro checks window presence
+            # and foreground focus itself. If a step fails inside the macro,
+            # that step and the rest fall through to the normal path below.
+            _macros = self.executor.plan_macros(actions) if total > 1 else {}
+            # A macro's in-script wait accepts any window of the app, so opening
+            # an app that already has one would count as ready at once. Runs
+            # like that go step by step, where readiness waits for a new window.
+            for _start, _end in list(_macros.items()):
+                for i in range(_start, _end + 1):
+                    _a = actions[i-1]
+                    if _a.get("type") == "open_app" and await asyncio.to_thread(
+                            app_window_present, _a.get("params", {}).get("app_name", "")):
+                        del _macros[_start]
+                        break
+
+            def _ctx_before(idx: int) -> dict:
+                ctx: dict = {}
+                for j in range(idx - 1, 0, -1):
+                    for ck, cv in _outputs.get(j, {}).items():
+                        ctx.setdefault(ck, cv)
+                return ctx
+
+            async def _run_fused(start: int, end: int) -> int:
+                done = start - 1
+
+                async def _on_event(step: int, phase: str, result: Optional[dict]):
+                    nonlocal done, _last_focus_ok, _last_focus_title
+                    gidx = start + step - 1
+                    a    = actions[gidx - 1]
+                    a_p  = a.get("params", {})
+                    if phase == "begin":
+                        await self.broadcast({
+                            "type": "action_step",
+                            "step": gidx, "total": total,
+                            "display_text": a.get("display_text", "Performing action…"),
+                        })
+                        return
+                    if not result.get("success"):
+                        return   # resumed one-at-a-time; that path reports it
+                    done = gidx
+                    a_type = a.get("type", "")
+                    if a_type in ("open_app", "open"):
+                        # Only apps with no window beforehand get fused (see above);
+                        # a launch that timed out is censored, not a launch time
+                        if result.get("ready"):
+                            record_launch_time(a_p.get("app_name", ""), result.get("elapsed", 0.0))
+                        await self.pattern_engine.observe_async("app_open", a_p.get("app_name", ""))
+                    elif a_type == "focus_window":
+                        _last_focus_ok, _last_focus_title = True, a_p.get("title", "").lower()
+                    elif a_type == "type_text":
+                        _last_focus_ok, _last_focus_title = True, a_p.get("window_title", "").lower()
+                    _outputs[gidx] = {"prev": result.get("message", "")}
+                    await self.broadcast({
+                        "type": "action_result",
+                        "result": result,
+                        "step": gidx,
+                        "total": total,
+                    })
+                    self.groq.inject_action_result(
+                        a_type, f"[ACTION OK] {a.get('display_text') or a_type}: {result.get('message', 'OK')}")
+
+                try:
+                    await self.executor.run_macro(actions[start-1:end], _on_event)
+                except Exception as _e:
+                    print(f"[SOUL] macro error: {_e}")
+                if done < end:
+                    print(f"[SOUL] macro stopped at step {done + 1} — continuing one at a time")
+                return done
+
+            async def _run_step(idx: int, deps: set) -> bool:
+                """One step, start to finish. Returns False to stop the chain."""
+                nonlocal _last_focus_ok, _last_focus_title
+                action       = actions[idx - 1]
                 atype        = action.get("type", "")
                 display_text = action.get("display_text", "Performing action…")
 
                 # Resolve context substitutions in params ({prev}, {clipboard}, etc.)
                 raw_params = action.get("params", {})
+                _ctx       = _ctx_before(idx)
                 params: dict = {}
                 for k, v in raw_params.items():
                     if isinstance(v, str) and "{" in v and _ctx:
@@ -261,23 +410,22 @@ class SOULState:
                     "display_text": display_text
                 })
 
-                # Dynamic gap between steps (app-aware)
-                if idx > 1:
-                    prev_type = actions[idx-2].get("type", "")
-                    prev_app  = actions[idx-2].get("params", {}).get("app_name", "").lower()
+                # Gap after the steps this one depends on: wait for a launched
+                # app's window, not a fixed sleep. Independent steps start at once.
+                if deps:
+                    prev_type = actions[max(deps) - 1].get("type", "")
                     curr_type = atype
-                    if prev_type in ("open_app", "open"):
-                        if   prev_app in _HEAVY: gap = 4.5
-                        elif prev_app in _UWP:   gap = 3.2
-                        elif prev_app in _LIGHT: gap = 1.6
-                        else:                    gap = 2.8
+                    _waits    = [_launches[d] for d in deps if d in _launches]
+                    if _waits:
+                        await asyncio.gather(*_waits)
+                    elif prev_type in ("open_app", "open"):
+                        pass   # launched inside a macro, which already waited
                     elif curr_type == "type_text":
-                        gap = 1.2
+                        await asyncio.sleep(1.2)
                     elif prev_type == "focus_window":
-                        gap = 1.0
+                        await asyncio.sleep(1.0)
                     else:
-                        gap = 0.6
-                    await asyncio.sleep(gap)
+                        await asyncio.sleep(0.6)
 
                 # ── PRE-CAPTURE: snapshot screen before action fires ──────────
                 # Verifier needs to know what the screen looked like before.
@@ -287,6 +435,11 @@ class SOULState:
 
                 # ── EXECUTE ACTION ────────────────────────────────────────────
 
+                if atype in ("open_app", "open"):
+                    _launch_app   = params.get("app_name", "")
+                    _launch_start = time.monotonic()
+                    _before       = await asyncio.to_thread(app_windows, _launch_app)
+
                 if atype == "focus_window":
                     # focus_window: retry up to 3× with backoff (window may not be ready)
                     result = None
@@ -352,6 +505,15 @@ class SOULState:
                     except Exception as _ex:
                         result = {"success": False, "message": str(_ex)}
 
+                # Start polling for the launched app's window in the background;
+                # the next step awaits it instead of sleeping a fixed gap.
+                if atype in ("open_app", "open") and result.get("success"):
+                    _launches[idx] = asyncio.create_task(wait_until_ready(
+                        _launch_app, started=_launch_start,
+                        record=not _before, before=_before))
+                    # App opens feed the sequence miner (memory/patterns.py)
+                    await self.pattern_engine.observe_async("app_open", _launch_app)
+
                 # ── POST-EXECUTE: closed loop verification ────────────────────
                 # For verifiable actions: check screen, attempt one fallback if failed,
                 # then inject visually-grounded result into LLM history.
@@ -396,9 +558,9 @@ class SOULState:
                 for _key in ("content", "value", "data", "text", "message"):
                     _val = result.get(_key)
                     if _val and isinstance(_val, str) and not _val.startswith("__"):
-                        _ctx["prev"] = _val
+                        _outputs[idx] = {"prev": _val}
                         if _key == "content":
-                            _ctx["clipboard"] = _val
+                            _outputs[idx]["clipboard"] = _val
                         break
 
                 # Handle special toggle_screen_capture result
@@ -429,6 +591,7 @@ class SOULState:
                                 ),
                             )
                             asyncio.create_task(self.observer.start())
+                            self.sync_capture_demand()
                         # Update verifier's screen reference
                         if self.verifier and self.screen_watcher:
                             self.verifier.screen = self.screen_watcher
@@ -438,6 +601,7 @@ class SOULState:
                         if self.observer:
                             self.observer.stop()
                             self.observer = None
+                            self.sync_capture_demand()
                         if self.verifier:
                             self.verifier.screen = None
                     result["message"] = f"Screen capture {'enabled' if new_state else 'disabled'}"
@@ -486,7 +650,28 @@ class SOULState:
                 # Stop chain on failure (unless it's an info step)
                 if not result.get("success") and not result.get("auto") and total > 1:
                     if atype not in ("get_running_processes","get_system_info","check_battery","get_time"):
-                        break
+                        return False
+                return True
+
+            async def _run_node(node: PlanNode) -> bool:
+                if node.first == node.last:
+                    return await _run_step(node.first, node.deps)
+                done = await _run_fused(node.first, node.last)
+                # Macro stopped early — the rest of its run goes one at a time
+                for i in range(done + 1, node.last + 1):
+                    if not await _run_step(i, {i - 1} if i > node.first else node.deps):
+                        return False
+                return True
+
+            # ── Schedule: independent steps run concurrently ──────────────────
+            # Screen verification diffs before/after frames, so verifiable steps
+            # are kept in order while it's on.
+            _verifying = bool(self.verifier and self.screen_enabled)
+            _plan = build_plan(actions, _macros,
+                               serialize=VERIFIABLE if _verifying else set())
+            if len(_plan) < total:
+                print(f"[SOUL] plan: {total} steps in {len(_plan)} nodes")
+            await run_plan(_plan, _run_node)
 
 
 state = SOULState()
@@ -500,9 +685,11 @@ async def lifespan(app: FastAPI):
     # Collect stats NOW before any WebSocket connects
     state.system_monitor.collect_now()
     asyncio.create_task(state.system_monitor.start())
+    asyncio.create_task(state.rollup.start())
+    asyncio.create_task(state.topics.start())
 
     if state.config["perception"]["vision_enabled"]:
-        state.screen_watcher = ScreenWatcher(state.groq, thumb_interval=2, vision_interval=6)
+        state.screen_watcher = state.new_screen_watcher()
         asyncio.create_task(state.screen_watcher.start())
 
     # ── Action Verifier — closed loop between eyes and hands ────────────────
@@ -531,6 +718,7 @@ async def lifespan(app: FastAPI):
             ),
         )
         asyncio.create_task(state.observer.start())
+        state.sync_capture_demand()
         print("[SOUL] Vision observer started")
 
     # Try to initialise SOUL's virtual workdesk (best-effort — no crash if unavailable)
@@ -550,10 +738,14 @@ async def lifespan(app: FastAPI):
     yield
 
     state.system_monitor.stop()
+    state.rollup.stop()
+    state.topics.stop()
     if state.observer:
         state.observer.stop()
     if state.screen_watcher:
         state.screen_watcher.stop()
+    state.pattern_engine.flush()
+    close_db()
 
 
 
@@ -582,7 +774,11 @@ async def reset_all():
         errors.append(f"config: {e}")
 
     # 2. Delete memory DB (+ SQLite WAL/SHM side files)
+    #    Close the pooled connections first — Windows won't unlink an open file.
+    #    The next memory call reopens a fresh DB with the schema in place.
     try:
+        close_db()
+        state.pattern_engine.reset()
         cfg      = state.config
         db_name  = cfg.get("memory", {}).get("db_path", "soul_memory.db")
         data_dir = _os.environ.get("SOUL_DATA_DIR", "").strip()
@@ -591,6 +787,8 @@ async def reset_all():
             p = _P(str(db_path) + ext) if ext else db_path
             if p.exists():
                 p.unlink()
+        if VECTORS_PATH.exists():
+            VECTORS_PATH.unlink()
         wiped.append("memory_db")
     except Exception as e:
         errors.append(f"memory_db: {e}")
@@ -609,30 +807,53 @@ async def reset_all():
 
 
 @app.get("/export-log")
-async def export_log():
-    from memory.patterns import get_db
-    from fastapi.responses import PlainTextResponse
-    conn = get_db()
-    rows = conn.execute(
-        "SELECT timestamp, role, content FROM session_history ORDER BY id ASC"
-    ).fetchall()
-    conn.close()
-    cfg  = load_config()
-    name = cfg["entity"].get("name", "SOUL")
-    user = cfg["entity"].get("user_name", "User")
-    now  = __import__("datetime").datetime.now()
-    lines = [f"# {name} Debug Chat Log",
-             f"Exported: {now.strftime('%Y-%m-%d %H:%M:%S')}",
-             f"Entity: {name}  |  User: {user}", "---", ""]
-    for r in rows:
-        ts   = r["timestamp"][:19].replace("T", " ")
-        role = name if r["role"] == "assistant" else user
-        lines.append(f"[{ts}] **{role}**")
-        lines.append(r["content"])
-        lines.append("")
-    fname = f"soul_log_{now.strftime('%Y%m%d_%H%M%S')}.md"
-    return PlainTextResponse("\n".join(lines), media_type="text/markdown",
-                              headers={"Content-Disposition": f'attachment; filename="{fname}"'})
+async def export_log(since: Optional[str] = None, until: Optional[str] = None,
+                     limit: Optional[int] = None, format: str = "md"):
+    """
+    Chat log download, streamed a page at a time. since/until are ISO
+    timestamps or prefixes (until is inclusive); format is "md" or "jsonl".
+    """
+    from memory.patterns import iter_history
+    from fastapi.responses import StreamingResponse
+    from datetime import datetime as _dt
+    name  = state.config["entity"].get("name", "SOUL")
+    user  = state.config["entity"].get("user_name", "User")
+    now   = _dt.now()
+    jsonl = format == "jsonl"
+
+    async def _body():
+        if not jsonl:
+            yield (f"# {name} Debug Chat Log\n"
+                   f"Exported: {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                   f"Entity: {name}  |  User: {user}\n---\n\n")
+        chunk = []
+        async for r in iter_history(since, until, limit):
+            if jsonl:
+                chunk.append(json.dumps(r, ensure_ascii=False) + "\n")
+            else:
+                ts   = r["timestamp"][:19].replace("T", " ")
+                role = name if r["role"] == "assistant" else user
+                chunk.append(f"[{ts}] **{role}**\n{r['content']}\n\n")
+            if len(chunk) >= 200:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    ext   = "jsonl" if jsonl else "md"
+    fname = f"soul_log_{now.strftime('%Y%m%d_%H%M%S')}.{ext}"
+    return StreamingResponse(_body(),
+                             media_type="application/x-ndjson" if jsonl else "text/markdown",
+                             headers={"Content-Disposition": f'attachment; filename="{fname}"'})
+
+
+@app.get("/history")
+async def history(before_id: Optional[int] = None, limit: int = 50):
+    """One page of chat history for the workspace, newest page first."""
+    from memory.patterns import history_page
+    return await history_page(before_id, max(1, min(limit, 500)))
+
+
 app.add_middleware(CORSMiddleware, allow_origins=["*"],
                    allow_methods=["*"], allow_headers=["*"])
 
@@ -640,7 +861,7 @@ app.add_middleware(CORSMiddleware, allow_origins=["*"],
 @app.websocket("/ws")
 async def ws_endpoint(websocket: WebSocket):
     await websocket.accept()
-    state.ws_clients.append(websocket)
+    state.add_client(websocket)
 
     # Send init metadata
     import os as _os
@@ -652,7 +873,7 @@ async def ws_endpoint(websocket: WebSocket):
     _obj_map = {"she/her": "her", "he/him": "him", "they/them": "them", "it/its": "it"}
     _pron_object = _obj_map.get(_pronouns, "her")
 
-    await websocket.send_json({
+    await state._send(websocket, {
         "type": "init",
         "entity_name": state.entity_name,
         "screen_enabled": state.screen_enabled,
@@ -673,17 +894,16 @@ async def ws_endpoint(websocket: WebSocket):
     try:
         while True:
             data = await websocket.receive_json()
-            await _handle(data)
+            await _handle(data, websocket)
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"[SOUL] WS error: {e}")
     finally:
-        if websocket in state.ws_clients:
-            state.ws_clients.remove(websocket)
+        state.drop_client(websocket)
 
 
-async def _handle(data: dict):
+async def _handle(data: dict, websocket: Optional[WebSocket] = None):
     t = data.get("type")
     if t == "user_text":
         text = data.get("text", "").strip()
@@ -696,10 +916,10 @@ async def _handle(data: dict):
     elif t == "action_reject":
         state.executor.reject(data.get("action_id", ""))
     elif t == "system_status":
-        thumb = state.screen_watcher.thumbnail_b64 if state.screen_watcher else ""
-        await state.broadcast({"type": "system_stats",
-                                "stats": state.system_monitor.snapshot,
-                                "thumbnail": thumb})
+        # Old polling clients — answer the one that asked. Subscribers to the
+        # stats topic get pushed updates instead.
+        await state._send(websocket, {"type": "system_stats", "full": True,
+                                      "stats": state.system_monitor.snapshot})
     elif t == "toggle_screen":
         enabled = data.get("enabled", True)
         state.screen_enabled = enabled
@@ -712,7 +932,7 @@ async def _handle(data: dict):
                 if not state.screen_watcher._running:
                     asyncio.create_task(state.screen_watcher.start())
             else:
-                state.screen_watcher = ScreenWatcher(state.groq, thumb_interval=2, vision_interval=6)
+                state.screen_watcher = state.new_screen_watcher()
                 asyncio.create_task(state.screen_watcher.start())
             # Restart observer with full context wiring (Brain->Eyes link)
             if state.screen_watcher and not state.observer:
@@ -730,6 +950,7 @@ async def _handle(data: dict):
                     ),
                 )
                 asyncio.create_task(state.observer.start())
+                state.sync_capture_demand()
             # Sync verifier with new screen_watcher
             if state.verifier:
                 state.verifier.screen = state.screen_watcher
@@ -737,18 +958,19 @@ async def _handle(data: dict):
             # Stop watcher + observer immediately
             if state.screen_watcher:
                 state.screen_watcher.stop()
-                state.screen_watcher.thumbnail_b64 = ""
+                state.screen_watcher.clear_thumbnail()
                 state.screen_watcher.summary = ""
             if state.observer:
                 state.observer.stop()
                 state.observer = None
+                state.sync_capture_demand()
             # Verifier degrades gracefully with screen=None
             if state.verifier:
                 state.verifier.screen = None
         await state.broadcast({"type": "screen_toggled", "enabled": enabled})
     elif t == "clear_history":
         state.groq.reset()
-        memory = format_memory_for_llm(limit=4)
+        memory = await memory_digest_async()
         if memory:
             state.groq.inject_memory(memory)
     elif t == "set_permission_tier":
@@ -758,26 +980,39 @@ async def _handle(data: dict):
         cfg["entity"]["permission_tier"] = tier
         save_config(cfg)
         await state.broadcast({"type": "tier_changed", "tier": tier})
+    elif t in ("subscribe", "unsubscribe"):
+        # {"topics": [...]} or {"topic": "..."} — see topics.py
+        names = data.get("topics") or [data.get("topic", "")]
+        if t == "subscribe":
+            await state.topics.subscribe(websocket, names)
+        else:
+            state.topics.unsubscribe(websocket, names)
     elif t == "ping":
-        await state.broadcast({"type": "pong"})
+        await state._send(websocket, {"type": "pong"})
 
 
 # ── REST ──────────────────────────────────────
 
+@app.get("/thumbnail")
+async def thumbnail(request: Request):
+    """
+    Latest screen thumbnail as image/jpeg. ETag is the frame's content hash;
+    If-None-Match with it gets 304 and no body. 204 when there's no thumbnail.
+    """
+    sw = state.screen_watcher
+    if not sw or not sw.thumbnail:
+        return Response(status_code=204)
+    etag    = f'"{sw.thumbnail_etag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=sw.thumbnail, media_type="image/jpeg", headers=headers)
+
+
 @app.get("/processes")
 async def get_processes():
-    """Top 8 processes by RAM for workspace widget."""
-    import psutil
-    procs = []
-    for p in psutil.process_iter(["name","cpu_percent","memory_percent","pid"]):
-        try:
-            info = p.info
-            if info["memory_percent"] and info["memory_percent"] > 0.1:
-                procs.append(info)
-        except Exception:
-            pass
-    procs.sort(key=lambda x: x.get("memory_percent", 0), reverse=True)
-    return {"processes": procs[:8]}
+    """Top 8 processes by RAM for workspace widget (also pushed on the processes topic)."""
+    return {"processes": await asyncio.to_thread(top_processes)}
 
 @app.get("/status")
 async def status():
@@ -789,6 +1024,11 @@ async def status():
         "screen_enabled": state.screen_enabled,
         "system": state.system_monitor.snapshot,
         "patterns": len(state.pattern_engine.get_active_patterns()),
+        "verify_latency": state.verifier.latency_report() if state.verifier else {},
+        "verify_deltas": state.verifier.delta_stats if state.verifier else {},
+        "memory_db": database().stats(),
+        "ws_clients": [ch.stats() for ch in state.channels.values()],
+        "observer_prefilter": await prefilter_stats(),
         "computer_name": _os.environ.get("COMPUTERNAME", "") or _os.environ.get("HOSTNAME", ""),
     }
 
@@ -841,7 +1081,8 @@ async def reject(action_id: str):
 
 @app.get("/memory")
 async def memory():
-    return {"history": format_memory_for_llm(10),
+    return {"history": await format_memory_for_llm_async(10),
+            "digest": await memory_digest_async(),
             "patterns": state.pattern_engine.get_active_patterns()}
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+"""
+SOUL — Memory Database  v1.0
+memory/db.py
+
+One long-lived SQLite setup for memory/patterns.py instead of a fresh
+sqlite3.connect() + rollback-journal fsync per call.
+
+  Database(path, flush_ms)
+    .write(fn, *args)       → await; fn(conn, *args) runs on the DB writer
+                              thread inside a transaction, committed after
+    .defer(fn, *args)       → returns at once; write-behind (see below)
+    .read(fn, *args)        → await; fn runs on a reader thread
+    .write_sync / .read_sync  same, blocking — for boot code and old callers
+    .flush()                → block until everything queued is committed
+    .stats()                → queue depth, batch sizes, commit latency
+    .close()
+
+Writes are serialised through a single writer thread that owns the only
+writable connection — no "database is locked" between writers, and the
+event loop never waits on an fsync. Reads use per-thread query_only
+connections; in WAL mode they never block on the writer.
+
+Pragmas: journal_mode=WAL, synchronous=NORMAL (durable across app crashes,
+may lose the last commits on power loss — fine for chat history), a sized
+page cache, mmap I/O, in-memory temp tables, and a statement cache per
+connection so the hot INSERT/SELECTs are prepared once.
+
+Write-behind: deferred writes (transcript lines, events) are batched — the
+writer keeps collecting until flush_ms has passed since the first one or
+FLUSH_MAX_JOBS are queued, then commits them all in one transaction. Each job
+runs in its own SAVEPOINT so one bad job doesn't roll back its neighbours. An
+awaited write arriving mid-batch closes the batch and commits at once.
+flush_ms is the durability window: a crash loses at most that much.
+"""
+
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+CACHE_KIB       = 8192               # page cache per connection
+MMAP_BYTES      = 64 * 1024 * 1024
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE = 128                # prepared statements kept per connection
+READER_THREADS  = 2
+FLUSH_MS        = 250                # default write-behind window
+FLUSH_MAX_JOBS  = 200                # commit early once this many are waiting
+
+
+class Database:
+    def __init__(self, path: Path, flush_ms: int = FLUSH_MS):
+        self.path     = Path(path)
+        self.flush_ms = flush_ms
+        self._jobs: queue.Queue = queue.Queue()
+        self._readers = ThreadPoolExecutor(max_workers=READER_THREADS,
+                                           thread_name_prefix="soul-db-read")
+        self._local   = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        self._lock    = threading.Lock()
+        self._closed  = False
+        self._stats   = {"batches": 0, "jobs": 0, "failed": 0, "max_batch": 0,
+                         "last_commit_ms": 0.0, "max_commit_ms": 0.0, "total_commit_ms": 0.0}
+
+        self._writer_conn = self._connect(readonly=False)
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="soul-db-write", daemon=True)
+        self._writer.start()
+
+    # ── Connections ───────────────────────────────────────────────────────────
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.path),
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,          # each conn is still used by one thread
+            cached_statements=STATEMENT_CACHE,
+        )
+        conn.row_factory = sqlite3.Row
+        if not readonly:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        with self._lock:
+            self._conns.append(conn)
+        return conn
+
+    def _reader_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect(readonly=True)
+        return conn
+
+    # ── Writer thread ─────────────────────────────────────────────────────────
+
+    def _write_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            batch, stop = [job], False
+            deadline = time.monotonic() + self.flush_ms / 1000
+            # Deferred jobs wait for company; an awaited job ends the batch
+            while job[3] and len(batch) < FLUSH_MAX_JOBS:
+                try:
+                    job = self._jobs.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._run_batch(batch)
+            if stop:
+                break
+
+    def _run_batch(self, batch: list):
+        conn    = self._writer_conn
+        outcome = []
+        for fn, args, fut, _ in batch:
+            if not fut.set_running_or_notify_cancel():
+                outcome.append(None)
+                continue
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute("SAVEPOINT job")
+            try:
+                result = fn(conn, *args)
+                if conn.in_transaction:   # executescript() commits on its own
+                    conn.execute("RELEASE job")
+                outcome.append((True, result))
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                outcome.append((False, e))
+
+        started = time.perf_counter()
+        try:
+            conn.commit()
+        except BaseException as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            outcome = [o and (False, e) for o in outcome]
+        commit_ms = (time.perf_counter() - started) * 1000
+
+        st = self._stats
+        st["batches"]         += 1
+        st["jobs"]            += len(batch)
+        st["max_batch"]        = max(st["max_batch"], len(batch))
+        st["last_commit_ms"]   = commit_ms
+        st["max_commit_ms"]    = max(st["max_commit_ms"], commit_ms)
+        st["total_commit_ms"] += commit_ms
+
+        # Resolve only after commit, so awaiters see durable data
+        for (fn, args, fut, _), o in zip(batch, outcome):
+            if o is None:
+                continue
+            ok, value = o
+            if ok:
+                fut.set_result(value)
+            else:
+                st["failed"] += 1
+                fut.set_exception(value)
+
+    def _submit_write(self, fn: Callable, args: tuple, deferred: bool = False) -> Future:
+        if self._closed:
+            raise RuntimeError("memory database is closed")
+        fut: Future = Future()
+        self._jobs.put((fn, args, fut, deferred))
+        return fut
+
+    def _run_read(self, fn: Callable, args: tuple) -> Any:
+        return fn(self._reader_conn(), *args)
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    async def write(self, fn: Callable, *args) -> Any:
+        return await asyncio.wrap_future(self._submit_write(fn, args))
+
+    async def read(self, fn: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, fn, args)
+
+    def defer(self, fn: Callable, *args):
+        """Queue a write and return immediately; it commits with the next batch."""
+        if threading.current_thread() is self._writer:
+            fn(self._writer_conn, *args)
+            return
+        fut = self._submit_write(fn, args, deferred=True)
+        fut.add_done_callback(_log_deferred_error)
+
+    def write_sync(self, fn: Callable, *args) -> Any:
+        if threading.current_thread() is self._writer:
+            return fn(self._writer_conn, *args)   # nested call from a write job
+        return self._submit_write(fn, args).result()
+
+    def read_sync(self, fn: Callable, *args) -> Any:
+        return self._run_read(fn, args)
+
+    def flush(self):
+        """Block until every write queued so far is committed."""
+        self.write_sync(lambda conn: None)
+
+    def stats(self) -> dict:
+        st = self._stats
+        return {
+            "queue_depth":    self._jobs.qsize(),
+            "flush_ms":       self.flush_ms,
+            "batches":        st["batches"],
+            "jobs":           st["jobs"],
+            "failed":         st["failed"],
+            "avg_batch":      round(st["jobs"] / st["batches"], 1) if st["batches"] else 0,
+            "max_batch":      st["max_batch"],
+            "last_commit_ms": round(st["last_commit_ms"], 2),
+            "avg_commit_ms":  round(st["total_commit_ms"] / st["batches"], 2) if st["batches"] else 0,
+            "max_commit_ms":  round(st["max_commit_ms"], 2),
+        }
+
+    def close(self):
+        """Drain queued writes, then close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._jobs.put(None)
+        self._writer.join(timeout=5)
+        self._readers.shutdown(wait=True)
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _log_deferred_error(fut: Future):
+    if not fut.cancelled() and fut.exception() is not None:
+        print(f"[SOUL] deferred memory write failed: {fut.exception()}")
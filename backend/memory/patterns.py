@@ -4,14 +4,25 @@ SOUL — Pattern Memory Engine
 SQLite-backed behavioral pattern detection.
 NEW: Persistent session memory — last N conversation exchanges
      are saved and reloaded on next boot so SOUL remembers context.
+NEW: All access goes through memory/db.py — one WAL writer thread plus
+     reader connections. Each public function has a blocking form for boot
+     code and an *_async form that process() awaits so it never blocks on disk.
 """
 
 import json
+import math
+import re
 import sqlite3
+import threading
+import zlib
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Optional
 
+from memory.db import FLUSH_MS, Database
+from memory.vectors import VectorIndex
+
 def _resolve_db_path() -> Path:
     import os as _os
     data_dir = _os.environ.get("SOUL_DATA_DIR", "").strip()
@@ -22,16 +33,85 @@ def _resolve_db_path() -> Path:
     return Path(__file__).parent.parent.parent / "soul_memory.db"
 
 DB_PATH = _resolve_db_path()
+VECTORS_PATH = DB_PATH.with_name("soul_vectors.f16")   # memory/vectors.py matrix
+
+
+_database: Optional[Database] = None
+_vectors:  Optional[VectorIndex] = None
+_database_lock = threading.Lock()
+_flush_ms      = FLUSH_MS
+
+
+def configure_db(flush_ms: int = None):
+    """Set the write-behind window (config memory.write_flush_ms)."""
+    global _flush_ms
+    if flush_ms is not None:
+        _flush_ms = max(0, int(flush_ms))
+        if _database:
+            _database.flush_ms = _flush_ms
+
+
+def database() -> Database:
+    """The shared Database, opened (and its schema created) on first use."""
+    global _database, _vectors
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                db = Database(DB_PATH, flush_ms=_flush_ms)
+                db.write_sync(_migrate)
+                db.write_sync(_prune_history)
+                _vectors = VectorIndex(VECTORS_PATH)
+                db.write_sync(_vectors.load)
+                _database = db
+    return _database
+
+
+def close_db():
+    """Flush and close the shared Database. The next call reopens it."""
+    global _database, _vectors
+    with _database_lock:
+        db, _database = _database, None
+        vi = _vectors
+    if db:
+        db.close()      # drains the writer queue — deferred jobs still embed into vi
+    with _database_lock:
+        if _vectors is vi:
+            _vectors = None
+    if vi:
+        vi.close()
 
 
 def get_db() -> sqlite3.Connection:
+    """A standalone connection for ad-hoc reads outside the DB threads."""
+    database()
     conn = sqlite3.connect(str(DB_PATH))
     conn.row_factory = sqlite3.Row
     return conn
 
 
 def init_db():
-    conn = get_db()
+    database()
+
+
+# ─────────────────────────────────────────────
+# SCHEMA + MIGRATIONS
+# ─────────────────────────────────────────────
+# PRAGMA user_version records the last migration applied. Each migration runs
+# once, in order, inside the writer's transaction. Append new ones; never edit
+# an applied one. Databases from before versioning report 0 and get all of them
+# (v1 is CREATE IF NOT EXISTS, so it's a no-op on their existing tables).
+
+def _migrate(conn: sqlite3.Connection):
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, step in enumerate(_MIGRATIONS, 1):
+        if version <= current:
+            continue
+        step(conn)
+        conn.execute(f"PRAGMA user_version = {version}")
+        print(f"[SOUL] memory schema → v{version}")
+
+
+def _create_schema(conn: sqlite3.Connection):
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS events (
             id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -68,65 +148,374 @@ def init_db():
             content     TEXT NOT NULL,
             session_id  TEXT
         );
+
+        CREATE TABLE IF NOT EXISTS app_launch_times (
+            app         TEXT NOT NULL,
+            bucket      INTEGER NOT NULL,
+            count       INTEGER DEFAULT 0,
+            PRIMARY KEY (app, bucket)
+        );
+    """)
+
+
+def _add_lookup_indexes(conn: sqlite3.Connection):
+    """
+    Indexes for the per-message lookups:
+      check_trigger / _update_patterns upsert → patterns(trigger_event, trigger_value, …)
+      get_active_patterns                     → patterns(is_active, occurrence_count)
+      _update_patterns co-occurrence join     → events(event_type, value) — id is
+                                                the rowid, so the index covers it
+    scrub_stale_names' LIKE '%name%' can't use an index; it only runs on demand.
+    """
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_patterns_trigger
+            ON patterns (trigger_event, trigger_value, is_active);
+        CREATE INDEX IF NOT EXISTS idx_patterns_active
+            ON patterns (is_active, occurrence_count);
+        CREATE INDEX IF NOT EXISTS idx_events_type_value
+            ON events (event_type, value);
+        ANALYZE;
+    """)
+
+
+def _add_cooccurrence(conn: sqlite3.Connection):
+    """Incremental pattern-mining state (PatternEngine) — see PATTERN ENGINE."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS cooccurrence (
+            follow_event  TEXT NOT NULL,
+            follow_value  TEXT NOT NULL,
+            pred_event    TEXT NOT NULL,
+            pred_value    TEXT NOT NULL,
+            count         INTEGER DEFAULT 0,
+            PRIMARY KEY (follow_event, follow_value, pred_event, pred_value)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS miner_state (
+            name   TEXT PRIMARY KEY,
+            value  TEXT
+        );
+    """)
+
+
+def _add_session_archive(conn: sqlite3.Connection):
+    """Compressed home for session_history rows pruned by _prune_history."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS session_archive (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            day         TEXT NOT NULL,
+            first_id    INTEGER NOT NULL,
+            last_id     INTEGER NOT NULL,
+            row_count   INTEGER NOT NULL,
+            data        BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_session_archive_day ON session_archive (day);
+    """)
+
+
+def _add_history_fts(conn: sqlite3.Connection):
+    """
+    FTS5 index over session_history.content (external content — the text is
+    stored once, in session_history). Triggers keep it in sync, including the
+    range delete in _prune_history. SQLite builds without FTS5 skip this;
+    search_memory() then falls back to LIKE.
+    """
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS session_fts USING fts5(
+                content, content='session_history', content_rowid='id',
+                tokenize='porter unicode61'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"[SOUL] FTS5 unavailable ({e}) — memory search uses LIKE")
+        return
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS session_fts_ai AFTER INSERT ON session_history BEGIN
+            INSERT INTO session_fts (rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS session_fts_ad AFTER DELETE ON session_history BEGIN
+            INSERT INTO session_fts (session_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS session_fts_au AFTER UPDATE ON session_history BEGIN
+            INSERT INTO session_fts (session_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+            INSERT INTO session_fts (rowid, content) VALUES (new.id, new.content);
+        END;
+        INSERT INTO session_fts (session_fts) VALUES ('rebuild');
+    """)
+
+
+def _add_vectors(conn: sqlite3.Connection):
+    """Row metadata for the semantic index (memory/vectors.py)."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS vectors (
+            row         INTEGER PRIMARY KEY,
+            kind        TEXT NOT NULL,
+            ref_id      INTEGER,
+            timestamp   TEXT,
+            text        TEXT
+        );
+    """)
+
+
+def _add_session_summaries(conn: sqlite3.Connection):
+    """Rolled-up session and day summaries (memory/rollup.py)."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS session_summaries (
+            id            INTEGER PRIMARY KEY AUTOINCREMENT,
+            level         TEXT NOT NULL,       -- 'session' | 'day'
+            day           TEXT NOT NULL,       -- YYYY-MM-DD the session started
+            first_id      INTEGER NOT NULL,    -- session_history id range covered
+            last_id       INTEGER NOT NULL,
+            started_at    TEXT NOT NULL,
+            ended_at      TEXT NOT NULL,
+            message_count INTEGER NOT NULL,
+            summary       TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_summaries_level
+            ON session_summaries (level, last_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_summaries_day
+            ON session_summaries (day) WHERE level = 'day';
+    """)
+
+
+def _add_observer_decisions(conn: sqlite3.Connection):
+    """Observer pre-filter decisions — training data and audit log (perception/prefilter.py)."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS observer_decisions (
+            id        INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            summary   TEXT NOT NULL,
+            reason    TEXT NOT NULL,
+            stage     TEXT NOT NULL,       -- 'llm' | 'rule' | 'cache' | 'model'
+            decision  TEXT NOT NULL,       -- 'skip' | 'speak'
+            local     TEXT,                -- local verdict on LLM rows ('skip' = audited)
+            p_skip    REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_observer_decisions_stage
+            ON observer_decisions (stage, id);
     """)
-    conn.commit()
-    conn.close()
+
+
+_MIGRATIONS = [
+    _create_schema,          # v1
+    _add_lookup_indexes,     # v2
+    _add_cooccurrence,       # v3
+    _add_session_archive,    # v4
+    _add_history_fts,        # v5
+    _add_vectors,            # v6
+    _add_session_summaries,  # v7
+    _add_observer_decisions, # v8
+]
 
 
 # ─────────────────────────────────────────────
 # EVENT LOGGING
 # ─────────────────────────────────────────────
 
-def log_event(event_type: str, value: str, metadata: dict = None):
-    conn = get_db()
+def _log_event(conn, event_type: str, value: str, metadata: dict = None):
     conn.execute(
         "INSERT INTO events (timestamp, event_type, value, metadata) VALUES (?, ?, ?, ?)",
         (datetime.now().isoformat(), event_type, value, json.dumps(metadata or {}))
     )
-    conn.commit()
-    conn.close()
 
 
-def get_recent_events(limit: int = 50) -> List[dict]:
-    conn = get_db()
+def log_event(event_type: str, value: str, metadata: dict = None):
+    database().defer(_log_event, event_type, value, metadata)
+
+
+def _recent_events(conn, limit: int) -> List[dict]:
     rows = conn.execute("SELECT * FROM events ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
+def get_recent_events(limit: int = 50) -> List[dict]:
+    return database().read_sync(_recent_events, limit)
+
+
 # ─────────────────────────────────────────────
 # SESSION MEMORY (persistent across restarts)
 # ─────────────────────────────────────────────
 
-def save_exchange(role: str, content: str, session_id: str = "default"):
-    """Save a single message to persistent history."""
-    conn = get_db()
-    conn.execute(
+# Retention: keep the last HISTORY_KEEP rows live — enough for full debug
+# sessions. Instead of trimming on every insert, a prune runs every
+# HISTORY_PRUNE_EVERY saves (and once when the DB opens): rows below the
+# watermark move into session_archive as one zlib-compressed JSON chunk per
+# day, then go with a single rowid range delete. /export-log reads both.
+
+HISTORY_KEEP        = 2000
+HISTORY_PRUNE_EVERY = 100
+
+_saves_since_prune = 0
+
+
+def _save_exchange(conn, role: str, content: str, session_id: str):
+    global _saves_since_prune
+    cur = conn.execute(
         "INSERT INTO session_history (timestamp, role, content, session_id) VALUES (?, ?, ?, ?)",
         (datetime.now().isoformat(), role, content, session_id)
     )
-    # Keep last 2000 — enough for full debug sessions
-    conn.execute("""
-        DELETE FROM session_history WHERE id NOT IN (
-            SELECT id FROM session_history ORDER BY id DESC LIMIT 2000
-        )
-    """)
-    conn.commit()
-    conn.close()
+    if _vectors:
+        _vectors.append(conn, role, content, cur.lastrowid)
+    _saves_since_prune += 1
+    if _saves_since_prune >= HISTORY_PRUNE_EVERY:
+        _prune_history(conn)
 
 
-def load_recent_history(limit: int = 10) -> List[dict]:
-    """Load the last N exchanges for injection into new session context."""
-    conn = get_db()
+def _prune_history(conn):
+    global _saves_since_prune
+    _saves_since_prune = 0
+    row = conn.execute(
+        "SELECT id FROM session_history ORDER BY id DESC LIMIT 1 OFFSET ?",
+        (HISTORY_KEEP,)
+    ).fetchone()
+    if not row:
+        return
+    watermark = row["id"]
+    rows = conn.execute(
+        "SELECT id, timestamp, role, content, session_id FROM session_history "
+        "WHERE id <= ? ORDER BY id", (watermark,)
+    ).fetchall()
+    by_day: dict[str, list] = {}
+    for r in rows:
+        by_day.setdefault(r["timestamp"][:10], []).append(dict(r))
+    conn.executemany("""
+        INSERT INTO session_archive (day, first_id, last_id, row_count, data)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(day, chunk[0]["id"], chunk[-1]["id"], len(chunk),
+           zlib.compress(json.dumps(chunk).encode("utf-8")))
+          for day, chunk in by_day.items()])
+    conn.execute("DELETE FROM session_history WHERE id <= ?", (watermark,))
+    print(f"[SOUL] archived {len(rows)} history row(s) across {len(by_day)} day(s)")
+
+
+def _full_history(conn) -> List[dict]:
+    out: List[dict] = []
+    for a in conn.execute("SELECT data FROM session_archive ORDER BY first_id"):
+        out.extend(json.loads(zlib.decompress(a["data"]).decode("utf-8")))
+    out.extend(dict(r) for r in conn.execute(
+        "SELECT id, timestamp, role, content, session_id FROM session_history ORDER BY id"))
+    return out
+
+
+def load_full_history() -> List[dict]:
+    """Archived + live history, oldest first, all at once. Prefer iter_history()."""
+    return database().read_sync(_full_history)
+
+
+async def load_full_history_async() -> List[dict]:
+    return await database().read(_full_history)
+
+
+# ── Paged history reads (/export-log, /history) ───────────────────────────────
+# Keyset pagination on id: archived chunks hold the oldest ids, live rows the
+# rest, so "id > after" / "id < before" walks both in order without OFFSET
+# scans or loading everything. since/until are ISO timestamps or prefixes
+# ("2025-03-01"); until is inclusive of its prefix.
+
+HISTORY_PAGE = 500
+
+_HISTORY_COLS = "id, timestamp, role, content, session_id"
+
+
+def _in_range(ts: str, since: Optional[str], until: Optional[str]) -> bool:
+    return (not since or ts >= since) and (not until or ts[:len(until)] <= until)
+
+
+def _history_after(conn, after_id: int, since: Optional[str], until: Optional[str],
+                   n: int) -> List[dict]:
+    # Same prefix rule as the live rows below: until "2025-03" keeps every
+    # "2025-03-DD" chunk (a plain day <= "2025-03" would drop the month)
+    day_lo = since[:10] if since else ""
+    day_hi = until or "9999"
+    for a in conn.execute(
+        "SELECT data FROM session_archive WHERE last_id > ? AND day >= ? "
+        "AND substr(day, 1, ?) <= ? ORDER BY first_id",
+        (after_id, day_lo, len(day_hi), day_hi)
+    ):
+        rows = [r for r in json.loads(zlib.decompress(a["data"]).decode("utf-8"))
+                if r["id"] > after_id and _in_range(r["timestamp"], since, until)]
+        if rows:
+            return rows[:n]
+    rows = conn.execute(f"""
+        SELECT {_HISTORY_COLS} FROM session_history
+        WHERE id > ? AND timestamp >= ? AND substr(timestamp, 1, ?) <= ?
+        ORDER BY id LIMIT ?
+    """, (after_id, since or "", len(until or "9999"), until or "9999", n)).fetchall()
+    return [dict(r) for r in rows]
+
+
+async def iter_history(since: Optional[str] = None, until: Optional[str] = None,
+                       limit: Optional[int] = None):
+    """Archived + live history rows in the range, oldest first, a page at a time."""
+    after, left = 0, limit
+    while left is None or left > 0:
+        n    = HISTORY_PAGE if left is None else min(HISTORY_PAGE, left)
+        page = await database().read(_history_after, after, since, until, n)
+        if not page:
+            return
+        for r in page:
+            yield r
+        after = page[-1]["id"]
+        if left is not None:
+            left -= len(page)
+
+
+def _history_before(conn, before_id: Optional[int], n: int) -> List[dict]:
+    ceiling = before_id if before_id is not None else 1 << 62
+    rows = [dict(r) for r in conn.execute(
+        f"SELECT {_HISTORY_COLS} FROM session_history WHERE id < ? ORDER BY id DESC LIMIT ?",
+        (ceiling, n))]
+    if len(rows) < n:
+        for a in conn.execute(
+            "SELECT data FROM session_archive WHERE first_id < ? ORDER BY first_id DESC",
+            (ceiling,)
+        ):
+            chunk = json.loads(zlib.decompress(a["data"]).decode("utf-8"))
+            rows.extend(r for r in reversed(chunk) if r["id"] < ceiling)
+            if len(rows) >= n:
+                break
+    return rows[:n][::-1]
+
+
+async def history_page(before_id: Optional[int] = None, limit: int = 50) -> dict:
+    """
+    Newest `limit` messages older than before_id (or the newest overall),
+    oldest first, plus the cursor for the next older page (None once a page
+    comes back short — nothing older is left).
+    """
+    rows = await database().read(_history_before, before_id, limit)
+    return {"messages": rows,
+            "next_before_id": rows[0]["id"] if len(rows) == limit else None}
+
+
+def save_exchange(role: str, content: str, session_id: str = "default"):
+    """Save a single message to persistent history (write-behind — returns at once)."""
+    database().defer(_save_exchange, role, content, session_id)
+
+
+async def save_exchange_async(role: str, content: str, session_id: str = "default"):
+    save_exchange(role, content, session_id)
+
+
+def _recent_history(conn, limit: int) -> List[dict]:
     rows = conn.execute(
         "SELECT role, content, timestamp FROM session_history ORDER BY id DESC LIMIT ?",
         (limit,)
     ).fetchall()
-    conn.close()
     # Return in chronological order
-    history = [{"role": r["role"], "content": r["content"], "timestamp": r["timestamp"]}
-               for r in reversed(rows)]
-    return history
+    return [{"role": r["role"], "content": r["content"], "timestamp": r["timestamp"]}
+            for r in reversed(rows)]
+
+
+def load_recent_history(limit: int = 10) -> List[dict]:
+    """Load the last N exchanges for injection into new session context."""
+    return database().read_sync(_recent_history, limit)
+
+
+async def load_recent_history_async(limit: int = 10) -> List[dict]:
+    return await database().read(_recent_history, limit)
 
 
 def format_memory_for_llm(limit: int = 8) -> str:
@@ -134,7 +523,14 @@ def format_memory_for_llm(limit: int = 8) -> str:
     Format recent history as a compact memory summary for LLM injection.
     Scrubs any stale user_name references from old sessions.
     """
-    history = load_recent_history(limit)
+    return _format_memory(load_recent_history(limit))
+
+
+async def format_memory_for_llm_async(limit: int = 8) -> str:
+    return _format_memory(await load_recent_history_async(limit))
+
+
+def _format_memory(history: List[dict]) -> str:
     if not history:
         return ""
 
@@ -164,118 +560,509 @@ def format_memory_for_llm(limit: int = 8) -> str:
     return "\n".join(lines)
 
 
+# ── Relevant-memory recall ────────────────────────────────────────────────────
+# BM25 over session_history via session_fts. The newest RECALL_SKIP_RECENT
+# rows are skipped — stream_chat already sends the live conversation.
+
+RECALL_K           = 4
+RECALL_SKIP_RECENT = 8
+RECALL_MAX_TERMS   = 8
+
+_RECALL_STOPWORDS = {
+    "the", "and", "for", "you", "your", "are", "was", "were", "that", "this",
+    "with", "have", "has", "had", "not", "but", "can", "what", "when", "where",
+    "who", "how", "why", "did", "does", "just", "from", "about", "into", "its",
+    "it's", "them", "they", "then", "there", "here", "some", "any", "all",
+    "get", "got", "let", "me", "my", "our", "out", "yes", "yeah", "okay",
+}
+
+
+def _recall_terms(query: str) -> List[str]:
+    words = re.findall(r"[a-z0-9_']{3,}", (query or "").lower())
+    terms = [w.strip("'") for w in dict.fromkeys(words) if w not in _RECALL_STOPWORDS]
+    return [t for t in terms if t][:RECALL_MAX_TERMS]
+
+
+def _search_memory(conn, query: str, k: int, skip_recent: int) -> List[dict]:
+    terms = _recall_terms(query)
+    if not terms:
+        return []
+    newest = conn.execute("SELECT COALESCE(MAX(id), 0) FROM session_history").fetchone()[0]
+    ceiling = newest - skip_recent
+    try:
+        rows = conn.execute("""
+            SELECT h.id, h.timestamp, h.role,
+                   snippet(session_fts, 0, '', '', '…', 32) AS text,
+                   bm25(session_fts) AS score
+            FROM session_fts
+            JOIN session_history h ON h.id = session_fts.rowid
+            WHERE session_fts MATCH ? AND h.id <= ?
+            ORDER BY score
+            LIMIT ?
+        """, (" OR ".join(f'"{t}"' for t in terms), ceiling, k)).fetchall()
+    except sqlite3.OperationalError:
+        # No FTS5 — any row mentioning the rarest-looking (longest) term
+        term = max(terms, key=len)
+        rows = conn.execute("""
+            SELECT id, timestamp, role, substr(content, 1, 240) AS text, 0.0 AS score
+            FROM session_history
+            WHERE content LIKE ? AND id <= ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (f"%{term}%", ceiling, k)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def search_memory(query: str, k: int = RECALL_K,
+                  skip_recent: int = RECALL_SKIP_RECENT) -> List[dict]:
+    """BM25-ranked history rows matching the query: {id, timestamp, role, text, score}."""
+    return database().read_sync(_search_memory, query, k, skip_recent)
+
+
+async def search_memory_async(query: str, k: int = RECALL_K,
+                              skip_recent: int = RECALL_SKIP_RECENT) -> List[dict]:
+    return await database().read(_search_memory, query, k, skip_recent)
+
+
+# ── Semantic recall (memory/vectors.py) ──────────────────────────────────────
+# Every saved exchange and each new screen summary gets a hashed embedding.
+# Catches paraphrases keyword search misses; rows the live context already
+# carries (newest messages, screens from the last few minutes) are skipped.
+
+SEMANTIC_K          = 3
+SEMANTIC_MIN_SCORE  = 0.25   # above ~99.9% of unrelated-text scores at DIM 512
+SEMANTIC_SCREEN_AGE = timedelta(minutes=10)
+
+
+def index_screen_summary(summary: str):
+    """Add a screen summary to the semantic index (write-behind)."""
+    database().defer(lambda conn: _vectors and _vectors.append(conn, "screen", summary))
+
+
+def _semantic_recall(conn, query: str, k: int, kinds: tuple, skip_recent: int) -> List[dict]:
+    if not _vectors:
+        return []
+    newest = conn.execute("SELECT COALESCE(MAX(id), 0) FROM session_history").fetchone()[0]
+    fresh  = (datetime.now() - SEMANTIC_SCREEN_AGE).isoformat()
+    hits = _vectors.search(conn, query, k * 2, kinds, min_score=SEMANTIC_MIN_SCORE)
+    hits = [h for h in hits
+            if not (h["kind"] == "screen" and h["timestamp"] >= fresh)
+            and not (h["kind"] != "screen" and (h["ref_id"] or 0) > newest - skip_recent)]
+    return hits[:k]
+
+
+def semantic_recall(query: str, k: int = SEMANTIC_K, kinds: tuple = None,
+                    skip_recent: int = RECALL_SKIP_RECENT) -> List[dict]:
+    """Cosine-ranked memories: {row, kind, ref_id, timestamp, text, score}."""
+    return database().read_sync(_semantic_recall, query, k, kinds, skip_recent)
+
+
+async def semantic_recall_async(query: str, k: int = SEMANTIC_K, kinds: tuple = None,
+                                skip_recent: int = RECALL_SKIP_RECENT) -> List[dict]:
+    return await database().read(_semantic_recall, query, k, kinds, skip_recent)
+
+
+async def recall_for_prompt(query: str) -> str:
+    """Relevant earlier messages (keyword + semantic) as a system block, or ""."""
+    hits = [{"key": h["id"], "timestamp": h["timestamp"], "who": h["role"], "text": h["text"]}
+            for h in await search_memory_async(query)]
+    seen = {h["key"] for h in hits}
+    for h in await semantic_recall_async(query):
+        if h["kind"] != "screen" and h["ref_id"] in seen:
+            continue
+        hits.append({"key": h["ref_id"] or 0, "timestamp": h["timestamp"],
+                     "who": "screen" if h["kind"] == "screen" else h["kind"],
+                     "text": h["text"][:240]})
+    if not hits:
+        return ""
+    lines = ["[RELEVANT MEMORY — earlier messages related to this one]"]
+    for h in sorted(hits, key=lambda h: h["timestamp"]):
+        ts = h["timestamp"][:16].replace("T", " ")
+        lines.append(f"[{ts}] {h['who']}: {h['text']}")
+    return "\n".join(lines)
+
+
 def scrub_stale_names(old_names: list):
     """Remove session_history rows that contain any of the given old names.
     Called on startup to purge stale hardcoded user references from old sessions.
     """
     if not old_names:
         return
-    conn = get_db()
-    for name in old_names:
-        conn.execute(
-            "DELETE FROM session_history WHERE content LIKE ?",
-            (f"%{name}%",)
-        )
-    conn.commit()
-    conn.close()
 
+    def _scrub(conn):
+        for name in old_names:
+            conn.execute(
+                "DELETE FROM session_history WHERE content LIKE ?",
+                (f"%{name}%",)
+            )
+    database().write_sync(_scrub)
 
-def save_key_fact(key: str, value: str):
-    """Store a named memory fact that persists indefinitely."""
-    conn = get_db()
+
+def _save_key_fact(conn, key: str, value: str):
     conn.execute("""
         INSERT INTO memories (key, value, updated_at)
         VALUES (?, ?, ?)
         ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
     """, (key, value, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
 
 
-def recall_fact(key: str) -> Optional[str]:
-    conn = get_db()
+def save_key_fact(key: str, value: str):
+    """Store a named memory fact that persists indefinitely."""
+    database().write_sync(_save_key_fact, key, value)
+
+
+def _recall_fact(conn, key: str) -> Optional[str]:
     row = conn.execute("SELECT value FROM memories WHERE key = ?", (key,)).fetchone()
-    conn.close()
     return row["value"] if row else None
 
 
+def recall_fact(key: str) -> Optional[str]:
+    return database().read_sync(_recall_fact, key)
+
+
+async def recall_fact_async(key: str) -> Optional[str]:
+    return await database().read(_recall_fact, key)
+
+
 def get_all_facts() -> dict:
-    conn = get_db()
-    rows = conn.execute("SELECT key, value, updated_at FROM memories").fetchall()
-    conn.close()
+    rows = database().read_sync(lambda conn: conn.execute(
+        "SELECT key, value, updated_at FROM memories").fetchall())
     return {r["key"]: {"value": r["value"], "updated": r["updated_at"]} for r in rows}
 
 
+# ─────────────────────────────────────────────
+# APP LAUNCH TIMES (readiness histogram)
+# ─────────────────────────────────────────────
+
+LAUNCH_BUCKET_SEC = 0.25   # histogram resolution
+
+
+def record_launch_time(app: str, seconds: float):
+    """Add one observed launch-to-window time for an app to its histogram."""
+    if not app:
+        return
+    bucket = int(max(seconds, 0.0) / LAUNCH_BUCKET_SEC)
+    database().defer(lambda conn: conn.execute("""
+        INSERT INTO app_launch_times (app, bucket, count) VALUES (?, ?, 1)
+        ON CONFLICT(app, bucket) DO UPDATE SET count = count + 1
+    """, (app.lower().strip(), bucket)))
+
+
+def get_launch_histogram(app: str) -> dict:
+    """{bucket_index: count} for an app. Bucket i covers [i, i+1) * LAUNCH_BUCKET_SEC."""
+    rows = database().read_sync(lambda conn: conn.execute(
+        "SELECT bucket, count FROM app_launch_times WHERE app = ?",
+        (app.lower().strip(),)
+    ).fetchall())
+    return {r["bucket"]: r["count"] for r in rows}
+
+
 # ─────────────────────────────────────────────
 # PATTERN ENGINE
 # ─────────────────────────────────────────────
 
+# ── Sequence miner ──────────────────────────────────────────────────────────
+# Frequent 2–4-step app sequences that happen within window_minutes, split by
+# weekday / weekend ("code → spotify → terminal within 10 min on weekdays").
+# Every app event adds the contiguous suffixes of the recent in-window run as
+# candidate sequences. Counting is lossy counting (Manku & Motwani): counts
+# undercount by at most SEQ_EPSILON × sequences seen, and anything that can't
+# reach that bound is pruned each bucket, so memory stays bounded over months.
+
+SEQ_EVENT_TYPES = {"app_open", "app_focus"}
+SEQ_MIN_LEN     = 2
+SEQ_MAX_LEN     = 4
+SEQ_EPSILON     = 0.002   # bucket width 500 candidate sequences
+
+
+class SequenceMiner:
+    def __init__(self, window_minutes: int, min_count: int):
+        self.window_minutes = window_minutes
+        self.min_count = min_count
+        self._width  = int(math.ceil(1 / SEQ_EPSILON))
+        self._lock   = threading.Lock()   # add() on the DB writer, frequent() on readers
+        self._recent: deque = deque(maxlen=SEQ_MAX_LEN)   # (datetime, value)
+        self._counts: dict[tuple, list] = {}              # (day kind, seq) → [count, delta]
+        self._seen   = 0
+
+    def add(self, value: str, when: datetime):
+        value = (value or "").lower().strip()
+        if not value:
+            return
+        with self._lock:
+            if self._recent and self._recent[-1][1] == value:
+                self._recent[-1] = (when, value)   # same app again — not a new step
+                return
+            self._recent.append((when, value))
+            limit = timedelta(minutes=self.window_minutes)
+            while self._recent and when - self._recent[0][0] > limit:
+                self._recent.popleft()
+
+            run  = tuple(v for _, v in self._recent)
+            kind = "weekend" if when.weekday() >= 5 else "weekday"
+            for length in range(SEQ_MIN_LEN, len(run) + 1):
+                self._seen += 1
+                bucket = math.ceil(self._seen / self._width)
+                entry  = self._counts.get((kind, run[-length:]))
+                if entry:
+                    entry[0] += 1
+                else:
+                    self._counts[(kind, run[-length:])] = [1, bucket - 1]
+                if self._seen % self._width == 0:
+                    self._counts = {k: e for k, e in self._counts.items()
+                                    if e[0] + e[1] > bucket}
+
+    def frequent(self) -> List[dict]:
+        """Sequences seen at least min_count times, longest first among ties,
+        skipping ones already covered by a longer reported sequence."""
+        with self._lock:
+            hits = [(e[0], kind, seq) for (kind, seq), e in self._counts.items()
+                    if e[0] >= self.min_count]
+        hits.sort(key=lambda h: (-h[0], -len(h[2])))
+        out, taken = [], []
+        for count, kind, seq in hits:
+            n = len(seq)
+            if any(k == kind and any(t[i:i+n] == seq for i in range(len(t) - n + 1))
+                   for k, t in taken):
+                continue
+            taken.append((kind, seq))
+            out.append({
+                "trigger_event":    "sequence",
+                "trigger_value":    " → ".join(seq),
+                "follow_action":    "sequence",
+                "occurrence_count": count,
+                "is_active":        1,
+                "display_text":     f"opens {' → '.join(seq)} within "
+                                    f"{self.window_minutes} min on {kind}s",
+            })
+        return out
+
+    def dump(self) -> str:
+        with self._lock:
+            return json.dumps({
+                "seen":   self._seen,
+                "recent": [[t.isoformat(), v] for t, v in self._recent],
+                "counts": [[k, list(seq), e[0], e[1]] for (k, seq), e in self._counts.items()],
+            })
+
+    def load(self, raw: str):
+        state = json.loads(raw)
+        with self._lock:
+            self._seen   = state.get("seen", 0)
+            self._recent = deque(((datetime.fromisoformat(t), v) for t, v in state.get("recent", [])),
+                                 maxlen=SEQ_MAX_LEN)
+            self._counts = {(k, tuple(seq)): [c, d] for k, seq, c, d in state.get("counts", [])}
+
+
+# Co-occurrence is counted incrementally instead of re-joining `events` on
+# every observe(). A pair (A, B) counts once for each time B is logged at most
+# CO_WINDOW_IDS event ids after an A (A != B) — exactly what the old self-join
+# counted. Counts live in the `cooccurrence` table; an LRU of recently touched
+# pairs sits in front of it and dirty entries are written back every
+# CO_PERSIST_EVERY observations (and on flush()). Predecessors whose count has
+# reached the threshold are kept in memory per follower, so observe() touches
+# at most CO_WINDOW_IDS counters plus the follower's existing patterns.
+#
+# miner_state.cooccurrence_last_id is the last event folded into the counts.
+# On first use any newer events are replayed, so a DB from before this change
+# (or one whose last write-back was lost) catches up to the same counts.
+
+CO_WINDOW_IDS    = 3       # follower at most this many event ids after predecessor
+CO_CACHE_PAIRS   = 50000   # co-occurrence counters kept in memory
+CO_PERSIST_EVERY = 50      # observations between write-backs
+
+
 class PatternEngine:
     def __init__(self, threshold: int = 3, window_minutes: int = 10):
         self.threshold = threshold
         self.window_minutes = window_minutes
+        self._reset_mining()
         init_db()
+        database().write_sync(self._load_active)
+
+    def _reset_mining(self):
+        self._sequences = SequenceMiner(self.window_minutes, self.threshold)
+        self._window: deque = deque(maxlen=CO_WINDOW_IDS)   # (event id, key)
+        self._co: OrderedDict = OrderedDict()               # (pred, follow) → count, LRU
+        self._dirty: set = set()
+        self._hot: dict[tuple, set] = {}                    # follow → preds at threshold
+        self._last_id  = 0
+        self._unsaved  = 0
+        self._loaded   = False
+        # (trigger_event, trigger_value) → active pattern row. Loaded once and
+        # then kept current by _update_patterns — the engine is the only thing
+        # that writes `patterns`, so trigger checks never touch SQLite.
+        # Copy-on-write: the DB thread never mutates the published dict, it
+        # builds a new one and swaps the reference, so readers on the event
+        # loop always see a complete snapshot.
+        self._active: dict[tuple, dict] = {}
 
     def observe(self, event_type: str, value: str, metadata: dict = None):
-        log_event(event_type, value, metadata)
-        self._update_patterns(event_type, value)
-
-    def _update_patterns(self, event_type: str, value: str):
-        conn = get_db()
-        preceding = conn.execute("""
-            SELECT e1.event_type, e1.value, COUNT(*) as co_count
-            FROM events e1
-            JOIN events e2 ON (
-                e2.event_type = ? AND e2.value = ?
-                AND e2.id > e1.id AND e2.id - e1.id <= 3
-            )
-            WHERE e1.event_type != ? OR e1.value != ?
-            GROUP BY e1.event_type, e1.value
-            HAVING co_count >= ?
-        """, (event_type, value, event_type, value, self.threshold)).fetchall()
+        database().defer(self._observe, event_type, value, metadata)
+
+    async def observe_async(self, event_type: str, value: str, metadata: dict = None):
+        self.observe(event_type, value, metadata)
+
+    def flush(self):
+        """Write back dirty co-occurrence counters."""
+        database().write_sync(self._persist)
+
+    def reset(self):
+        """Forget in-memory mining state — call after the DB file is wiped."""
+        self._reset_mining()
+
+    def _load_active(self, conn):
+        active = {}
+        for r in conn.execute("SELECT * FROM patterns WHERE is_active = 1 ORDER BY id"):
+            active.setdefault((r["trigger_event"], r["trigger_value"]), dict(r))
+        self._active = active
+
+    def _observe(self, conn, event_type: str, value: str, metadata: dict = None):
+        self._ensure_loaded(conn)
+        _log_event(conn, event_type, value, metadata)
+        event_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        self._count(conn, event_id, (event_type, value))
+        if event_type in SEQ_EVENT_TYPES:
+            self._sequences.add(value, datetime.now())
+        self._update_patterns(conn, event_type, value)
+        self._unsaved += 1
+        if self._unsaved >= CO_PERSIST_EVERY:
+            self._persist(conn)
+
+    # ── Co-occurrence counters ────────────────────────────────────────────────
+
+    def _ensure_loaded(self, conn):
+        if self._loaded:
+            return
+        self._loaded = True
+        state = dict(conn.execute("SELECT name, value FROM miner_state").fetchall())
+        self._last_id = int(state.get("cooccurrence_last_id", 0))
+        if state.get("sequences"):
+            try:
+                self._sequences.load(state["sequences"])
+            except Exception as e:
+                print(f"[SOUL] sequence miner state unreadable, starting fresh: {e}")
+        for r in conn.execute(
+                "SELECT * FROM cooccurrence WHERE count >= ?", (self.threshold,)):
+            self._hot.setdefault((r["follow_event"], r["follow_value"]), set()).add(
+                (r["pred_event"], r["pred_value"]))
+        recent = conn.execute(
+            "SELECT id, event_type, value FROM events WHERE id <= ? ORDER BY id DESC LIMIT ?",
+            (self._last_id, CO_WINDOW_IDS)).fetchall()
+        for r in reversed(recent):
+            self._window.append((r["id"], (r["event_type"], r["value"])))
+
+        missed = conn.execute(
+            "SELECT id, timestamp, event_type, value FROM events WHERE id > ? ORDER BY id",
+            (self._last_id,)).fetchall()
+        for r in missed:
+            self._count(conn, r["id"], (r["event_type"], r["value"]))
+            if r["event_type"] in SEQ_EVENT_TYPES:
+                self._sequences.add(r["value"], datetime.fromisoformat(r["timestamp"]))
+        if missed:
+            print(f"[SOUL] pattern miner caught up on {len(missed)} event(s)")
+            self._persist(conn)
+
+    def _count(self, conn, event_id: int, key: tuple):
+        if len(self._co) + CO_WINDOW_IDS > CO_CACHE_PAIRS:
+            self._evict(conn)
+        for pred_id, pred in self._window:
+            if pred != key and event_id - pred_id <= CO_WINDOW_IDS:
+                pair = (pred, key)
+                n = self._get_count(conn, pair) + 1
+                self._co[pair] = n
+                self._dirty.add(pair)
+                if n >= self.threshold:
+                    self._hot.setdefault(key, set()).add(pred)
+        self._window.append((event_id, key))
+        self._last_id = event_id
+
+    def _get_count(self, conn, pair: tuple) -> int:
+        if pair in self._co:
+            self._co.move_to_end(pair)
+            return self._co[pair]
+        (pe, pv), (fe, fv) = pair
+        row = conn.execute("""
+            SELECT count FROM cooccurrence
+            WHERE follow_event = ? AND follow_value = ? AND pred_event = ? AND pred_value = ?
+        """, (fe, fv, pe, pv)).fetchone()
+        self._co[pair] = row["count"] if row else 0
+        return self._co[pair]
+
+    def _evict(self, conn):
+        # Write back everything first: the table must always match
+        # cooccurrence_last_id, or a catch-up replay would double count.
+        if self._dirty:
+            self._persist(conn)
+        for _ in range(len(self._co) // 10 or 1):
+            self._co.popitem(last=False)
+
+    def _write_counts(self, conn, items):
+        conn.executemany("""
+            INSERT INTO cooccurrence (follow_event, follow_value, pred_event, pred_value, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(follow_event, follow_value, pred_event, pred_value)
+            DO UPDATE SET count = excluded.count
+        """, [(fe, fv, pe, pv, n) for ((pe, pv), (fe, fv)), n in items])
+
+    def _persist(self, conn):
+        self._write_counts(conn, [(p, self._co[p]) for p in self._dirty])
+        self._dirty.clear()
+        self._unsaved = 0
+        conn.executemany("""
+            INSERT INTO miner_state (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = excluded.value
+        """, [("cooccurrence_last_id", str(self._last_id)),
+              ("sequences", self._sequences.dump())])
+
+    # ── Patterns ──────────────────────────────────────────────────────────────
+
+    def _update_patterns(self, conn, event_type: str, value: str):
+        preceding = sorted(self._hot.get((event_type, value), ()))
 
         now = datetime.now().isoformat()
-        for row in preceding:
+        activated = {}
+        for pred_event, pred_value in preceding:
             existing = conn.execute("""
-                SELECT id, occurrence_count FROM patterns
+                SELECT * FROM patterns
                 WHERE trigger_event = ? AND trigger_value = ? AND follow_action = 'suggest_action'
-            """, (row["event_type"], row["value"])).fetchone()
+            """, (pred_event, pred_value)).fetchone()
 
             if existing:
                 new_count = existing["occurrence_count"] + 1
+                active    = 1 if new_count >= self.threshold else 0
                 conn.execute(
                     "UPDATE patterns SET occurrence_count = ?, is_active = ?, last_seen_at = ? WHERE id = ?",
-                    (new_count, 1 if new_count >= self.threshold else 0, now, existing["id"])
+                    (new_count, active, now, existing["id"])
                 )
+                if active:
+                    activated[(pred_event, pred_value)] = {
+                        **dict(existing), "occurrence_count": new_count,
+                        "is_active": 1, "last_seen_at": now}
             else:
                 conn.execute("""
                     INSERT INTO patterns
                     (trigger_event, trigger_value, follow_action, occurrence_count, is_active, created_at, last_seen_at, display_text)
                     VALUES (?, ?, 'suggest_action', 1, 0, ?, ?, ?)
                 """, (
-                    row["event_type"], row["value"], now, now,
-                    f"When {row['value']} -> {event_type}: {value}"
+                    pred_event, pred_value, now, now,
+                    f"When {pred_value} -> {event_type}: {value}"
                 ))
-        conn.commit()
-        conn.close()
+        if activated:
+            # Publish a new dict in one assignment — never mutate the live one
+            self._active = {**self._active, **activated}
 
     def get_active_patterns(self) -> List[dict]:
-        conn = get_db()
-        rows = conn.execute(
-            "SELECT * FROM patterns WHERE is_active = 1 ORDER BY occurrence_count DESC"
-        ).fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+        """Active pair patterns plus frequent time-windowed sequences."""
+        found = list(self._active.values()) + self._sequences.frequent()
+        return sorted(found, key=lambda p: -p["occurrence_count"])
 
     def check_trigger(self, event_type: str, value: str) -> Optional[dict]:
-        conn = get_db()
-        pattern = conn.execute("""
-            SELECT * FROM patterns
-            WHERE trigger_event = ? AND trigger_value = ? AND is_active = 1
-            LIMIT 1
-        """, (event_type, value)).fetchone()
-        conn.close()
-        return dict(pattern) if pattern else None
+        """Active pattern for this trigger, or None. A dict lookup — don't mutate the result."""
+        return self._active.get((event_type, value))
+
+    async def check_trigger_async(self, event_type: str, value: str) -> Optional[dict]:
+        return self._active.get((event_type, value))
 
     def summary_for_llm(self) -> str:
         patterns = self.get_active_patterns()
@@ -284,6 +1071,13 @@ class PatternEngine:
         lines = [f"- {p['display_text']} (seen {p['occurrence_count']}x)" for p in patterns[:5]]
         return "Learned behavioral patterns:\n" + "\n".join(lines)
 
+    def semantic_recall(self, query: str, k: int = SEMANTIC_K, kinds: tuple = None) -> List[dict]:
+        return semantic_recall(query, k, kinds)
+
+    async def semantic_recall_async(self, query: str, k: int = SEMANTIC_K,
+                                    kinds: tuple = None) -> List[dict]:
+        return await semantic_recall_async(query, k, kinds)
+
     def save_memory(self, key: str, value: str):
         save_key_fact(key, value)
 
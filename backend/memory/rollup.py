@@ -0,0 +1,305 @@
+"""
+SOUL — Session Rollups  v1.0
+memory/rollup.py
+
+Long-term memory that doesn't grow the prompt. A background job folds
+finished conversations into short summaries; boot and clear_history inject a
+fixed-size digest of those instead of raw transcript lines.
+
+  SessionRollup(summarizer)
+    .run_once()            → roll up whatever has finished since last time
+    .start() / .stop()     → the same every ROLLUP_EVERY_SEC in the background
+  memory_digest()          → "" or the block for GroqClient.inject_memory
+  memory_digest_async()    → the same, awaited from the event loop
+
+Levels (one table, session_summaries — schema v7 in memory/patterns.py):
+  session — a run of messages with no gap longer than SESSION_GAP. Finished
+            once its last message is SESSION_GAP old. One to two sentences.
+  day     — every session that started that day, merged once the day is over.
+
+The digest is the last DIGEST_DAYS day summaries, the last DIGEST_SESSIONS
+session summaries, and the raw last DIGEST_TAIL messages nobody has rolled up
+yet — the same size after a week or a year.
+
+summarizer is async (prompt) -> str, normally GroqClient.summarize. Without
+one, or when it fails or returns nothing, a local extractive summary (time
+span, message count, top terms, opening request) is stored instead, so the
+job never stalls on the network. Short sessions, and anything older than
+LLM_MAX_AGE (the backlog on first run), always use the local one.
+"""
+
+import asyncio
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from memory.patterns import _RECALL_STOPWORDS, _history_after, database
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+SESSION_GAP      = timedelta(minutes=30)
+ROLLUP_EVERY_SEC = 600
+ROLLUP_BATCH     = 2000     # history rows read per pass
+LLM_MIN_MESSAGES = 4        # shorter sessions get the local summary
+LLM_MAX_AGE      = timedelta(days=7)   # older backlog (first run) stays local
+TRANSCRIPT_CHARS = 6000     # head + tail of a long session sent to the summarizer
+SESSION_CHARS    = 300      # stored summary caps
+DAY_CHARS        = 400
+DIGEST_DAYS      = 7
+DIGEST_SESSIONS  = 3
+DIGEST_TAIL      = 4
+
+_WATERMARK = "rollup_last_id"
+
+_SESSION_PROMPT = (
+    "Summarize this conversation between a user and their desktop assistant in "
+    "one or two sentences: what the user was working on, what they asked for, "
+    "and anything they'd expect the assistant to remember. No preamble.\n\n{text}"
+)
+_DAY_PROMPT = (
+    "Merge these summaries of one day's conversations into one or two "
+    "sentences. Keep names, projects and open tasks. No preamble.\n\n{text}"
+)
+
+
+def _is_context_echo(content: str) -> bool:
+    # Raw context packets once saved as messages — same test as format_memory_for_llm
+    return content.startswith("[") and "CPU:" in content and "RAM:" in content
+
+
+def _split_sessions(rows: List[dict]) -> List[List[dict]]:
+    sessions: List[List[dict]] = []
+    last = None
+    for r in rows:
+        ts = datetime.fromisoformat(r["timestamp"])
+        if last is None or ts - last > SESSION_GAP:
+            sessions.append([])
+        sessions[-1].append(r)
+        last = ts
+    return sessions
+
+
+def _span(first: str, last: str) -> str:
+    start = first[:16].replace("T", " ")
+    end   = last[11:16] if last[:10] == first[:10] else last[:16].replace("T", " ")
+    return f"{start}–{end}"
+
+
+def _local_summary(rows: List[dict]) -> str:
+    user = [r["content"] for r in rows if r["role"] == "user"]
+    words = Counter(w for text in user
+                    for w in re.findall(r"[a-z][a-z0-9_']{3,}", text.lower())
+                    if w not in _RECALL_STOPWORDS)
+    parts = [f"{len(rows)} messages"]
+    if words:
+        parts.append("topics: " + ", ".join(w for w, _ in words.most_common(5)))
+    if user:
+        opener = " ".join(user[0].split())
+        parts.append(f'opened with "{opener[:120]}{"…" if len(opener) > 120 else ""}"')
+    return "; ".join(parts)
+
+
+def _local_day(sessions: List[dict]) -> str:
+    out = f"{len(sessions)} sessions, {sum(s['message_count'] for s in sessions)} messages"
+    for s in sessions:
+        if len(out) + len(s["summary"]) + 3 > DAY_CHARS:
+            break
+        out += " | " + s["summary"]
+    return out
+
+
+def _transcript(rows: List[dict]) -> str:
+    lines = [f"{'User' if r['role'] == 'user' else 'Assistant'}: {' '.join(r['content'].split())}"
+             for r in rows]
+    text = "\n".join(lines)
+    if len(text) <= TRANSCRIPT_CHARS:
+        return text
+    half = TRANSCRIPT_CHARS // 2
+    return text[:half] + "\n…\n" + text[-half:]
+
+
+# ── DB jobs ───────────────────────────────────────────────────────────────────
+
+def _watermark(conn) -> int:
+    row = conn.execute("SELECT value FROM miner_state WHERE name = ?", (_WATERMARK,)).fetchone()
+    return int(row["value"]) if row else 0
+
+
+def _pending(conn, n: int = ROLLUP_BATCH) -> Tuple[List[dict], bool]:
+    """Up to n rows past the watermark, and whether any row follows them."""
+    # _history_after stops at an archive chunk boundary — keep reading to n
+    rows, after = [], _watermark(conn)
+    while len(rows) < n:
+        page = _history_after(conn, after, None, None, n - len(rows))
+        if not page:
+            return rows, False
+        rows += page
+        after = page[-1]["id"]
+    return rows, bool(_history_after(conn, after, None, None, 1))
+
+
+def _store_session(conn, rows: List[dict], summary: str):
+    conn.execute("""
+        INSERT INTO session_summaries
+        (level, day, first_id, last_id, started_at, ended_at, message_count, summary)
+        VALUES ('session', ?, ?, ?, ?, ?, ?, ?)
+    """, (rows[0]["timestamp"][:10], rows[0]["id"], rows[-1]["id"],
+          rows[0]["timestamp"], rows[-1]["timestamp"], len(rows), summary[:SESSION_CHARS]))
+    conn.execute("""
+        INSERT INTO miner_state (name, value) VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value
+    """, (_WATERMARK, str(rows[-1]["id"])))
+
+
+def _days_to_merge(conn, before_day: str) -> dict:
+    """Finished days with session summaries but no day summary yet."""
+    rows = conn.execute("""
+        SELECT s.* FROM session_summaries s
+        WHERE s.level = 'session' AND s.day < ?
+          AND NOT EXISTS (SELECT 1 FROM session_summaries d
+                          WHERE d.level = 'day' AND d.day = s.day)
+        ORDER BY s.last_id
+    """, (before_day,)).fetchall()
+    days: dict = {}
+    for r in rows:
+        days.setdefault(r["day"], []).append(dict(r))
+    return days
+
+
+def _store_day(conn, day: str, sessions: List[dict], summary: str):
+    conn.execute("""
+        INSERT OR IGNORE INTO session_summaries
+        (level, day, first_id, last_id, started_at, ended_at, message_count, summary)
+        VALUES ('day', ?, ?, ?, ?, ?, ?, ?)
+    """, (day, sessions[0]["first_id"], sessions[-1]["last_id"],
+          sessions[0]["started_at"], sessions[-1]["ended_at"],
+          sum(s["message_count"] for s in sessions), summary[:DAY_CHARS]))
+
+
+def _digest_rows(conn) -> tuple:
+    sessions = conn.execute(
+        "SELECT first_id, started_at, ended_at, summary FROM session_summaries "
+        "WHERE level = 'session' ORDER BY last_id DESC LIMIT ?", (DIGEST_SESSIONS,)).fetchall()
+    # Days before the sessions shown, so nothing appears twice
+    oldest = sessions[-1]["first_id"] if sessions else 1 << 62
+    days = conn.execute(
+        "SELECT day, summary FROM session_summaries WHERE level = 'day' AND last_id < ? "
+        "ORDER BY last_id DESC LIMIT ?", (oldest, DIGEST_DAYS)).fetchall()
+    tail = conn.execute(
+        "SELECT timestamp, role, content FROM session_history WHERE id > ? "
+        "ORDER BY id DESC LIMIT ?", (_watermark(conn), DIGEST_TAIL)).fetchall()
+    return ([dict(r) for r in reversed(days)], [dict(r) for r in reversed(sessions)],
+            [dict(r) for r in reversed(tail)])
+
+
+def memory_digest() -> str:
+    """Precomputed long-term memory block for the LLM, or "" when there's none."""
+    return _format_digest(*database().read_sync(_digest_rows))
+
+
+async def memory_digest_async() -> str:
+    return _format_digest(*await database().read(_digest_rows))
+
+
+def _format_digest(days: list, sessions: list, tail: list) -> str:
+    lines: List[str] = []
+    if days:
+        lines.append("[Earlier days]")
+        lines += [f"{d['day']}: {d['summary']}" for d in days]
+    if sessions:
+        lines.append("[Recent sessions]")
+        lines += [f"{_span(s['started_at'], s['ended_at'])}: {s['summary']}" for s in sessions]
+    tail = [t for t in tail if not _is_context_echo(t["content"])]
+    if tail:
+        try:
+            from config import load_config as _lc
+            _cfg = _lc()
+            user_name   = _cfg["entity"].get("user_name", "") or "User"
+            entity_name = _cfg["entity"].get("name", "SOUL") or "SOUL"
+        except Exception:
+            user_name, entity_name = "User", "SOUL"
+        lines.append("[Latest messages]")
+        for t in tail:
+            who  = user_name if t["role"] == "user" else entity_name
+            text = t["content"][:200] + "..." if len(t["content"]) > 200 else t["content"]
+            lines.append(f"[{t['timestamp'][:16].replace('T', ' ')}] {who}: {text}")
+    return "\n".join(lines)
+
+
+# ── Background job ────────────────────────────────────────────────────────────
+
+class SessionRollup:
+    def __init__(self, summarizer: Optional[Callable[[str], Awaitable[str]]] = None):
+        self.summarizer = summarizer
+        self._running   = False
+        self._llm_ok    = True      # cleared for the rest of a run after a failure
+
+    async def _summarize(self, prompt: str, fallback: str) -> str:
+        if self.summarizer and self._llm_ok:
+            try:
+                text = " ".join((await self.summarizer(prompt) or "").split())
+                if text:
+                    return text
+                print("[SOUL] rollup summarizer returned nothing — local summaries this pass")
+            except Exception as e:
+                print(f"[SOUL] rollup summarizer failed — local summaries this pass: {e}")
+            self._llm_ok = False
+        return fallback
+
+    async def run_once(self) -> int:
+        """Summarize finished sessions, then finished days. Returns sessions rolled up."""
+        db      = database()
+        now     = datetime.now()
+        cutoff  = now - SESSION_GAP
+        rolled  = 0
+        self._llm_ok = True
+        while True:
+            rows, more = await db.read(_pending)
+            sessions   = _split_sessions(rows)
+            if sessions and (datetime.fromisoformat(sessions[-1][-1]["timestamp"]) > cutoff
+                             or (more and len(sessions) > 1)):
+                sessions.pop()      # still going, or may continue past this batch
+            if not sessions:
+                break
+            for s in sessions:
+                kept  = [r for r in s if not _is_context_echo(r["content"])] or s
+                local = _local_summary(kept)
+                text  = local
+                if (len(kept) >= LLM_MIN_MESSAGES
+                        and now - datetime.fromisoformat(s[0]["timestamp"]) < LLM_MAX_AGE):
+                    text = await self._summarize(
+                        _SESSION_PROMPT.format(text=_transcript(kept)), local)
+                await db.write(_store_session, s, text)
+                rolled += 1
+            if not more:
+                break
+
+        # A day is done once it's over and no unrolled message started on it
+        first   = (await db.read(_pending, 1))[0]
+        before  = first[0]["timestamp"][:10] if first else now.date().isoformat()
+        recent  = (now - LLM_MAX_AGE).date().isoformat()
+        for day, sessions in (await db.read(_days_to_merge, before)).items():
+            local = sessions[0]["summary"] if len(sessions) == 1 else _local_day(sessions)
+            if len(sessions) == 1 or day < recent:
+                text = local
+            else:
+                joined = "\n".join(f"- {s['summary']}" for s in sessions)
+                text = await self._summarize(_DAY_PROMPT.format(text=joined), local)
+            await db.write(_store_day, day, sessions, text)
+
+        if rolled:
+            print(f"[SOUL] rolled up {rolled} session(s)")
+        return rolled
+
+    async def start(self):
+        self._running = True
+        while self._running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"[SOUL] session rollup error: {e}")
+            await asyncio.sleep(ROLLUP_EVERY_SEC)
+
+    def stop(self):
+        self._running = False
@@ -0,0 +1,177 @@
+"""
+SOUL — Semantic Memory Index  v1.0
+memory/vectors.py
+
+Offline semantic recall for memory/patterns.py — no model download, no network.
+
+  embed(text)               → unit float32 vector (hashing trick: words plus
+                              character trigrams, signed buckets, sqrt-damped)
+  VectorIndex(path)
+    .append(conn, kind, text, ref_id)   → DB writer thread only
+    .search(conn, query, k, kinds)      → any reader thread
+
+Character trigrams are what catch paraphrase-ish overlap that keyword search
+misses ("that import error" vs "ImportError traceback"); whole words keep
+exact terms in play. Each word's trigrams share a fixed weight so long words
+don't drown short ones, and bucket values are sqrt-damped so repeated terms
+don't dominate. Settings were picked on a small paraphrase set against 2000
+filler sentences.
+
+Storage: one float16 row per entry in a flat file next to the DB
+(soul_vectors.f16), memory-mapped and grown GROW_ROWS at a time. Row metadata
+(kind, ref id, time, text) lives in the `vectors` table; row N of the table
+is slot N-1 in the file, and the table is the source of truth for how many
+slots are valid. Search is a chunked NumPy dot product + argpartition top-k.
+
+NumPy is optional: without it `available` is False and search returns [].
+"""
+
+import re
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    print("[SOUL] numpy not installed — semantic memory recall disabled")
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+DIM            = 512      # embedding width (1 KiB per row at float16)
+GROW_ROWS      = 4096     # file grows by this many rows at a time
+SEARCH_CHUNK   = 65536    # rows per float32 matmul chunk
+TRIGRAM_WEIGHT = 2.0      # per word, split across its trigrams; the word counts 1.0
+MIN_TEXT_CHARS = 12       # shorter texts aren't worth a row
+
+_WORD_RE = re.compile(r"[a-z0-9_]{2,}")
+
+# Filler that would otherwise dominate short queries ("what was that …")
+_STOPWORDS = {
+    "the", "and", "for", "you", "your", "are", "was", "were", "that", "this",
+    "with", "have", "has", "had", "not", "but", "can", "what", "when", "where",
+    "who", "how", "why", "did", "does", "just", "from", "about", "into", "its",
+    "them", "they", "then", "there", "here", "some", "any", "all", "is", "it",
+    "an", "in", "on", "of", "to", "me", "my", "we", "be", "do", "so", "or",
+    "at", "as", "by", "if", "no", "up", "yesterday", "today", "earlier",
+    "before", "ago", "last", "again", "remember", "said", "told", "mentioned",
+}
+
+
+def _features(text: str):
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        yield word, 1.0
+        padded = f"#{word}#"
+        share  = TRIGRAM_WEIGHT / (len(padded) - 2) ** 0.5
+        for i in range(len(padded) - 2):
+            yield padded[i:i+3], share
+
+
+def embed(text: str):
+    """Unit-length float32 vector for text (all zeros if nothing to hash)."""
+    vec = np.zeros(DIM, dtype=np.float32)
+    for feat, weight in _features(text or ""):
+        h = zlib.crc32(feat.encode("utf-8"))
+        vec[h % DIM] += weight if h & 0x80000000 else -weight
+    vec  = np.sign(vec) * np.sqrt(np.abs(vec))
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class VectorIndex:
+    def __init__(self, path: Path):
+        self.path   = Path(path)
+        self._lock  = threading.Lock()
+        self._mm    = None
+        self._cap   = 0
+        self._n     = 0
+        self.available = NUMPY_AVAILABLE
+
+    def load(self, conn):
+        """Count valid rows and map the file. Called on the writer thread."""
+        if not self.available:
+            return
+        n = conn.execute("SELECT COALESCE(MAX(row), 0) FROM vectors").fetchone()[0]
+        on_disk = self.path.stat().st_size // (DIM * 2) if self.path.exists() else 0
+        if on_disk < n:
+            # File lost rows the table still lists (crash mid-grow) — forget them
+            conn.execute("DELETE FROM vectors WHERE row > ?", (on_disk,))
+            n = on_disk
+        self._map(max(on_disk, GROW_ROWS))
+        self._n = n
+
+    def _map(self, rows: int):
+        mode = "r+" if self.path.exists() else "w+"
+        mm = np.memmap(self.path, dtype=np.float16, mode=mode, shape=(rows, DIM))
+        with self._lock:
+            old, self._mm, self._cap = self._mm, mm, rows
+        if old is not None:
+            old.flush()
+
+    def append(self, conn, kind: str, text: str, ref_id: Optional[int] = None):
+        """Embed and store one entry. Writer thread only."""
+        if not self.available or not text or len(text.strip()) < MIN_TEXT_CHARS:
+            return
+        row = conn.execute("SELECT COALESCE(MAX(row), 0) FROM vectors").fetchone()[0] + 1
+        if row > self._cap:
+            self._map(self._cap + GROW_ROWS)
+        self._mm[row - 1] = embed(text).astype(np.float16)
+        conn.execute(
+            "INSERT INTO vectors (row, kind, ref_id, timestamp, text) VALUES (?, ?, ?, ?, ?)",
+            (row, kind, ref_id, datetime.now().isoformat(), text[:1000]))
+        with self._lock:
+            self._n = max(self._n, row)
+
+    def search(self, conn, query: str, k: int = 4, kinds: tuple = None,
+               min_score: float = 0.0) -> List[dict]:
+        """Top-k rows by cosine similarity: {row, kind, ref_id, timestamp, text, score}."""
+        if not self.available:
+            return []
+        with self._lock:
+            mm, n = self._mm, self._n
+        if mm is None or n == 0:
+            return []
+        q = embed(query)
+        if not q.any():
+            return []
+
+        want   = k * 4 if kinds else k    # room for rows the kind filter drops
+        best_i = np.empty(0, dtype=np.int64)
+        best_s = np.empty(0, dtype=np.float32)
+        for start in range(0, n, SEARCH_CHUNK):
+            block  = np.asarray(mm[start:min(start + SEARCH_CHUNK, n)], dtype=np.float32)
+            scores = block @ q
+            take   = min(want, len(scores))
+            top    = np.argpartition(-scores, take - 1)[:take]
+            best_i = np.concatenate([best_i, top + start])
+            best_s = np.concatenate([best_s, scores[top]])
+        order = np.argsort(-best_s)[:want]
+
+        out: List[dict] = []
+        for idx in order:
+            score = float(best_s[idx])
+            if score < min_score:
+                break
+            r = conn.execute(
+                "SELECT row, kind, ref_id, timestamp, text FROM vectors WHERE row = ?",
+                (int(best_i[idx]) + 1,)).fetchone()
+            if r is None or (kinds and r["kind"] not in kinds):
+                continue
+            out.append({**dict(r), "score": round(score, 3)})
+            if len(out) >= k:
+                break
+        return out
+
+    def close(self):
+        with self._lock:
+            mm, self._mm = self._mm, None
+        if mm is not None:
+            mm.flush()
+            del mm
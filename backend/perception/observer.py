@@ -6,9 +6,15 @@ The closed loop between eyes and hands.
 
 What this does:
   - Runs as a background async task alongside ScreenWatcher
-  - Every 15s: compares new screen summary to previous
+  - Wakes when ScreenWatcher publishes a new summary (wait_for_summary) and
+    compares it to the previous one; sleeps otherwise. A summary that lands
+    while the user is active or during the cooldown is held and re-checked
+    the moment that gate opens
   - Scores whether the change is worth SOUL mentioning
-  - If yes: asks the LLM (fast model, minimal tokens) for a short observation
+  - Runs it past the local pre-filter (perception/prefilter.py): rules, a
+    SKIP cache and a classifier trained on past LLM answers settle the
+    obvious SKIPs; only the rest reach the LLM
+  - If still open: asks the LLM (fast model, minimal tokens) for a short observation
   - Broadcasts proactive_message to frontend
 
 Triggers proactive speech when:
@@ -26,6 +32,11 @@ Does NOT trigger when:
   - Vision is OFF
   - No WebSocket clients are connected
 
+Structured screens (ScreenWatcher.state, structured vision mode):
+  change detection compares fields — new alerts are the priority signal, a
+  different app/window is an app change, key-text overlap decides the rest.
+  The text heuristics below are the fallback when no state is available.
+
 Ambient mode auto-switch:
   - Separate loop polls every 30s
   - If no user message for >= AMBIENT_IDLE_SEC (300 = 5 min), broadcasts enter_ambient
@@ -35,15 +46,19 @@ Ambient mode auto-switch:
 import asyncio
 import re
 import time
-from difflib import SequenceMatcher
 from typing import Optional, Callable, Awaitable
 
+from perception.prefilter import Prefilter
+from perception.similarity import similarity
+
 # ── Tuneable constants ────────────────────────────────────────────────────────
 
-POLL_INTERVAL_SEC    = 15     # how often the observer wakes up
+POLL_INTERVAL_SEC    = 15     # longest sleep while a held summary waits on the gates
+IDLE_WAKE_SEC        = 60     # longest sleep with nothing new (lets stop() land)
 USER_IDLE_MIN_SEC    = 45     # min seconds since last user msg before she speaks
 PROACTIVE_COOLDOWN   = 180    # min seconds between consecutive proactive messages
 SIMILARITY_THRESHOLD = 0.82   # above this → screens are "the same", skip
+TEXT_OVERLAP_MIN     = 0.5    # structured: same window + this much key text → skip
 AMBIENT_IDLE_SEC     = 300    # 5 minutes inactivity → ambient mode
 AMBIENT_POLL_SEC     = 30     # how often idle-checker runs
 
@@ -74,13 +89,6 @@ _BORING_PATTERNS = re.compile(
 )
 
 
-def _similarity(a: str, b: str) -> float:
-    """Normalized 0-1 text similarity. 1.0 = identical."""
-    if not a or not b:
-        return 0.0
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-
-
 def _extract_app(summary: str) -> str:
     """Try to pull the primary app name from a vision summary."""
     # Vision model usually says "The screen shows X" or "X is open"
@@ -94,10 +102,34 @@ def _extract_app(summary: str) -> str:
     return ""
 
 
-def _is_meaningful_change(prev: str, curr: str) -> tuple[bool, str]:
+def _structured_change(prev, curr) -> tuple[bool, str]:
+    """_is_meaningful_change for two ScreenStates — field comparisons only."""
+    new_alerts = curr.new_alerts(prev)
+    if new_alerts:
+        return True, f"priority_signal: {new_alerts[0]}"
+
+    if prev.app and curr.app and prev.app.lower() != curr.app.lower():
+        return True, f"app_change: {prev.app.lower()} → {curr.app.lower()}"
+
+    if _BORING_PATTERNS.search(f"{curr.app} {curr.title}") and not curr.alerts:
+        return False, "boring_content"
+
+    if curr.same_window(prev):
+        overlap = curr.text_overlap(prev)
+        if overlap >= TEXT_OVERLAP_MIN:
+            return False, f"same_window: text_overlap={overlap:.2f}"
+        return True, f"content_change: text_overlap={overlap:.2f}"
+
+    return True, f"content_change: title → {curr.title[:40]}"
+
+
+def _is_meaningful_change(prev: str, curr: str,
+                          prev_state=None, curr_state=None) -> tuple[bool, str]:
     """
     Returns (is_meaningful, reason).
 
+    With ScreenStates for both captures, compares fields (_structured_change).
+    Otherwise, on the text summaries:
     Priority check first (errors etc.) — these always fire.
     Then similarity gate — screens that are ~identical don't fire.
     Then app-change check — different active app is worth noting.
@@ -106,6 +138,9 @@ def _is_meaningful_change(prev: str, curr: str) -> tuple[bool, str]:
         # First real summary — no comparison possible, skip
         return False, "first capture"
 
+    if prev_state is not None and curr_state is not None:
+        return _structured_change(prev_state, curr_state)
+
     # Priority: error/crash/notification signals always fire
     prev_prio = bool(_PRIORITY_PATTERNS.search(prev))
     curr_prio = bool(_PRIORITY_PATTERNS.search(curr))
@@ -113,7 +148,7 @@ def _is_meaningful_change(prev: str, curr: str) -> tuple[bool, str]:
         return True, "priority_signal"
 
     # Similarity gate: if screens look basically the same, skip
-    sim = _similarity(prev, curr)
+    sim = similarity(prev, curr)
     if sim >= SIMILARITY_THRESHOLD:
         return False, f"similarity={sim:.2f}"
 
@@ -170,8 +205,10 @@ class VisionObserver:
 
         self._running            = False
         self._last_summary       = ""
+        self._last_state         = None    # ScreenState from the same capture, if structured
         self._last_proactive_at  = 0.0
         self._ambient_sent       = False   # tracks if we've already sent enter_ambient
+        self.prefilter           = Prefilter(_PRIORITY_PATTERNS, _BORING_PATTERNS)
 
     # ── Public controls ───────────────────────────────────────────────────────
 
@@ -181,6 +218,10 @@ class VisionObserver:
 
     async def start(self):
         self._running = True
+        try:
+            await self.prefilter.load()
+        except Exception as ex:
+            print(f"[SOUL] observer prefilter load failed — starting untrained: {ex}")
         await asyncio.gather(
             self._vision_loop(),
             self._ambient_loop(),
@@ -192,45 +233,68 @@ class VisionObserver:
     # ── Vision observation loop ───────────────────────────────────────────────
 
     async def _vision_loop(self):
+        seen, held = 0, False
         while self._running:
-            await asyncio.sleep(POLL_INTERVAL_SEC)
+            sw = self.screen_watcher
+            timeout = self._gate_wait() if held else IDLE_WAKE_SEC
+            if sw is None or not hasattr(sw, "wait_for_summary"):
+                await asyncio.sleep(POLL_INTERVAL_SEC)
+                version, held = 0, True
+            else:
+                version = await sw.wait_for_summary(seen, timeout)
+                held = held or version > seen
+                seen = version
+            if not held or not self._running:
+                continue
             try:
-                await self._tick_vision()
+                held = not await self._tick_vision()
             except Exception as ex:
+                held = False
                 print(f"[SOUL] observer vision tick error: {ex}")
 
-    async def _tick_vision(self):
-        # Bail fast on any inactive condition
+    def _gate_wait(self) -> float:
+        """Seconds until the idle/cooldown gates could open (bounded)."""
+        opens = max(self._get_last_user_time() + USER_IDLE_MIN_SEC,
+                    self._last_proactive_at + PROACTIVE_COOLDOWN)
+        return min(max(opens - time.time(), 0.5), POLL_INTERVAL_SEC)
+
+    async def _tick_vision(self) -> bool:
+        """Evaluate the current summary. False = gated, keep it for a re-check."""
+        # Bail fast on any inactive condition. _last_summary stays put, so the
+        # change is still caught against the next summary once these clear.
         if not self._get_screen_enabled():
-            return
+            return True
         if not self._get_ws_clients():
-            return
+            return True
 
         summary = getattr(self.screen_watcher, "summary", "") if self.screen_watcher else ""
         if not summary or summary.startswith("Screen vision unavail"):
-            return
+            return True
 
         # Don't interrupt active conversation
         idle_sec = time.time() - self._get_last_user_time()
         if idle_sec < USER_IDLE_MIN_SEC:
-            return
+            return False
 
         # Proactive cooldown
         if time.time() - self._last_proactive_at < PROACTIVE_COOLDOWN:
-            return
+            return False
 
-        meaningful, reason = _is_meaningful_change(self._last_summary, summary)
+        state = getattr(self.screen_watcher, "state", None)
+        meaningful, reason = _is_meaningful_change(self._last_summary, summary,
+                                                   self._last_state, state)
         self._last_summary = summary
+        self._last_state   = state
 
         if not meaningful:
-            return
+            return True
 
         print(f"[SOUL] observer: meaningful change ({reason}) — evaluating")
 
         # Ask LLM: is this worth saying something about?
         observation = await self._evaluate(summary, reason)
         if not observation:
-            return
+            return True
 
         self._last_proactive_at = time.time()
         print(f"[SOUL] observer: proactive → {observation[:80]}")
@@ -248,13 +312,20 @@ class VisionObserver:
             "role":    "assistant",
             "content": observation,
         })
+        return True
 
     async def _evaluate(self, screen_summary: str, change_reason: str) -> Optional[str]:
         """
         Asks the LLM whether this screen state is worth a proactive comment.
         Uses the fast 8B model, minimal token budget.
         Returns a short natural message, or None if not worth mentioning.
+        The pre-filter answers SKIP locally when it's confident.
         """
+        verdict = self.prefilter.decide(screen_summary, change_reason)
+        if verdict.skip:
+            print(f"[SOUL] observer: skipped locally ({verdict.stage})")
+            return None
+
         from groq_client import _FAST_MODEL, GROQ_API_BASE
         import httpx, json as _json
 
@@ -314,7 +385,9 @@ Examples:
                         continue
                     if r.status_code == 200:
                         text = r.json()["choices"][0]["message"]["content"].strip()
-                        if text.upper() == "SKIP" or text.upper().startswith("SKIP"):
+                        skip = text.upper() == "SKIP" or text.upper().startswith("SKIP")
+                        self.prefilter.record(screen_summary, change_reason, skip, verdict)
+                        if skip:
                             return None
                         # Sanity check — must be short
                         if len(text) > 200:
@@ -0,0 +1,219 @@
+"""
+SOUL — Observer Pre-filter  v1.0
+perception/prefilter.py
+
+Decides locally, when it safely can, what the 8B model would say to "is this
+screen change worth a comment?" — which is SKIP most of the time.
+
+  Prefilter(priority, boring)      ← the observer's _PRIORITY_PATTERNS / _BORING_PATTERNS
+    .load()                        → train from logged decisions (call once)
+    .decide(summary, reason)       → Verdict: ask the LLM, or skip locally
+    .record(summary, reason, skip, verdict)  → log the LLM's answer, learn from it
+  prefilter_stats()                → LLM calls avoided, local-stage precision
+
+Cascade, cheapest first; anything not settled falls through to the LLM:
+  1. rules  — the observer's own phrase lists. Priority phrases (errors,
+              crashes, notifications) always go to the LLM: it has to write
+              the sentence anyway. Boring screens (desktop, video, music)
+              are skipped, but only on a plain content_change — an app
+              switch or a new alert always gets past the rule.
+  2. cache  — the LLM's last SKIP for the same summary signature (lowercased,
+              digits dropped, so clocks and counters don't break the match).
+  3. model  — naive Bayes over summary words plus the change reason, trained
+              on logged LLM decisions. Skips when P(skip) >= SKIP_CONFIDENCE,
+              and only once it has seen MIN_TRAINING of each answer.
+
+Only SKIP is ever decided locally — a "speak" verdict still needs the LLM's
+sentence. Every decision lands in observer_decisions (schema v8 in
+memory/patterns.py). AUDIT_RATE of local skips go to the LLM anyway, with
+the local verdict stored next to its answer; precision is measured on those.
+"""
+
+import math
+import random
+import re
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from memory.patterns import database
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+SKIP_CONFIDENCE = 0.92    # model posterior needed to skip without the LLM
+MIN_TRAINING    = 15      # LLM decisions of each kind before the model votes
+TRAIN_ROWS      = 2000    # most recent LLM decisions loaded at start
+AUDIT_RATE      = 0.1     # local skips still sent to the LLM, for precision
+CACHE_SIZE      = 256     # summary signatures remembered as SKIP
+DECISIONS_KEEP  = 5000    # observer_decisions rows kept
+
+_WORD_RE = re.compile(r"[a-z][a-z']{2,}")
+
+# Change reasons that mean the screen itself changed shape (app switch, new
+# alert) — the boring rule never skips these
+_STRUCTURAL = {"app_change", "priority_signal"}
+
+
+@dataclass(frozen=True)
+class Verdict:
+    skip:  bool              # True → don't call the LLM
+    stage: str               # rule | cache | model | llm
+    p_skip: Optional[float] = None
+    audit: bool = False      # local skip sent to the LLM anyway
+
+    @property
+    def local(self) -> Optional[str]:
+        """What the local stages concluded: 'skip', or None if they passed."""
+        return "skip" if self.skip or self.audit else None
+
+
+def _reason_kind(reason: str) -> str:
+    # "app_change: code → chrome" → "app_change"
+    return reason.split(":", 1)[0].strip() or "change"
+
+
+def _signature(summary: str) -> int:
+    return zlib.crc32(" ".join(re.sub(r"\d+", "", summary.lower()).split()).encode("utf-8"))
+
+
+def _tokens(summary: str, reason: str) -> set:
+    words = set(_WORD_RE.findall(summary.lower()))
+    words.add(f"reason:{_reason_kind(reason)}")
+    return words
+
+
+# ── DB jobs ───────────────────────────────────────────────────────────────────
+
+def _training_rows(conn, n: int) -> list:
+    rows = conn.execute(
+        "SELECT summary, reason, decision FROM observer_decisions "
+        "WHERE stage = 'llm' ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _log_decision(conn, summary: str, reason: str, stage: str, decision: str,
+                  local: Optional[str], p_skip: Optional[float]):
+    cur = conn.execute("""
+        INSERT INTO observer_decisions
+        (timestamp, summary, reason, stage, decision, local, p_skip)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (datetime.now().isoformat(), summary[:1000], reason[:200], stage, decision, local,
+          None if p_skip is None else round(p_skip, 4)))
+    if cur.lastrowid % 500 == 0:
+        conn.execute("DELETE FROM observer_decisions WHERE id <= ?",
+                     (cur.lastrowid - DECISIONS_KEEP,))
+
+
+def _decision_stats(conn) -> dict:
+    by_stage = {r["stage"]: r["n"] for r in conn.execute(
+        "SELECT stage, COUNT(*) AS n FROM observer_decisions GROUP BY stage")}
+    audit = conn.execute("""
+        SELECT COUNT(*) AS n, COALESCE(SUM(decision = 'skip'), 0) AS agreed
+        FROM observer_decisions WHERE stage = 'llm' AND local = 'skip'
+    """).fetchone()
+    llm = by_stage.get("llm", 0)
+    avoided = sum(n for stage, n in by_stage.items() if stage != "llm")
+    return {
+        "decisions":     llm + avoided,
+        "llm_calls":     llm,
+        "avoided":       avoided,
+        "avoided_by":    {s: n for s, n in by_stage.items() if s != "llm"},
+        "avoided_rate":  round(avoided / (llm + avoided), 3) if llm + avoided else 0.0,
+        "audited":       audit["n"],
+        "local_precision": round(audit["agreed"] / audit["n"], 3) if audit["n"] else None,
+    }
+
+
+async def prefilter_stats() -> dict:
+    """Counts from observer_decisions: LLM calls made and avoided, audit precision."""
+    return await database().read(_decision_stats)
+
+
+# ── Naive Bayes ───────────────────────────────────────────────────────────────
+
+class _NaiveBayes:
+    """Bernoulli-style naive Bayes over token sets, two classes, add-one smoothing."""
+
+    def __init__(self):
+        self.docs   = {"skip": 0, "speak": 0}
+        self.counts = {"skip": Counter(), "speak": Counter()}
+
+    def learn(self, tokens: set, label: str):
+        self.docs[label] += 1
+        self.counts[label].update(tokens)
+
+    def ready(self) -> bool:
+        return min(self.docs.values()) >= MIN_TRAINING
+
+    def p_skip(self, tokens: set) -> float:
+        n_skip, n_speak = self.docs["skip"], self.docs["speak"]
+        log_odds = math.log((n_skip + 1) / (n_speak + 1))
+        skip, speak = self.counts["skip"], self.counts["speak"]
+        for t in tokens:
+            if t in skip or t in speak:    # unseen in both → no evidence
+                log_odds += math.log((skip[t] + 1) / (n_skip + 2))
+                log_odds -= math.log((speak[t] + 1) / (n_speak + 2))
+        return 1 / (1 + math.exp(-max(min(log_odds, 50), -50)))
+
+
+# ── Cascade ───────────────────────────────────────────────────────────────────
+
+class Prefilter:
+    def __init__(self, priority: re.Pattern, boring: re.Pattern):
+        self._priority = priority                   # observer's phrase lists
+        self._boring   = boring
+        self._model    = _NaiveBayes()
+        self._skips: OrderedDict = OrderedDict()    # signature → True, LRU
+
+    async def load(self):
+        """Train on the most recent logged LLM decisions."""
+        rows = await database().read(_training_rows, TRAIN_ROWS)
+        for r in reversed(rows):
+            self._learn(r["summary"], r["reason"], r["decision"] == "skip")
+        if rows:
+            print(f"[SOUL] observer prefilter trained on {len(rows)} decisions "
+                  f"({self._model.docs['skip']} skip / {self._model.docs['speak']} speak)")
+
+    def _learn(self, summary: str, reason: str, skip: bool):
+        self._model.learn(_tokens(summary, reason), "skip" if skip else "speak")
+        sig = _signature(summary)
+        if skip:
+            self._skips[sig] = True
+            self._skips.move_to_end(sig)
+            while len(self._skips) > CACHE_SIZE:
+                self._skips.popitem(last=False)
+        else:
+            self._skips.pop(sig, None)
+
+    def decide(self, summary: str, reason: str) -> Verdict:
+        kind = _reason_kind(reason)
+        if kind == "priority_signal" or self._priority.search(summary):
+            return Verdict(False, "llm")
+
+        verdict = None
+        if kind not in _STRUCTURAL and self._boring.search(summary):
+            verdict = Verdict(True, "rule")
+        elif _signature(summary) in self._skips:
+            verdict = Verdict(True, "cache")
+        elif self._model.ready():
+            p = self._model.p_skip(_tokens(summary, reason))
+            if p >= SKIP_CONFIDENCE:
+                verdict = Verdict(True, "model", p)
+            else:
+                return Verdict(False, "llm", p)
+        if verdict is None:
+            return Verdict(False, "llm")
+
+        if random.random() < AUDIT_RATE:
+            return Verdict(False, "llm", verdict.p_skip, audit=True)
+        database().defer(_log_decision, summary, reason, verdict.stage, "skip",
+                         "skip", verdict.p_skip)
+        return verdict
+
+    def record(self, summary: str, reason: str, skip: bool, verdict: Verdict):
+        """The LLM answered — log it (with the local verdict, if any) and learn."""
+        database().defer(_log_decision, summary, reason, "llm",
+                         "skip" if skip else "speak", verdict.local, verdict.p_skip)
+        self._learn(summary, reason, skip)
@@ -18,9 +18,12 @@ import asyncio
 import base64
 import ctypes
 import ctypes.wintypes
+import hashlib
+import json
 import platform
 import re
 import time
+from dataclasses import dataclass
 from datetime import datetime
 from io import BytesIO
 from typing import Optional
@@ -43,6 +46,37 @@ def get_active_window_title() -> str:
         return ""
 
 
+def list_visible_windows() -> list[tuple[int, int, str]]:
+    """
+    Cheap enumeration of visible, titled top-level windows as (hwnd, pid, title).
+    One EnumWindows pass — no PowerShell, no process spawn. [] off Windows.
+    """
+    if platform.system() != "Windows":
+        return []
+    out: list[tuple[int, int, str]] = []
+    try:
+        user32 = ctypes.windll.user32
+        proto  = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
+
+        def _cb(hwnd, _lparam):
+            if not user32.IsWindowVisible(hwnd):
+                return True
+            length = user32.GetWindowTextLengthW(hwnd)
+            if length == 0:
+                return True
+            buf = ctypes.create_unicode_buffer(length + 1)
+            user32.GetWindowTextW(hwnd, buf, length + 1)
+            pid = ctypes.wintypes.DWORD()
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+            out.append((int(hwnd or 0), pid.value, buf.value))
+            return True
+
+        user32.EnumWindows(proto(_cb), 0)
+    except Exception:
+        pass
+    return out
+
+
 TASK_PATTERNS = [
     (r"(.+) - Visual Studio Code",  "Coding · {}"),
     (r"Visual Studio Code[- ]+(.+)", "Coding · {}"),
@@ -105,6 +139,22 @@ def parse_task_label(title: str) -> str:
     return cleaned
 
 
+def top_processes(n: int = 8) -> list[dict]:
+    """Top n processes by RAM. Blocking — walks the process table."""
+    procs = []
+    for p in psutil.process_iter(["name", "cpu_percent", "memory_percent", "pid"]):
+        try:
+            info = p.info
+            if info["memory_percent"] and info["memory_percent"] > 0.1:
+                # Rounded to what the widget shows, so an unchanged list compares equal
+                info["memory_percent"] = round(info["memory_percent"], 1)
+                procs.append(info)
+        except Exception:
+            pass
+    procs.sort(key=lambda x: x.get("memory_percent", 0), reverse=True)
+    return procs[:n]
+
+
 class SystemMonitor:
     def __init__(self):
         self._snapshot  = {}
@@ -222,6 +272,92 @@ class SystemMonitor:
         }
 
 
+PROBE_SIZE  = (64, 36)    # grab_probe() frame size — 2304 grayscale cells
+VERIFY_SIZE = (512, 288)  # verify_query() image — enough to recognise an app window
+
+STATE_MAX_ITEMS   = 5     # alerts / text entries kept from a structured reply
+STATE_ITEM_CHARS  = 80
+STATE_TEXT_SHARED = 0.5   # key-text overlap below this counts as a content change
+
+SUSPENDED_WAKE_SEC = 30   # longest sleep with no demand (lets stop() and lease expiry land)
+STALL_SEC          = 90   # capture loop silent this long while wanted → stalled
+
+# Markdown code fence some vision models wrap JSON replies in
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+
+def _clean_items(val) -> tuple:
+    if isinstance(val, str):
+        val = [val]
+    if not isinstance(val, list):
+        return ()
+    items = (" ".join(str(v).split())[:STATE_ITEM_CHARS] for v in val if v)
+    return tuple(i for i in items if i)[:STATE_MAX_ITEMS]
+
+
+@dataclass(frozen=True)
+class ScreenState:
+    """
+    Structured vision reply (ScreenWatcher structured mode). Lets the observer
+    and verifier compare fields instead of diffing free-text descriptions.
+    """
+    app:     str   = ""
+    title:   str   = ""
+    alerts:  tuple = ()     # visible errors / warnings / crash dialogs / notifications
+    text:    tuple = ()     # a few key pieces of visible text
+    summary: str   = ""     # the usual 2-3 sentence description
+
+    @classmethod
+    def from_reply(cls, reply: str) -> Optional["ScreenState"]:
+        """Parse a structured-mode vision reply. None if it isn't usable JSON."""
+        t = _FENCE_RE.sub("", (reply or "").strip()).strip()   # ```json … ```
+        try:
+            data = json.loads(t[t.index("{"):t.rindex("}") + 1])
+        except Exception:
+            return None
+        if not isinstance(data, dict):
+            return None
+        app     = " ".join(str(data.get("app") or "").split())[:STATE_ITEM_CHARS]
+        title   = " ".join(str(data.get("title") or "").split())[:200]
+        summary = " ".join(str(data.get("summary") or "").split())
+        if not (summary or app):
+            return None
+        if not summary:
+            summary = f"{app} is in the foreground" + (f": {title}." if title else ".")
+        return cls(app=app, title=title, alerts=_clean_items(data.get("alerts")),
+                   text=_clean_items(data.get("text")), summary=summary)
+
+    @property
+    def alert_keys(self) -> frozenset:
+        return frozenset(a.lower() for a in self.alerts)
+
+    def new_alerts(self, prev: "ScreenState") -> list:
+        """Alerts showing now that weren't in prev."""
+        old = prev.alert_keys
+        return [a for a in self.alerts if a.lower() not in old]
+
+    def same_window(self, other: "ScreenState") -> bool:
+        return (self.app.lower() == other.app.lower()
+                and self.title.lower() == other.title.lower())
+
+    def text_overlap(self, other: "ScreenState") -> float:
+        """Jaccard overlap of the key-text entries (1.0 when both are empty)."""
+        a = {t.lower() for t in self.text}
+        b = {t.lower() for t in other.text}
+        return len(a & b) / len(a | b) if a | b else 1.0
+
+    def differs(self, other: "ScreenState") -> bool:
+        """Different window, different alerts, or mostly different key text."""
+        return (not self.same_window(other)
+                or self.alert_keys != other.alert_keys
+                or self.text_overlap(other) < STATE_TEXT_SHARED)
+
+    def shows(self, hint: str) -> bool:
+        """True if hint names the foreground app/window (first 5 chars, like _hint_visible)."""
+        h = (hint or "")[:5].lower()
+        return bool(h) and h in f"{self.app} {self.title}".lower()
+
+
 class ScreenWatcher:
     """
     Captures screen thumbnails and calls vision API for a text summary.
@@ -233,22 +369,47 @@ class ScreenWatcher:
     - build_context in groq_client.py reads capture_error to show "capture unavailable"
       instead of passing error text as if it were a real description.
     - summary_age tells context builder how stale the description is.
+    - structured=True asks the vision model for JSON (app, title, alerts, key
+      text, summary). summary still gets the text; state gets the ScreenState
+      from the same capture, so the two never disagree.
+    - version counts successful vision updates. Consumers wait on
+      wait_for_summary(seen) instead of polling, and wake the moment a new
+      summary lands.
+    - Capture is demand-driven. want(kind, holder) takes a lease on "thumb"
+      or "vision" captures; release() drops it. Each kind runs only while it
+      has a live lease. With none at all, the loop sleeps without grabbing
+      anything, and a new lease wakes it for an immediate capture.
+      capture_since() (the verifier) captures on demand either way.
     """
 
-    def __init__(self, groq_client, thumb_interval: int = 2, vision_interval: int = 6):
+    def __init__(self, groq_client, thumb_interval: int = 2, vision_interval: int = 6,
+                 structured: bool = True):
         self.groq           = groq_client
         self.thumb_interval  = thumb_interval   # seconds between thumbnail captures
         self.vision_interval = vision_interval  # seconds between vision API calls
+        self.structured      = structured
 
         # Public state — read by main.py and groq_client.build_context
         self.summary       = ""   # last SUCCESSFUL vision description — never an error string
-        self.thumbnail_b64 = ""   # last JPEG thumbnail, base64 encoded
+        self.state: Optional[ScreenState] = None   # same capture, structured (None in text mode)
+        self.version       = 0    # bumped with every summary/state update
+        self.thumbnail      = b""  # last JPEG thumbnail — served as-is by GET /thumbnail
+        self.thumbnail_etag = ""   # content hash of the thumbnail's pixels ("" = none)
 
         # Tracking
         self._running           = False
         self._last_vision_time  = 0.0   # unix timestamp of last successful vision capture
         self._last_thumb_time   = 0.0   # unix timestamp of last successful thumbnail
         self._capture_error     = ""    # most recent capture failure reason ("" = none)
+        self._updated           = asyncio.Condition()
+        self._capture_started   = 0.0   # monotonic start of the in-flight vision capture (0 = none)
+        self._capture_done: Optional[asyncio.Event] = None
+
+        # Demand — kind → {holder: monotonic expiry, or None until release()}
+        self._leases: dict = {"thumb": {}, "vision": {}}
+        self._due      = {"thumb": 0.0, "vision": 0.0}   # monotonic time of next capture
+        self._demand   = asyncio.Event()                  # set when a lease is taken
+        self._heartbeat = time.monotonic()
 
     # ── Public helper properties ──────────────────────────────────────────────
 
@@ -274,45 +435,140 @@ class ScreenWatcher:
         """True if we've ever gotten a successful vision description."""
         return bool(self.summary) and self._last_vision_time > 0
 
+    @property
+    def thumbnail_b64(self) -> str:
+        """The thumbnail base64-encoded, for callers that need it inline."""
+        return base64.b64encode(self.thumbnail).decode() if self.thumbnail else ""
+
+    def clear_thumbnail(self):
+        self.thumbnail, self.thumbnail_etag = b"", ""
+
+    @property
+    def suspended(self) -> bool:
+        """True while nobody wants thumbnails or vision — nothing is captured."""
+        return not (self.wants("thumb") or self.wants("vision"))
+
+    @property
+    def stalled(self) -> bool:
+        """Running and wanted, but the capture loop hasn't come round in STALL_SEC."""
+        return (self._running and not self.suspended
+                and time.monotonic() - self._heartbeat > STALL_SEC)
+
+    # ── Demand leases ─────────────────────────────────────────────────────────
+
+    def want(self, kind: str, holder: str, ttl: Optional[float] = None):
+        """
+        Lease `kind` ("thumb" | "vision") captures for `holder`, for ttl seconds
+        or until release(). The first live lease on a kind captures at once.
+        """
+        if not self.wants(kind):
+            self._due[kind] = 0.0
+        self._leases[kind][holder] = None if ttl is None else time.monotonic() + ttl
+        self._demand.set()
+
+    def release(self, kind: str, holder: str):
+        self._leases[kind].pop(holder, None)
+
+    def wants(self, kind: str) -> bool:
+        leases = self._leases[kind]
+        now = time.monotonic()
+        for holder in [h for h, exp in leases.items() if exp is not None and exp <= now]:
+            del leases[holder]
+        return bool(leases)
+
     # ── Main loop ─────────────────────────────────────────────────────────────
 
     async def start(self):
         self._running = True
-        vision_every  = max(1, self.vision_interval // self.thumb_interval)
-        cycle         = 0
         while self._running:
+            self._heartbeat = time.monotonic()
+            self._demand.clear()
+            if self.suspended:
+                await self._sleep(SUSPENDED_WAKE_SEC)
+                continue
             try:
-                await self._capture_thumb()
-                cycle += 1
-                if cycle >= vision_every:
-                    cycle = 0
+                now = time.monotonic()
+                if self.wants("thumb") and now >= self._due["thumb"]:
+                    self._due["thumb"] = now + self.thumb_interval
+                    await self._capture_thumb()
+                if self.wants("vision") and now >= self._due["vision"]:
+                    self._due["vision"] = now + self.vision_interval
                     await self._capture_vision()
             except Exception as e:
                 print(f"[SOUL] screen watcher loop error: {e}")
-            await asyncio.sleep(self.thumb_interval)
+            due = [self._due[k] for k in ("thumb", "vision") if self.wants(k)]
+            if due:
+                await self._sleep(min(due) - time.monotonic())
+
+    async def _sleep(self, seconds: float):
+        """Sleep up to `seconds`; a new lease (want()) ends it early."""
+        if seconds <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._demand.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
 
     def stop(self):
         self._running = False
+        self._demand.set()      # don't sit out a suspended sleep
+
+    # ── Summary updates ───────────────────────────────────────────────────────
+
+    async def wait_for_summary(self, seen: int, timeout: Optional[float] = None) -> int:
+        """
+        Wait until version > seen (a new summary landed) or timeout passes.
+        Returns the current version either way — compare it with seen.
+        """
+        if self.version > seen:
+            return self.version
+        try:
+            async with self._updated:
+                await asyncio.wait_for(
+                    self._updated.wait_for(lambda: self.version > seen), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.version
+
+    async def _publish(self):
+        self.version += 1
+        async with self._updated:
+            self._updated.notify_all()
+
+    async def capture_since(self, since: float) -> str:
+        """
+        Summary of a screen grabbed no earlier than `since` (time.monotonic()).
+        Joins an in-flight capture that started late enough instead of paying
+        for a second vision call; otherwise captures now. Returns self.summary.
+        """
+        done = self._capture_done
+        if done is not None and self._capture_started >= since:
+            await done.wait()
+        else:
+            await self._capture_vision()
+        return self.summary
 
     # ── Thumbnail capture ─────────────────────────────────────────────────────
 
     async def _capture_thumb(self):
         """
         Fast: grab screen → 400×225 JPEG thumbnail.
+        The JPEG is only re-encoded when the downscaled pixels changed;
+        thumbnail_etag is their hash, so clients re-fetch only new frames.
         On failure: clears thumbnail but does NOT corrupt summary or capture_error
         (thumbnail failures are frequent and expected on some GPU configs).
         """
         try:
-            from PIL import ImageGrab
             img = self._grab_screen()
             if img is None or img.size[0] <= 0 or img.size[1] <= 0:
-                self.thumbnail_b64 = ""
+                self.clear_thumbnail()
                 return
-            thumb = img.copy()
-            thumb.thumbnail((400, 225))
-            tbuf = BytesIO()
-            thumb.save(tbuf, format="JPEG", quality=88, optimize=True)
-            self.thumbnail_b64    = base64.b64encode(tbuf.getvalue()).decode()
+            img.thumbnail((400, 225))     # fresh grab — no need to copy it first
+            etag = hashlib.blake2b(img.tobytes(), digest_size=12).hexdigest()
+            if etag != self.thumbnail_etag:
+                tbuf = BytesIO()
+                img.save(tbuf, format="JPEG", quality=88, optimize=True)
+                self.thumbnail, self.thumbnail_etag = tbuf.getvalue(), etag
             self._last_thumb_time = time.time()
             # Clear error on success
             if self._capture_error and "thumb" in self._capture_error:
@@ -320,7 +576,7 @@ class ScreenWatcher:
         except Exception as e:
             err = f"{type(e).__name__}: {e}"
             print(f"[SOUL] thumbnail FAILED: {err}")
-            self.thumbnail_b64 = ""
+            self.clear_thumbnail()
             # Only set capture_error for thumbnail if it's the only thing failing
             # (don't overwrite a vision error with a thumbnail error)
             if not self._capture_error:
@@ -339,6 +595,16 @@ class ScreenWatcher:
         This was the root cause of the "Screen: ON\nScreen unavailable: [Errno 22]"
         contradiction that made SOUL oscillate about screen state every message.
         """
+        done = self._capture_done = asyncio.Event()
+        self._capture_started = time.monotonic()
+        try:
+            await self._run_vision_capture()
+        finally:
+            done.set()
+            if self._capture_done is done:
+                self._capture_done, self._capture_started = None, 0.0
+
+    async def _run_vision_capture(self):
         try:
             img = self._grab_screen()
             if img is None or img.size[0] <= 0 or img.size[1] <= 0:
@@ -352,14 +618,30 @@ class ScreenWatcher:
             vis.save(buf, format="JPEG", quality=85, optimize=True)
             b64 = base64.b64encode(buf.getvalue()).decode()
 
-            summary = await self.groq.vision_query(b64)
+            if self.structured:
+                reply = await self.groq.vision_query(b64, mode="structured")
+                state = ScreenState.from_reply(reply)
+                if state is not None:
+                    summary = state.summary
+                elif reply and not reply.startswith("Screen vision unavail"):
+                    # Unparseable (cut off at max_tokens, chatty) — never store
+                    # JSON fragments as the summary; ask for plain prose instead
+                    print("[SOUL] structured vision reply unparseable — describing instead")
+                    summary = await self.groq.vision_query(b64)
+                else:
+                    summary = reply
+            else:
+                state   = None
+                summary = await self.groq.vision_query(b64)
 
             if summary and not summary.startswith("Screen vision unavail"):
                 # Success — update summary and clear any previous error
                 self.summary          = summary
+                self.state            = state
                 self._last_vision_time = time.time()
                 self._capture_error   = ""
                 print(f"[SOUL] vision: {self.summary[:100]}")
+                await self._publish()
             else:
                 # Vision API returned nothing useful — keep last good summary
                 # Update error state so context builder knows capture is unreliable
@@ -380,6 +662,46 @@ class ScreenWatcher:
             self._capture_error = err
             # Do NOT set self.summary = error string
 
+    # ── Targeted verification query ───────────────────────────────────────────
+
+    async def verify_query(self, question: str) -> Optional[bool]:
+        """
+        Ask the vision model one yes/no question about the current screen.
+        Sends a VERIFY_SIZE downscale (a fraction of the 1280×720 description
+        capture) and never touches self.summary. None if the answer is unusable.
+        """
+        try:
+            img = await asyncio.to_thread(self._grab_screen)
+            if img is None or img.size[0] <= 0 or img.size[1] <= 0:
+                return None
+            small = img.copy()
+            small.thumbnail(VERIFY_SIZE)
+            buf = BytesIO()
+            small.save(buf, format="JPEG", quality=70)
+            b64 = base64.b64encode(buf.getvalue()).decode()
+            reply = await self.groq.vision_query(b64, question, mode="verify")
+            return self.groq.parse_verify_answer(reply)
+        except Exception as e:
+            print(f"[SOUL] verify_query FAILED: {type(e).__name__}: {e}")
+            return None
+
+    # ── Change-detection probe ────────────────────────────────────────────────
+
+    def grab_probe(self) -> Optional[bytes]:
+        """
+        Tiny grayscale frame (PROBE_SIZE) for cheap screen-change detection.
+        No JPEG encode, no API call — used by ActionVerifier's settle detector.
+        Blocking (screen grab); call via asyncio.to_thread. None on failure.
+        """
+        try:
+            from PIL import Image
+            img = self._grab_screen()
+            if img is None or img.size[0] <= 0 or img.size[1] <= 0:
+                return None
+            return img.resize(PROBE_SIZE, Image.BOX).convert("L").tobytes()
+        except Exception:
+            return None
+
     # ── Screen grab helper ────────────────────────────────────────────────────
 
     def _grab_screen(self):
@@ -22,8 +22,10 @@ a = Analysis(
         (str(backend_dir / 'actions'),       'actions'),
         (str(backend_dir / 'perception'),    'perception'),
         (str(backend_dir / 'voice'),         'voice'),
-        # verifier.py lives at backend root — include explicitly
+        # verifier.py / topics.py / channels.py live at backend root — include explicitly
         (str(backend_dir / 'verifier.py'),   '.'),
+        (str(backend_dir / 'topics.py'),     '.'),
+        (str(backend_dir / 'channels.py'),   '.'),
     ],
     hiddenimports=[
         # ── uvicorn internals ─────────────────────────────────────────────────
@@ -112,6 +114,10 @@ a = Analysis(
         'importlib.resources',
         'pkg_resources',
         'pkg_resources.extern',
+        # ── Semantic memory (memory/vectors.py) ───────────────────────────────
+        # Without numpy VectorIndex falls back to keyword-only recall. Adds
+        # roughly 20 MB to the exe (numpy + its bundled OpenBLAS).
+        'numpy',
         # ── Difflib (used by verifier + observer similarity scoring) ─────────
         'difflib',
         # ── win32 (pygetwindow dependency on Windows) ─────────────────────────
@@ -126,7 +132,6 @@ a = Analysis(
         # Unused GUI frameworks — keeps exe smaller and reduces AV heuristic surface
         'tkinter',
         'matplotlib',
-        'numpy',
         'scipy',
         'pandas',
         'PyQt5',
@@ -0,0 +1,26 @@
+"""
+Shared test setup: backend/ on sys.path (as main.py puts it), SOUL_DATA_DIR
+pointed at a scratch directory so nothing touches a real soul_memory.db, and
+a fresh memory database per test.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["SOUL_DATA_DIR"] = tempfile.mkdtemp(prefix="soul-test-")
+
+import pytest
+
+
+@pytest.fixture
+def memory_db(tmp_path, monkeypatch):
+    """The shared Database, opened on an empty file under tmp_path."""
+    from memory import patterns
+
+    patterns.close_db()
+    monkeypatch.setattr(patterns, "DB_PATH", tmp_path / "soul_memory.db")
+    monkeypatch.setattr(patterns, "VECTORS_PATH", tmp_path / "soul_vectors.f16")
+    yield patterns.database()
+    patterns.close_db()
@@ -0,0 +1,146 @@
+"""
+PatternEngine's incremental co-occurrence counting against the self-join it
+replaced: the same recorded event stream must activate the same patterns.
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from memory import patterns
+from memory.patterns import PatternEngine
+
+THRESHOLD = 3
+
+# The per-observe query PatternEngine._update_patterns ran before the
+# incremental counters — the reference the engine has to agree with
+_SELF_JOIN = """
+    SELECT e1.event_type, e1.value, COUNT(*) AS co_count
+    FROM events e1
+    JOIN events e2 ON (
+        e2.event_type = ? AND e2.value = ?
+        AND e2.id > e1.id AND e2.id - e1.id <= 3
+    )
+    WHERE e1.event_type != ? OR e1.value != ?
+    GROUP BY e1.event_type, e1.value
+    HAVING co_count >= ?
+"""
+
+
+def _stream(seed: int, n: int) -> list:
+    """A recorded-looking stream: a few habitual chains plus noise."""
+    rng    = random.Random(seed)
+    chains = [[("app_open", "code"), ("app_open", "terminal"), ("voice_command", "run tests")],
+              [("app_open", "spotify"), ("app_focus", "chrome")],
+              [("voice_command", "open mail"), ("app_open", "outlook")]]
+    noise  = [("app_open", f"app{i}") for i in range(8)] + [("voice_command", "what time is it")]
+    out = []
+    while len(out) < n:
+        out.extend(rng.choice(chains) if rng.random() < 0.6 else [rng.choice(noise)])
+    return out[:n]
+
+
+def _reference(events: list) -> dict:
+    """Replay the stream through the old self-join; the patterns it ends with."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    patterns._create_schema(conn)
+    for event_type, value in events:
+        conn.execute("INSERT INTO events (timestamp, event_type, value) VALUES ('t', ?, ?)",
+                     (event_type, value))
+        for row in conn.execute(_SELF_JOIN, (event_type, value, event_type, value,
+                                             THRESHOLD)).fetchall():
+            existing = conn.execute(
+                "SELECT id, occurrence_count FROM patterns WHERE trigger_event = ? "
+                "AND trigger_value = ? AND follow_action = 'suggest_action'",
+                (row["event_type"], row["value"])).fetchone()
+            if existing:
+                n = existing["occurrence_count"] + 1
+                conn.execute("UPDATE patterns SET occurrence_count = ?, is_active = ? WHERE id = ?",
+                             (n, int(n >= THRESHOLD), existing["id"]))
+            else:
+                conn.execute(
+                    "INSERT INTO patterns (trigger_event, trigger_value, follow_action, "
+                    "occurrence_count, is_active, display_text) "
+                    "VALUES (?, ?, 'suggest_action', 1, 0, ?)",
+                    (row["event_type"], row["value"], f"When {row['value']} -> {event_type}: {value}"))
+    result = _pattern_rows(conn)
+    conn.close()
+    return result
+
+
+def _pattern_rows(conn) -> dict:
+    return {(r["trigger_event"], r["trigger_value"]):
+            (r["occurrence_count"], r["is_active"], r["display_text"])
+            for r in conn.execute("SELECT * FROM patterns")}
+
+
+def _engine_rows(db) -> dict:
+    return db.read_sync(_pattern_rows)
+
+
+def _join_counts(conn) -> dict:
+    return {((r[0], r[1]), (r[2], r[3])): r[4] for r in conn.execute("""
+        SELECT e1.event_type, e1.value, e2.event_type, e2.value, COUNT(*)
+        FROM events e1 JOIN events e2 ON e2.id > e1.id AND e2.id - e1.id <= 3
+        WHERE e1.event_type != e2.event_type OR e1.value != e2.value
+        GROUP BY 1, 2, 3, 4""")}
+
+
+def _table_counts(conn) -> dict:
+    return {((r["pred_event"], r["pred_value"]), (r["follow_event"], r["follow_value"])): r["count"]
+            for r in conn.execute("SELECT * FROM cooccurrence")}
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_same_patterns_as_self_join(memory_db, seed):
+    events = _stream(seed, 400)
+    engine = PatternEngine(threshold=THRESHOLD)
+    for event_type, value in events:
+        engine.observe(event_type, value)
+    engine.flush()
+
+    expected = _reference(events)
+    assert any(active for _, active, _ in expected.values())
+    assert _engine_rows(memory_db) == expected
+    # In-memory active set is what check_trigger serves
+    assert set(engine._active) == {k for k, (_, active, _) in expected.items() if active}
+    # Persisted counters equal the full self-join count for every pair
+    assert memory_db.read_sync(_table_counts) == memory_db.read_sync(_join_counts)
+
+
+def test_restart_and_eviction_keep_counts_exact(memory_db, monkeypatch):
+    monkeypatch.setattr(patterns, "CO_CACHE_PAIRS", 8)     # evict constantly
+    events = _stream(7, 600)
+
+    engine = PatternEngine(threshold=THRESHOLD)
+    for event_type, value in events[:250]:
+        engine.observe(event_type, value)
+    engine.flush()
+    # Restart mid-stream; the new engine reloads counters and the window
+    engine = PatternEngine(threshold=THRESHOLD)
+    for event_type, value in events[250:]:
+        engine.observe(event_type, value)
+    engine.flush()
+
+    assert _engine_rows(memory_db) == _reference(events)
+    assert memory_db.read_sync(_table_counts) == memory_db.read_sync(_join_counts)
+
+
+def test_catch_up_counts_events_logged_while_stopped(memory_db):
+    events = _stream(11, 300)
+    engine = PatternEngine(threshold=THRESHOLD)
+    for event_type, value in events[:100]:
+        engine.observe(event_type, value)
+    engine.flush()
+    # Events written without the engine (crash before write-back, older build)
+    for event_type, value in events[100:]:
+        patterns.log_event(event_type, value)
+    memory_db.write_sync(lambda conn: None)
+
+    engine = PatternEngine(threshold=THRESHOLD)
+    engine.observe("app_open", "code")          # first observe replays the gap
+    engine.flush()
+
+    assert memory_db.read_sync(_table_counts) == memory_db.read_sync(_join_counts)
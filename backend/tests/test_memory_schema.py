@@ -0,0 +1,130 @@
+"""
+Schema migrations and the indexes behind the per-message lookups
+(memory/patterns.py: _MIGRATIONS, _add_lookup_indexes).
+"""
+
+import sqlite3
+
+import pytest
+
+from memory import patterns
+
+# What init_db created before the schema was versioned (user_version 0)
+_UNVERSIONED_SCHEMA = """
+    CREATE TABLE events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+        event_type TEXT NOT NULL, value TEXT, metadata TEXT);
+    CREATE TABLE patterns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, trigger_event TEXT NOT NULL,
+        trigger_value TEXT NOT NULL, follow_action TEXT NOT NULL, follow_params TEXT,
+        occurrence_count INTEGER DEFAULT 0, is_active INTEGER DEFAULT 0,
+        created_at TEXT, last_seen_at TEXT, display_text TEXT);
+    CREATE TABLE memories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE NOT NULL,
+        value TEXT, updated_at TEXT);
+    CREATE TABLE session_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+        role TEXT NOT NULL, content TEXT NOT NULL, session_id TEXT);
+"""
+
+# Queries run on every observe() / trigger check, and the index each must use
+_HOT_LOOKUPS = [
+    ("SELECT * FROM patterns WHERE trigger_event = ? AND trigger_value = ? "
+     "AND follow_action = 'suggest_action'",
+     "USING INDEX idx_patterns_trigger"),
+    ("SELECT count FROM cooccurrence WHERE follow_event = ? AND follow_value = ? "
+     "AND pred_event = ? AND pred_value = ?",
+     "USING PRIMARY KEY"),
+    ("SELECT * FROM events WHERE event_type = ? AND value = ?",
+     "USING INDEX idx_events_type_value"),
+    ("SELECT id, timestamp, event_type, value FROM events WHERE id > ? ORDER BY id",
+     "USING INTEGER PRIMARY KEY"),
+    ("SELECT id, timestamp, role, content, session_id FROM session_history "
+     "WHERE id > ? ORDER BY id LIMIT 500",
+     "USING INTEGER PRIMARY KEY"),
+]
+
+
+def _connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _names(conn, kind: str) -> set:
+    return {r["name"] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+def _baseline_db(path, version: int) -> sqlite3.Connection:
+    """A DB as an older build left it: unversioned (0), or migrated to v1."""
+    conn = _connect(path)
+    if version == 0:
+        conn.executescript(_UNVERSIONED_SCHEMA)
+    else:
+        patterns._create_schema(conn)
+        conn.execute("PRAGMA user_version = 1")
+    conn.execute("INSERT INTO events (timestamp, event_type, value) "
+                 "VALUES ('2025-01-01T09:00:00', 'app_open', 'code')")
+    conn.execute("INSERT INTO session_history (timestamp, role, content) "
+                 "VALUES ('2025-01-01T09:00:01', 'user', 'open vs code please')")
+    conn.commit()
+    return conn
+
+
+@pytest.mark.parametrize("start", [0, 1])
+def test_migrations_upgrade_an_existing_db(tmp_path, start):
+    conn = _baseline_db(tmp_path / "old.db", start)
+    with conn:
+        patterns._migrate(conn)
+
+    assert _version(conn) == len(patterns._MIGRATIONS)
+    assert {"app_launch_times", "cooccurrence", "miner_state", "session_archive",
+            "vectors", "session_summaries", "observer_decisions"} <= _names(conn, "table")
+    assert {"idx_patterns_trigger", "idx_patterns_active",
+            "idx_events_type_value"} <= _names(conn, "index")
+    # Existing rows survive, and the FTS index (if built) covers them
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM session_history").fetchone()[0] == 1
+    if "session_fts" in _names(conn, "table"):
+        hit = conn.execute(
+            "SELECT rowid FROM session_fts WHERE session_fts MATCH 'code'").fetchall()
+        assert len(hit) == 1
+    conn.close()
+
+
+def test_migrate_is_idempotent(tmp_path):
+    conn = _baseline_db(tmp_path / "old.db", 0)
+    with conn:
+        patterns._migrate(conn)
+    before = _names(conn, "index")
+    with conn:
+        patterns._migrate(conn)
+    assert _version(conn) == len(patterns._MIGRATIONS)
+    assert _names(conn, "index") == before
+    conn.close()
+
+
+@pytest.mark.parametrize("sql, expected", _HOT_LOOKUPS)
+def test_hot_lookups_use_an_index(tmp_path, sql, expected):
+    conn = _connect(tmp_path / "plan.db")
+    with conn:
+        patterns._migrate(conn)
+        conn.executemany(
+            "INSERT INTO events (timestamp, event_type, value) VALUES ('t', 'app_open', ?)",
+            [(f"app{i % 50}",) for i in range(2000)])
+        conn.executemany(
+            "INSERT INTO patterns (trigger_event, trigger_value, follow_action, "
+            "occurrence_count, is_active) VALUES ('app_open', ?, 'suggest_action', ?, ?)",
+            [(f"app{i}", i, i % 5 == 0) for i in range(500)])
+        conn.execute("ANALYZE")
+
+    plan = " | ".join(r["detail"] for r in conn.execute(
+        "EXPLAIN QUERY PLAN " + sql, ("x",) * sql.count("?")))
+    conn.close()
+    assert expected in plan, plan
+    assert "SCAN" not in plan.split("USING")[0], plan
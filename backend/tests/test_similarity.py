@@ -0,0 +1,82 @@
+"""
+Calibration for perception/similarity.py: the observer's SIMILARITY_THRESHOLD
+and the verifier's CHANGE_THRESHOLD must still put known pairs of vision
+summaries on the right side after the switch to trigram Dice.
+"""
+
+import pytest
+
+from perception.observer import SIMILARITY_THRESHOLD
+from perception.similarity import similarity
+
+_BASE = ("Visual Studio Code is open with main.py in the editor. The terminal panel "
+         "at the bottom shows pytest output with 13 passed tests. The sidebar lists the "
+         "backend folder with actions, memory and perception subfolders. The taskbar "
+         "clock reads 10:41.")
+
+# Same screen, described again — neither the observer nor the verifier should
+# call these a change
+SAME = {
+    "clock tick":   _BASE.replace("10:41", "10:42"),
+    "scrolled":     _BASE.replace("main.py in the editor",
+                                  "main.py in the editor, scrolled slightly further down"),
+    # SequenceMatcher's autojunk scored rewordings like this (>200 chars) ~0.05
+    "reworded":     ("Visual Studio Code is open, editing main.py. At the bottom the terminal "
+                     "panel shows pytest output: 13 passed tests. The sidebar lists the backend "
+                     "folder with actions, memory and perception subfolders. The taskbar clock "
+                     "reads 10:41."),
+}
+
+# A different screen — both must call these a change
+DIFFERENT = {
+    "same app, new file": ("Visual Studio Code is open with README.md in the editor, showing "
+                           "installation instructions and a requirements list. The sidebar "
+                           "lists the project root. The taskbar clock reads 10:41."),
+    "different app":      ("Google Chrome is open on a YouTube video page playing a music "
+                           "video. The comments section is visible below the player. The "
+                           "taskbar clock reads 10:41."),
+    "desktop":            ("The Windows desktop is visible with the wallpaper and a few icons. "
+                           "No windows are open. The taskbar clock reads 10:41."),
+}
+
+MARGIN = 0.03   # pinned pairs sit at least this far from either threshold
+
+
+@pytest.fixture(params=["observer", "verifier"])
+def threshold(request) -> float:
+    if request.param == "observer":
+        return SIMILARITY_THRESHOLD
+    pytest.importorskip("psutil")       # verifier imports it at module level
+    from verifier import CHANGE_THRESHOLD
+    return CHANGE_THRESHOLD
+
+
+@pytest.mark.parametrize("name", sorted(SAME))
+def test_same_screen_is_not_a_change(name, threshold):
+    score = similarity(_BASE, SAME[name])
+    assert score >= threshold + MARGIN, score
+
+
+@pytest.mark.parametrize("name", sorted(DIFFERENT))
+def test_different_screen_is_a_change(name, threshold):
+    score = similarity(_BASE, DIFFERENT[name])
+    assert score <= threshold - MARGIN, score
+
+
+def test_observer_gate_uses_the_threshold():
+    from perception.observer import _is_meaningful_change
+
+    meaningful, reason = _is_meaningful_change(_BASE, SAME["reworded"])
+    assert not meaningful and reason.startswith("similarity=")
+    # Past the similarity gate (later rules may still decide it's boring)
+    _, reason = _is_meaningful_change(_BASE, DIFFERENT["same app, new file"])
+    assert not reason.startswith("similarity=")
+
+
+def test_score_basics():
+    assert similarity(_BASE, _BASE) == 1.0
+    assert similarity(_BASE, "") == 0.0
+    assert similarity("", "") == 0.0
+    assert similarity(_BASE, SAME["reworded"]) == similarity(SAME["reworded"], _BASE)
+    # Case and whitespace don't count as change
+    assert similarity(_BASE, "  " + _BASE.upper().replace(" ", "   ")) == 1.0
@@ -0,0 +1,169 @@
+"""
+SOUL — WebSocket Topics  v1.0
+topics.py
+
+Server push for the periodic panels. Replaces "every window asks for
+system_status every 3s and the answer is broadcast to every window" (N²
+messages with N windows) and the workspace's own /processes poll.
+
+  Topics(send, get_stats, get_processes, get_thumb_etag)
+    .subscribe(ws, names) / .unsubscribe(ws, names) / .drop(ws)
+    .subscribers(topic)   → clients subscribed to topic
+    .wants(topic)         → True if anyone is
+    .route(msg_type)      → the topic a broadcast message belongs to, or None
+    .start() / .stop()    → the push loop
+
+Topics (client sends {"type": "subscribe" | "unsubscribe", "topics": [...]}):
+  stats      system_stats  — every STATS_PUSH_SEC, only the keys that changed
+  processes  processes     — every PROCESSES_PUSH_SEC, the list, only if changed
+  thumbnail  thumbnail     — {etag} when the frame changes; fetch GET /thumbnail.
+                             Also what keeps ScreenWatcher's thumb lease held
+  actions    action_pending / action_step / action_result broadcasts
+
+Each update is built once and sent to that topic's subscribers. A new
+subscriber gets the current payload in full ("full": true) straight away;
+after that every subscriber gets the same deltas, so clients merge
+system_stats into what they have.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+# ── Tuneable constants ────────────────────────────────────────────────────────
+
+TICK_SEC           = 1.0   # push loop resolution (thumbnail etag checks)
+STATS_PUSH_SEC     = 3.0
+PROCESSES_PUSH_SEC = 8.0
+
+TOPICS = ("stats", "processes", "thumbnail", "actions")
+
+# Broadcast message types that only go to a topic's subscribers
+_ROUTES = {
+    "action_pending": "actions",
+    "action_step":    "actions",
+    "action_result":  "actions",
+}
+
+
+def _stats_delta(prev: dict, curr: dict) -> dict:
+    return {k: v for k, v in curr.items() if k not in prev or prev[k] != v}
+
+
+class Topics:
+    def __init__(
+        self,
+        send: Callable[[object, dict], Awaitable],
+        get_stats: Callable[[], dict],
+        get_processes: Callable[[], Awaitable[list]],
+        get_thumb_etag: Callable[[], str],
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        self._send           = send              # (ws, msg) — must not raise
+        self._get_stats      = get_stats
+        self._get_processes  = get_processes
+        self._get_thumb_etag = get_thumb_etag
+        self._on_change      = on_change         # subscriptions changed
+        self._subs: Dict[str, list] = {t: [] for t in TOPICS}
+        self._last: Dict[str, object] = {}       # last payload published per topic
+        self._running = False
+
+    # ── Subscriptions ─────────────────────────────────────────────────────────
+
+    def subscribers(self, topic: str) -> list:
+        return list(self._subs.get(topic, ()))
+
+    def wants(self, topic: str) -> bool:
+        return bool(self._subs.get(topic))
+
+    def route(self, msg_type: str) -> Optional[str]:
+        return _ROUTES.get(msg_type)
+
+    async def subscribe(self, ws, names):
+        added = [t for t in names if t in self._subs and ws not in self._subs[t]]
+        for t in added:
+            self._subs[t].append(ws)
+        if added and self._on_change:
+            self._on_change()
+        for t in added:
+            await self._send_full(ws, t)
+
+    def unsubscribe(self, ws, names):
+        changed = False
+        for t in names:
+            if ws in self._subs.get(t, ()):
+                self._subs[t].remove(ws)
+                changed = True
+                if not self._subs[t]:
+                    self._last.pop(t, None)     # stale by the next subscribe
+        if changed and self._on_change:
+            self._on_change()
+
+    def drop(self, ws):
+        """A client went away — forget all its subscriptions."""
+        self.unsubscribe(ws, TOPICS)
+
+    # ── Payloads ──────────────────────────────────────────────────────────────
+
+    async def _send_full(self, ws, topic: str):
+        # The baseline the next delta is computed against, so everyone agrees
+        if topic == "stats":
+            if "stats" not in self._last:
+                self._last["stats"] = self._get_stats()
+            await self._send(ws, {"type": "system_stats", "full": True,
+                                  "stats": self._last["stats"]})
+        elif topic == "processes":
+            procs = self._last.get("processes")
+            if procs is None:
+                procs = self._last["processes"] = await self._get_processes()
+            await self._send(ws, {"type": "processes", "full": True, "processes": procs})
+        elif topic == "thumbnail":
+            etag = self._get_thumb_etag()
+            if etag:
+                await self._send(ws, {"type": "thumbnail", "full": True, "etag": etag})
+
+    async def _publish(self, topic: str, msg: dict):
+        for ws in self.subscribers(topic):
+            await self._send(ws, msg)
+
+    async def _push_stats(self):
+        curr  = self._get_stats()
+        delta = _stats_delta(self._last.get("stats") or {}, curr)
+        self._last["stats"] = curr
+        if delta:
+            await self._publish("stats", {"type": "system_stats", "stats": delta})
+
+    async def _push_processes(self):
+        procs = await self._get_processes()
+        if procs != self._last.get("processes"):
+            self._last["processes"] = procs
+            await self._publish("processes", {"type": "processes", "processes": procs})
+
+    async def _push_thumbnail(self):
+        etag = self._get_thumb_etag()
+        if etag and etag != self._last.get("thumbnail"):
+            self._last["thumbnail"] = etag
+            await self._publish("thumbnail", {"type": "thumbnail", "etag": etag})
+
+    # ── Push loop ─────────────────────────────────────────────────────────────
+
+    async def start(self):
+        self._running = True
+        loop = asyncio.get_running_loop()
+        next_stats = next_procs = 0.0
+        while self._running:
+            try:
+                now = loop.time()
+                if self.wants("thumbnail"):
+                    await self._push_thumbnail()
+                if self.wants("stats") and now >= next_stats:
+                    next_stats = now + STATS_PUSH_SEC
+                    await self._push_stats()
+                if self.wants("processes") and now >= next_procs:
+                    next_procs = now + PROCESSES_PUSH_SEC
+                    await self._push_processes()
+            except Exception as e:
+                print(f"[SOUL] topic push error: {e}")
+            await asyncio.sleep(TICK_SEC)
+
+    def stop(self):
+        self._running = False
@@ -11,8 +11,13 @@ The closed loop: eyes confirm what hands did.
 Flow per action:
   1. pre_capture() — store current screen state
   2. executor fires the action
-  3. verify_and_fallback() — wait for UI to settle → force fresh vision capture
-     → compare pre/post similarity
+  3. verify_and_fallback() — sample tiny frames every SETTLE_POLL_SEC until the
+     screen changed and stopped moving (POST_WAIT is now only the upper bound)
+     → obvious change: done, no vision call
+     → otherwise ask vision ONE targeted yes/no question about the expected
+       result ("Is a Spotify window open?") on a small downscale, 10-token answer
+     → no question for this action / answer unusable: full vision description
+       and compare, as before
      → if changed as expected: visual_confirmed = True
      → if not: try one fallback action, check again
   4. groq.inject_visual_result() — LLM gets grounded truth, not just Python bools
@@ -25,19 +30,34 @@ Actions that skip visual verification (unverifiable — no screen signal):
   type_text, press_keys, copy_to_clipboard, read_*, get_*, check_*, media_control
   These trust the executor return value directly.
 
-The delta LLM call (what changed in one sentence) is best-effort:
+With structured vision (ScreenWatcher.state) the summary comparisons above
+become field checks: a changed app/window/alert set or mostly new key text
+counts as a change, and "already active" means the hint names the
+foreground app or window title rather than appearing anywhere in the text.
+
+The delta (what changed in one sentence) is built locally first, from the
+pre/post foreground window title, the set of processes that started/exited,
+and the words that appeared in the vision summary. Only when none of those
+explain anything does it fall back to the 8B LLM call — best-effort:
   if it 429s or times out, we fall back to generic strings.
   The core loop (pre/post compare) works without it.
 """
 
 import asyncio
+import time
 from dataclasses import dataclass
-from difflib import SequenceMatcher
+from pathlib import PureWindowsPath
 from typing import Callable, Optional
 
+import psutil
+
+from perception.similarity import similarity
+from perception.system import get_active_window_title
+
 # ── Timing ────────────────────────────────────────────────────────────────────
-# How long to wait after action fires before taking the post-capture screenshot.
-# Apps vary wildly in how long they take to paint.
+# Upper bound on how long to wait for the screen to settle after an action fires.
+# Apps vary wildly in how long they take to paint; the settle detector usually
+# returns well before this.
 POST_WAIT: dict[str, float] = {
     "open_app":        2.8,
     "web_search":      2.2,
@@ -58,6 +78,29 @@ POST_WAIT: dict[str, float] = {
 # Screen-change threshold: similarity below this = "something meaningfully changed"
 CHANGE_THRESHOLD = 0.88
 
+# Settle detector — compares ScreenWatcher.grab_probe() frames (64×36 grayscale)
+SETTLE_POLL_SEC       = 0.15   # between probe frames
+SETTLE_STABLE_FRAMES  = 2      # consecutive still frames = settled
+PIXEL_DELTA           = 24     # per-cell grayscale difference that counts as "changed"
+FRAME_CHANGE_FRACTION = 0.02   # vs pre-frame: above this = screen changed
+FRAME_STILL_FRACTION  = 0.005  # vs previous frame: below this = not moving
+FRAME_OBVIOUS_FRACTION = 0.15  # this much changed → no vision call needed
+
+# Words that never explain a change on their own
+_DELTA_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "on", "in", "is", "are", "with", "to",
+    "for", "at", "by", "from", "this", "that", "it", "its", "screen", "shows",
+    "showing", "displayed", "displays", "window", "visible", "there", "which",
+}
+
+# Short-lived helper processes (including the executor's own PowerShell) that
+# come and go around every action and say nothing about what the user sees
+_PROC_NOISE = {
+    "powershell.exe", "conhost.exe", "cmd.exe", "svchost.exe", "dllhost.exe",
+    "wmiprvse.exe", "runtimebroker.exe", "backgroundtaskhost.exe", "taskhostw.exe",
+    "searchprotocolhost.exe", "searchfilterhost.exe", "audiodg.exe", "where.exe",
+}
+
 # Actions where screen gives us useful signal
 VERIFIABLE = {
     "open_app", "close_app", "focus_window",
@@ -92,6 +135,33 @@ FALLBACK_CHAINS: dict[str, Callable[[dict], Optional[dict]]] = {
 }
 
 
+# Targeted verification questions: params → (yes/no question, answer that means success)
+def _app_label(p: dict) -> str:
+    return (p.get("app_name") or p.get("title") or "").strip()
+
+
+def _folder_label(p: dict) -> str:
+    return PureWindowsPath(p.get("path", "").strip()).name
+
+
+VERIFY_QUESTIONS: dict[str, Callable[[dict], Optional[tuple[str, bool]]]] = {
+    "open_app": lambda p: (
+        f"Is a {_app_label(p)} window open and visible?", True) if _app_label(p) else None,
+    "focus_window": lambda p: (
+        f"Is a {_app_label(p)} window in the foreground?", True) if _app_label(p) else None,
+    "close_app": lambda p: (
+        f"Is a {_app_label(p)} window visible?", False) if _app_label(p) else None,
+    "web_search": lambda p: (
+        f"Is a web browser showing search results for \"{p.get('query', '')}\"?", True)
+        if p.get("query") else None,
+    "open_url": lambda p: (
+        f"Is a web browser showing {p.get('url', '')}?", True) if p.get("url") else None,
+    "open_folder": lambda p: (
+        f"Is a file explorer window showing the folder \"{_folder_label(p)}\"?", True)
+        if _folder_label(p) else None,
+}
+
+
 # ── Result dataclass ──────────────────────────────────────────────────────────
 
 @dataclass
@@ -137,12 +207,41 @@ class ActionVerifier:
         self.screen       = screen_watcher   # may be None if vision disabled; update later
         self.groq         = groq_client
         self._pre_summary = ""
+        self._pre_state   = None             # ScreenState, when vision runs structured
+        self._pre_frame: Optional[bytes] = None
+        self._pre_title   = ""
+        self._pre_procs: set[str] = set()
+        # How each success delta was produced — "local" = LLM delta call avoided
+        self.delta_stats  = {"local": 0, "llm": 0}
+        # Per-action-type latency: {atype: {"n", "settle", "total"}} (sums, seconds)
+        self._latency: dict[str, dict] = {}
 
     # ── Public ────────────────────────────────────────────────────────────────
 
     async def pre_capture(self):
         """Snapshot screen state before the action fires. Call immediately before executor."""
         self._pre_summary = getattr(self.screen, "summary", "") if self.screen else ""
+        self._pre_state   = getattr(self.screen, "state", None) if self.screen else None
+        self._pre_frame   = await self._probe()
+        self._pre_title, self._pre_procs = await asyncio.to_thread(_desktop_state)
+
+    def latency_report(self) -> dict:
+        """
+        Mean verification latency per action type, next to the fixed wait it replaced.
+          settle — time until the screen changed and stopped moving
+          total  — settle + any vision call, i.e. what the chain actually waited
+          fixed  — the old unconditional POST_WAIT (before the vision call)
+        """
+        report = {}
+        for atype, s in self._latency.items():
+            n = max(s["n"], 1)
+            report[atype] = {
+                "n":      s["n"],
+                "settle": round(s["settle"] / n, 2),
+                "total":  round(s["total"] / n, 2),
+                "fixed":  POST_WAIT.get(atype, POST_WAIT["default"]),
+            }
+        return report
 
     async def verify_and_fallback(
         self,
@@ -217,16 +316,66 @@ class ActionVerifier:
             )
 
         wait       = POST_WAIT.get(atype, POST_WAIT["default"])
-        post       = await self._post_capture(wait)
+        t0         = time.monotonic()
+        frame_changed, magnitude = await self._wait_for_settle(wait)
+        settled_at = time.monotonic()
+        settle_sec = settled_at - t0
         pre        = self._pre_summary
-        sim        = _sim(pre, post)
-        changed    = sim < CHANGE_THRESHOLD
+
+        if executor_ok and frame_changed and magnitude >= FRAME_OBVIOUS_FRACTION:
+            # Big, settled change right after a successful action — no need to ask vision.
+            # The summary is stale here, so the delta comes from window/process state only.
+            delta = await self._explain(atype, params, "", "", allow_llm=False)
+            self._record_latency(atype, settle_sec, time.monotonic() - t0)
+            return VerificationResult(
+                action_type=atype, executor_ok=True, visual_confirmed=True, success=True,
+                pre_summary=pre, post_summary=getattr(self.screen, "summary", ""),
+                delta=delta or f"screen changed ({magnitude:.0%} of view)",
+            )
+
+        # Targeted yes/no check — cheaper and more reliable than diffing descriptions
+        qa = VERIFY_QUESTIONS.get(atype)
+        qa = qa(params) if qa else None
+        if qa:
+            question, expected = qa
+            answer = await self.screen.verify_query(question)
+            if answer is not None:
+                self._record_latency(atype, settle_sec, time.monotonic() - t0)
+                post = getattr(self.screen, "summary", "")
+                if answer == expected:
+                    delta = await self._explain(atype, params, "", "", allow_llm=False)
+                    return VerificationResult(
+                        action_type=atype, executor_ok=executor_ok,
+                        visual_confirmed=True, success=True,
+                        pre_summary=pre, post_summary=post,
+                        delta=delta or f"confirmed: {question[:-1].lower()}",
+                    )
+                return VerificationResult(
+                    action_type=atype, executor_ok=executor_ok,
+                    visual_confirmed=False, success=False,
+                    pre_summary=pre, post_summary=post,
+                    delta=f"vision check failed — {question} "
+                          f"{'yes' if answer else 'no'}",
+                )
+
+        post       = await self._post_capture(0, since=settled_at)
+        post_state = getattr(self.screen, "state", None)
+        if frame_changed is None:
+            # No probe frames available — fall back to comparing vision results:
+            # fields when both captures are structured, else summary similarity
+            if self._pre_state is not None and post_state is not None:
+                changed = post_state.differs(self._pre_state)
+            else:
+                changed = similarity(pre, post) < CHANGE_THRESHOLD
+        else:
+            changed = frame_changed
+        self._record_latency(atype, settle_sec, time.monotonic() - t0)
 
         # ── Decision tree ─────────────────────────────────────────────────────
 
         if executor_ok and changed:
             # Both agree: success
-            delta = await self._delta(atype, params, pre, post)
+            delta = await self._explain(atype, params, pre, post)
             return VerificationResult(
                 action_type=atype, executor_ok=True, visual_confirmed=True, success=True,
                 pre_summary=pre, post_summary=post, delta=delta,
@@ -236,7 +385,9 @@ class ActionVerifier:
             # Executor said OK but screen didn't move
             # Could be app already open/focused → check if expected thing is visible
             hint = (params.get("app_name") or params.get("title") or "").lower()
-            if hint and _hint_visible(hint, post):
+            visible = (post_state.shows(hint) if post_state is not None and post_state.app
+                       else _hint_visible(hint, post))
+            if hint and visible:
                 return VerificationResult(
                     action_type=atype, executor_ok=True, visual_confirmed=True, success=True,
                     pre_summary=pre, post_summary=post,
@@ -251,7 +402,7 @@ class ActionVerifier:
 
         if not executor_ok and changed:
             # Executor failed but screen moved anyway (happens with some Win32 API quirks)
-            delta = await self._delta(atype, params, pre, post)
+            delta = await self._explain(atype, params, pre, post)
             return VerificationResult(
                 action_type=atype, executor_ok=False, visual_confirmed=True, success=True,
                 pre_summary=pre, post_summary=post, delta=delta,
@@ -264,17 +415,90 @@ class ActionVerifier:
             delta="no change detected",
         )
 
-    async def _post_capture(self, wait_sec: float) -> str:
-        """Wait for UI to settle, then force a fresh vision capture. Returns new summary."""
-        await asyncio.sleep(wait_sec)
+    async def _probe(self) -> Optional[bytes]:
+        if not self.screen or not hasattr(self.screen, "grab_probe"):
+            return None
+        try:
+            return await asyncio.to_thread(self.screen.grab_probe)
+        except Exception:
+            return None
+
+    async def _wait_for_settle(self, timeout: float) -> tuple[Optional[bool], float]:
+        """
+        Sample probe frames until the screen has changed vs the pre-frame AND stopped
+        moving, or until timeout. Returns (changed, fraction_changed).
+        changed is None when no probe frames are available (caller falls back to
+        comparing vision summaries after sleeping the full timeout).
+        """
+        base = self._pre_frame
+        if base is None:
+            await asyncio.sleep(timeout)
+            return None, 0.0
+
+        deadline  = time.monotonic() + timeout
+        prev      = base
+        still     = 0
+        magnitude = 0.0
+        changed   = False
+        while time.monotonic() < deadline:
+            await asyncio.sleep(SETTLE_POLL_SEC)
+            frame = await self._probe()
+            if frame is None or len(frame) != len(base):
+                continue
+            magnitude = _frame_delta(base, frame)
+            if magnitude >= FRAME_CHANGE_FRACTION:
+                changed = True
+            still = still + 1 if _frame_delta(prev, frame) < FRAME_STILL_FRACTION else 0
+            prev  = frame
+            if changed and still >= SETTLE_STABLE_FRAMES:
+                break
+        return changed, magnitude
+
+    def _record_latency(self, atype: str, settle: float, total: float):
+        s = self._latency.setdefault(atype, {"n": 0, "settle": 0.0, "total": 0.0})
+        s["n"]      += 1
+        s["settle"] += settle
+        s["total"]  += total
+        fixed = POST_WAIT.get(atype, POST_WAIT["default"])
+        print(f"[SOUL] verifier: {atype} settled in {settle:.2f}s, "
+              f"verified in {total:.2f}s (fixed wait was {fixed:.1f}s + vision)")
+
+    async def _post_capture(self, wait_sec: float, since: Optional[float] = None) -> str:
+        """
+        Optionally wait, then get a fresh vision capture. Returns new summary.
+        A watcher capture already in flight that started after `since`
+        (monotonic — when the screen settled) is joined instead of repeated.
+        """
+        if wait_sec > 0:
+            await asyncio.sleep(wait_sec)
         if not self.screen:
             return ""
         try:
-            await self.screen._capture_vision()
+            if hasattr(self.screen, "capture_since"):
+                await self.screen.capture_since(since if since is not None else time.monotonic())
+            else:
+                await self.screen._capture_vision()
         except Exception as e:
             print(f"[SOUL] verifier post_capture error: {e}")
         return getattr(self.screen, "summary", "")
 
+    async def _explain(self, atype: str, params: dict, pre: str, post: str,
+                       allow_llm: bool = True) -> str:
+        """
+        One-line delta for a successful action. Local structural diff first;
+        the LLM call is reserved for changes the local diff can't explain.
+        """
+        post_title, post_procs = await asyncio.to_thread(_desktop_state)
+        delta = _local_delta(self._pre_title, post_title,
+                             self._pre_procs, post_procs, pre, post)
+        if delta:
+            self.delta_stats["local"] += 1
+            return delta
+        if not allow_llm:
+            return ""
+        self.delta_stats["llm"] += 1
+        return await self._delta(atype, params, pre, post)
+
     async def _delta(self, atype: str, params: dict, pre: str, post: str) -> str:
         """
         One-sentence LLM description of what changed on screen.
@@ -322,11 +546,67 @@ class ActionVerifier:
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _sim(a: str, b: str) -> float:
-    """Normalized similarity 0-1. Caps at 800 chars each for speed."""
+def _desktop_state() -> tuple[str, set[str]]:
+    """(foreground window title, set of running process names). Blocking."""
+    procs = set()
+    try:
+        for p in psutil.process_iter(["name"]):
+            name = p.info.get("name")
+            if name and name.lower() not in _PROC_NOISE:
+                procs.add(name)
+    except Exception:
+        pass
+    return get_active_window_title(), procs
+
+
+def _new_words(pre: str, post: str, limit: int = 6) -> list[str]:
+    """Content words present in post but not in pre, in order of appearance."""
+    seen  = {w.strip(".,:;!?()\"'").lower() for w in pre.split()}
+    words = []
+    for raw in post.split():
+        w = raw.strip(".,:;!?()\"'")
+        lw = w.lower()
+        if len(lw) < 3 or lw in seen or lw in _DELTA_STOPWORDS:
+            continue
+        seen.add(lw)
+        words.append(w)
+        if len(words) >= limit:
+            break
+    return words
+
+
+def _local_delta(pre_title: str, post_title: str,
+                 pre_procs: set, post_procs: set,
+                 pre: str, post: str) -> str:
+    """
+    Describe what changed without an LLM: foreground title, process-set
+    difference, then new words in the vision summary. "" if nothing explains it.
+    """
+    parts = []
+    if post_title and post_title != pre_title:
+        parts.append(f"'{post_title[:60]}' now in foreground")
+
+    started = sorted(post_procs - pre_procs)
+    exited  = sorted(pre_procs - post_procs)
+    if started:
+        parts.append("started " + ", ".join(started[:3]))
+    if exited:
+        parts.append("closed " + ", ".join(exited[:3]))
+
+    if not parts and pre and post:
+        added = _new_words(pre, post)
+        if added:
+            parts.append("now showing " + " ".join(added))
+
+    return "; ".join(parts)
+
+
+def _frame_delta(a: bytes, b: bytes) -> float:
+    """Fraction of probe cells whose grayscale value moved by more than PIXEL_DELTA."""
     if not a or not b:
         return 0.0
-    return SequenceMatcher(None, a.lower()[:800], b.lower()[:800]).ratio()
+    moved = sum(1 for x, y in zip(a, b) if abs(x - y) > PIXEL_DELTA)
+    return moved / min(len(a), len(b))
 
 
 def _hint_visible(hint: str, summary: str) -> bool: